@@ -0,0 +1,102 @@
+'''
+Bulk command submission (`commands.submit_commands`) vs one
+`ctx_Text_Set_Command` call per command, building a synthetic feeder
+(`synthetic_feeder.py`).
+
+For reference, the engine entry points for multiple commands are also timed:
+`ctx_Text_CommandArray` (with the `char**` array built in Python) and
+`ctx_Text_CommandBlock` (a single newline-separated string). Neither reports
+which command failed.
+
+Usage:
+
+    python benchmarks/bench_commands.py [--buses N] [--chunk-size C] [--repeat R]
+
+Each run uses a new context, and the order of the methods is rotated between
+repetitions; the best time of each method is reported.
+'''
+import argparse
+import os
+import sys
+import time
+from dss_python_backend import ffi, lib
+from dss_python_backend.contexts import dispose_ctx
+from dss_python_backend.commands import submit_commands
+from dss_python_backend.parallel import run_commands
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_feeder import feeder_commands
+
+
+def per_command(ctx, commands, chunk_size):
+    run_commands(ctx, commands)
+
+
+def bulk(ctx, commands, chunk_size):
+    submit_commands(ctx, commands, chunk_size)
+
+
+def command_array(ctx, commands, chunk_size):
+    for start in range(0, len(commands), chunk_size):
+        chunk = [ffi.new('char[]', cmd.encode()) for cmd in commands[start:start + chunk_size]]
+        lib.ctx_Text_CommandArray(ctx, ffi.new('char*[]', chunk), len(chunk))
+        if lib.ctx_Error_Get_Number(ctx):
+            raise RuntimeError(ffi.string(lib.ctx_Error_Get_Description(ctx)).decode())
+
+
+def command_block(ctx, commands, chunk_size):
+    for start in range(0, len(commands), chunk_size):
+        lib.ctx_Text_CommandBlock(ctx, '\n'.join(commands[start:start + chunk_size]).encode())
+        if lib.ctx_Error_Get_Number(ctx):
+            raise RuntimeError(ffi.string(lib.ctx_Error_Get_Description(ctx)).decode())
+
+
+METHODS = {
+    'per-command': per_command,
+    'submit_commands': bulk,
+    'CommandArray': command_array,
+    'CommandBlock': command_block,
+}
+
+
+def _timed(func, commands, chunk_size, expected_lines):
+    # A fresh context for every run, so no method inherits a warm circuit
+    ctx = lib.ctx_New()
+    try:
+        t0 = time.perf_counter()
+        func(ctx, commands, chunk_size)
+        elapsed = time.perf_counter() - t0
+        lib.ctx_DSS_SetActiveClass(ctx, b'Line')
+        if lib.ctx_ActiveClass_Get_Count(ctx) != expected_lines:
+            raise AssertionError(f'{func.__name__}: wrong number of lines')
+    finally:
+        dispose_ctx(ctx)
+
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--buses', type=int, default=20000)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    commands = feeder_commands(args.buses)
+    names = list(METHODS)
+    elapsed = {name: [] for name in names}
+    for rep in range(args.repeat):
+        # Rotate the order, so that no method always runs first
+        for name in names[rep % len(names):] + names[:rep % len(names)]:
+            elapsed[name].append(_timed(METHODS[name], commands, args.chunk_size, args.buses - 1))
+
+    print(f'{len(commands)} commands, best of {args.repeat}')
+    print(f'{"method":<16} {"time (s)":>10} {"us/command":>11} {"speedup":>8}')
+    reference = min(elapsed[names[0]])
+    for name in names:
+        best = min(elapsed[name])
+        print(f'{name:<16} {best:>10.3f} {1e6 * best / len(commands):>11.2f} {reference / best:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+'''
+Per-event cost of the Python event dispatch (`altdss_python_util_callback`).
+
+Compares the current dispatch tables to a reimplementation of the previous
+dispatch path (WeakKeyDictionary lookup, AltDSSEvent construction, getattr by
+name and the legacy event test on every call), using the same no-op handlers.
+
+Usage:
+
+    python benchmarks/bench_events.py [--number N] [--handlers H]
+'''
+import argparse
+import timeit
+from weakref import WeakKeyDictionary
+from dss_python_backend import ffi, lib
+from dss_python_backend.enums import AltDSSEvent
+from dss_python_backend import events
+from dss_python_backend.events import get_manager_for_ctx, LEGACY_EVENTS
+
+
+class _PreviousManager:
+    '''Dispatch path before the precompiled tables, kept only for comparison'''
+    _ctx_to_manager = WeakKeyDictionary()
+
+    def __init__(self, ctx, handlers):
+        _PreviousManager._ctx_to_manager[ctx] = self
+        for evt_type in AltDSSEvent:
+            setattr(self, evt_type.name, list(handlers[evt_type]))
+
+    def handle_event(self, ctx, evt, step, ptr):
+        evt = AltDSSEvent(evt)
+        handlers = getattr(self, evt.name)
+        if evt in LEGACY_EVENTS:
+            for handler in handlers:
+                handler()
+
+            return
+
+        for handler in handlers:
+            handler(ctx, evt, step, ptr)
+
+
+def _previous_callback(ctx, eventCode, step, ptr):
+    m = _PreviousManager._ctx_to_manager.get(ctx)
+    if m is None:
+        return
+
+    m.handle_event(ctx, eventCode, step, ptr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--number', type=int, default=200000, help='events per measurement')
+    parser.add_argument('--handlers', type=int, default=1, help='handlers per event')
+    args = parser.parse_args()
+
+    ctx = lib.ctx_New()
+    mgr = get_manager_for_ctx(ctx)
+    handlers = {}
+    for evt in AltDSSEvent:
+        handlers[evt] = [(lambda *a: None) for _ in range(args.handlers)]
+        for func in handlers[evt]:
+            mgr.register_func(evt, func)
+
+    _PreviousManager(ctx, handlers)
+    null = ffi.NULL
+    native_callback = lib.altdss_python_util_callback
+    current_callback = events.altdss_python_util_callback
+
+    print(f'{"event":<28} {"previous (ns)":>14} {"current (ns)":>14} {"C->Python (ns)":>16}')
+    for evt in (AltDSSEvent.Legacy_StepControls, AltDSSEvent.BuildSystemY):
+        code = int(evt)
+        timings = []
+        for func in (_previous_callback, current_callback, native_callback):
+            t = min(timeit.repeat(lambda: func(ctx, code, 0, null), number=args.number, repeat=5))
+            timings.append(1e9 * t / args.number)
+
+        print(f'{evt.name:<28} {timings[0]:>14.1f} {timings[1]:>14.1f} {timings[2]:>16.1f}')
+
+    mgr.unregister_all()
+
+
+if __name__ == '__main__':
+    main()
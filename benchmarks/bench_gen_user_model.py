@@ -0,0 +1,149 @@
+'''
+Per-instance vs batched generator user models (`gen_user_model`), in a
+dynamics simulation with many user-model generators.
+
+Both versions implement the same classical machine model (constant voltage
+behind the transient reactance and a swing equation), so the final states
+must match. Reported times are for the dynamics solution only.
+
+Usage:
+
+    python benchmarks/bench_gen_user_model.py [--generators N] [--steps S]
+'''
+import argparse
+import time
+import numpy as np
+from dss_python_backend import ffi, lib
+from dss_python_backend.gr_views import get_gr_views
+from dss_python_backend.gen_user_model import BatchedGenUserModel, GenUserModel, library_path, use_model
+
+DAMPING = 0.5
+
+
+def _inertia(gen_data):
+    return max(gen_data.Mmass, 1e-3)
+
+
+class PerInstanceMachine(GenUserModel):
+    var_names = ('delta', 'dw', 'Pe')
+
+    def init(self, V, I):
+        self.Z = 1j * max(self.gen_data.Xdp, 1e-3)
+        self.E0 = V - self.Z * I
+        self.Pm = -np.vdot(I, V).real
+        self.M = _inertia(self.gen_data)
+        self.vars[:] = (0, 0, self.Pm)
+
+    def calc(self, V, I):
+        if not hasattr(self, 'E0'):
+            # Power flow before the dynamics; behave as a constant current
+            I[:] = 0
+            return
+
+        I[:] = (V - self.E0 * np.exp(1j * self.vars[0])) / self.Z
+        self.vars[2] = -np.vdot(I, V).real
+
+    def integrate(self):
+        h = self.dyna_data.h
+        delta, dw, Pe = self.vars
+        self.vars[0] = delta + h * dw
+        self.vars[1] = dw + h * ((self.Pm - Pe) / self.M - DAMPING * dw)
+
+
+class BatchedMachine(BatchedGenUserModel):
+    var_names = ('delta', 'dw', 'Pe')
+
+    def __init__(self, capacity):
+        super().__init__()
+        self.Z = np.ones(capacity, dtype=complex)
+        self.E0 = np.zeros((capacity, self.max_conductors), dtype=complex)
+        self.Pm = np.zeros(capacity)
+        self.M = np.ones(capacity)
+        self.initialized = np.zeros(capacity, dtype=bool)
+
+    def new(self, index):
+        # Indices are reused after instances are deleted
+        self.initialized[index] = False
+
+    def init(self, index, V, I):
+        gen_data = self.gen_data[index]
+        n = len(V)
+        self.Z[index] = 1j * max(gen_data.Xdp, 1e-3)
+        self.E0[index, :n] = V - self.Z[index] * I
+        self.Pm[index] = -np.vdot(I, V).real
+        self.M[index] = _inertia(gen_data)
+        self.states[index] = (0, 0, self.Pm[index])
+        self.initialized[index] = True
+
+    def calc(self, indices, V, I):
+        delta = self.states[indices, 0]
+        I[:] = (V - self.E0[indices] * np.exp(1j * delta)[:, None]) / self.Z[indices, None]
+        I[~self.initialized[indices]] = 0
+        self.states[indices, 2] = -np.einsum('ij,ij->i', I.conj(), V).real
+
+    def integrate(self, indices):
+        h = self.dyna_data.h
+        delta, dw, Pe = self.states[indices].T
+        self.states[indices, 0] = delta + h * dw
+        self.states[indices, 1] = dw + h * ((self.Pm[indices] - Pe) / self.M[indices] - DAMPING * dw)
+
+
+def run_commands(ctx, commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        number = lib.ctx_Error_Get_Number(ctx)
+        if number:
+            raise RuntimeError(f'(#{number}) {ffi.string(lib.ctx_Error_Get_Description(ctx)).decode()}')
+
+
+def run(model, generators, steps):
+    # The user-model callbacks work on the prime instance
+    ctx = lib.ctx_Get_Prime()
+    use_model(model)
+    commands = [
+        'clear',
+        'new circuit.bench bus1=src basekv=12.47',
+        'new linecode.lc nphases=3 r1=0.2 x1=0.4 r0=0.6 x0=1.2 units=km',
+    ]
+    for i in range(generators):
+        commands += [
+            f'new line.l{i} bus1=src bus2=b{i} linecode=lc length=0.5 units=km',
+            f'new load.ld{i} bus1=b{i} kw=400 kvar=100 kv=12.47',
+            f'new generator.g{i} bus1=b{i} kw=300 kv=12.47 H=2 model=6 usermodel="{library_path("GenUserModel")}"',
+        ]
+    commands += ['solve', f'set mode=dynamics number={steps} stepsize=0.002']
+    run_commands(ctx, commands)
+
+    t0 = time.perf_counter()
+    run_commands(ctx, ['solve'])
+    elapsed = time.perf_counter() - t0
+
+    views = get_gr_views(ctx)
+    variables = []
+    for i in range(generators):
+        lib.ctx_Circuit_SetActiveElement(ctx, f'generator.g{i}'.encode())
+        variables.append(views.float64(lib.ctx_CktElement_Get_AllVariableValues_GR).copy())
+
+    run_commands(ctx, ['clear'])
+    use_model(None)
+    return elapsed, np.array(variables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--generators', type=int, default=200)
+    parser.add_argument('--steps', type=int, default=100)
+    args = parser.parse_args()
+
+    t_single, vars_single = run(PerInstanceMachine, args.generators, args.steps)
+    t_batched, vars_batched = run(BatchedMachine(args.generators), args.generators, args.steps)
+    if not np.allclose(vars_single, vars_batched, rtol=1e-6, atol=1e-9):
+        raise AssertionError('The batched model results differ from the per-instance results')
+
+    print(f'{"model":<14} {"time (s)":>10} {"speedup":>8}')
+    print(f'{"per-instance":<14} {t_single:>10.3f} {1:>8.2f}')
+    print(f'{"batched":<14} {t_batched:>10.3f} {t_single / t_batched:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+'''
+Cold-start cost of importing dss_python_backend, in fresh interpreters.
+
+Each scenario runs in a new process (as `python -X importtime` would), after a
+warm-up run so the bytecode cache is populated. Reported times are the median
+over the runs, in milliseconds:
+
+- "import": `import dss_python_backend` plus the scenario's extra statements
+- "importtime": cumulative time reported by `-X importtime` for the dss_python_backend modules
+
+Use `--save` to store the results as JSON and `--compare` to check against a
+previously saved file; the exit code is 1 if any scenario got slower than the
+tolerance.
+
+Usage:
+
+    python benchmarks/bench_import.py [--runs N] [--save FILE] [--compare FILE] [--tolerance 0.2]
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    'eager': ({}, ''),
+    'eager+enums': ({}, 'import dss_python_backend.enums'),
+    'lazy': ({'DSS_PYTHON_BACKEND_LAZY': '1'}, ''),
+    'lazy+enums': ({'DSS_PYTHON_BACKEND_LAZY': '1'}, 'from dss_python_backend.enums import SolveModes'),
+    'lazy+ffi': ({'DSS_PYTHON_BACKEND_LAZY': '1'}, 'from dss_python_backend import ffi'),
+    'lazy+lib': ({'DSS_PYTHON_BACKEND_LAZY': '1'}, 'from dss_python_backend import lib'),
+}
+
+_SCRIPT = '''
+import time
+t0 = time.perf_counter()
+import dss_python_backend
+{extra}
+print('ELAPSED', time.perf_counter() - t0)
+'''
+
+
+def run_scenario(env_extra, extra, runs):
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env.update(env_extra)
+    script = _SCRIPT.format(extra=extra)
+    elapsed = []
+    importtime = []
+    for i in range(runs + 1):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            env=env, capture_output=True, text=True, check=True
+        )
+        if i == 0:
+            # warm-up
+            continue
+
+        total = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+
+            _, cumulative, name = line[len('import time:'):].split('|')
+            # Only top-level entries for the package, to avoid counting nested modules twice
+            if name.strip().startswith('dss_python_backend') and name[1:2] != ' ':
+                total += int(cumulative)
+
+        importtime.append(total / 1000)
+        for line in proc.stdout.splitlines():
+            if line.startswith('ELAPSED'):
+                elapsed.append(1000 * float(line.split()[1]))
+
+    return dict(
+        import_ms=statistics.median(elapsed),
+        importtime_ms=statistics.median(importtime),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--save', help='save the results to this JSON file')
+    parser.add_argument('--compare', help='compare to the results in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='relative slowdown reported as regression')
+    args = parser.parse_args()
+
+    results = {}
+    for name, (env_extra, extra) in SCENARIOS.items():
+        results[name] = run_scenario(env_extra, extra, args.runs)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+
+    regressions = []
+    print(f'{"scenario":<14} {"import (ms)":>12} {"importtime (ms)":>16} {"baseline (ms)":>14}')
+    for name, res in results.items():
+        line = f'{name:<14} {res["import_ms"]:>12.2f} {res["importtime_ms"]:>16.2f}'
+        if baseline is not None and name in baseline:
+            ref = baseline[name]['import_ms']
+            line += f' {ref:>14.2f}'
+            if res['import_ms'] > ref * (1 + args.tolerance):
+                regressions.append(name)
+                line += '  REGRESSION'
+
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
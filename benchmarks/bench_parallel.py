@@ -0,0 +1,74 @@
+'''
+Scaling of the thread-pool scenario runner (`parallel.ContextPool`) over
+1...N threads.
+
+Each scenario scales the loads of a synthetic radial feeder, solves a snapshot
+and returns the pu voltages of all buses. The speedup is relative to a single
+thread; with a well-scaling engine, it should stay close to the number of
+threads up to the number of physical cores.
+
+Usage:
+
+    python benchmarks/bench_parallel.py [--threads N] [--scenarios S] [--buses B]
+'''
+import argparse
+import os
+import numpy as np
+from dss_python_backend import lib
+from dss_python_backend.gr_views import get_gr_views
+from dss_python_backend.parallel import ContextPool, run_commands
+
+
+def feeder_commands(buses):
+    commands = [
+        'clear',
+        'new circuit.bench bus1=b0 basekv=12.47 pu=1.02',
+        'new linecode.lc nphases=3 r1=0.2 x1=0.4 r0=0.6 x0=1.2 units=km',
+    ]
+    for i in range(1, buses):
+        # Binary tree, so the feeder is not a single long line
+        commands.append(f'new line.l{i} bus1=b{(i - 1) // 2} bus2=b{i} linecode=lc length=0.1 units=km')
+        commands.append(f'new load.ld{i} bus1=b{i} kw={10 + i % 7} kvar={3 + i % 5} kv=12.47')
+
+    commands += ['set voltagebases=[12.47]', 'calcvoltagebases', 'solve']
+    return commands
+
+
+def scenario(ctx, load_mult):
+    lib.ctx_Solution_Set_LoadMult(ctx, load_mult)
+    lib.ctx_Solution_Solve(ctx)
+    return get_gr_views(ctx).float64(lib.ctx_Circuit_Get_AllBusVmagPu_GR).copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--threads', type=int, default=os.cpu_count())
+    parser.add_argument('--scenarios', type=int, default=2000)
+    parser.add_argument('--buses', type=int, default=300)
+    args = parser.parse_args()
+
+    commands = feeder_commands(args.buses)
+    load_mults = np.linspace(0.3, 1.5, args.scenarios)
+    reference = None
+    base_throughput = None
+    print(f'{"threads":>7} {"elapsed (s)":>12} {"scenarios/s":>12} {"speedup":>8}')
+    threads = 1
+    while True:
+        with ContextPool(threads, commands) as pool:
+            res = pool.run(scenario, load_mults)
+
+        if reference is None:
+            reference = res.results
+            base_throughput = res.throughput
+        elif not np.allclose(res.results, reference):
+            raise AssertionError(f'Results with {threads} threads differ from the single thread results')
+
+        print(f'{threads:>7} {res.elapsed:>12.3f} {res.throughput:>12.1f} {res.throughput / base_throughput:>8.2f}')
+        if threads == args.threads:
+            break
+
+        threads = min(threads * 2, args.threads)
+
+
+if __name__ == '__main__':
+    main()
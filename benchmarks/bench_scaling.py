@@ -0,0 +1,180 @@
+'''
+Scaling of the engine with the circuit size, on synthetic feeders
+(`synthetic_feeder.py`).
+
+For each size, a fresh interpreter generates the feeder and records:
+
+- "generate": time to generate the commands, in Python
+- "compile": time to run the commands (`ctx_Text_Set_Command`) and calcvoltagebases
+- "snapshot": snapshot solution time
+- "qsts_step": mean time per step of a daily (QSTS) solution with 1 h steps
+- "peak_rss": peak resident memory of the process, in MiB
+
+The report lists the values and, for each metric, the log-log slope from the
+previous size (1 means linear scaling). Use `--save` to store the results as
+JSON and `--plot` to draw the curves (requires matplotlib). No network access
+is required.
+
+Usage:
+
+    python benchmarks/bench_scaling.py [--sizes 1000,10000,100000,1000000] [--steps 24] [--save FILE] [--plot FILE]
+'''
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from dss_python_backend import lib
+from dss_python_backend.parallel import run_commands
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_feeder import feeder_commands, add_arguments, feeder_kwargs
+
+METRICS = ('generate', 'compile', 'snapshot', 'qsts_step', 'peak_rss')
+
+
+def peak_rss_mib():
+    try:
+        import resource
+    except ImportError:
+        # e.g. Windows
+        return float('nan')
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in KiB on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def measure(buses, steps, kwargs) -> dict:
+    ctx = lib.ctx_New()
+    t0 = time.perf_counter()
+    commands = feeder_commands(buses, **kwargs)
+    t1 = time.perf_counter()
+    run_commands(ctx, commands)
+    t2 = time.perf_counter()
+    run_commands(ctx, ['solve'])
+    t3 = time.perf_counter()
+    converged = bool(lib.ctx_Solution_Get_Converged(ctx))
+    run_commands(ctx, [f'set mode=daily stepsize=1h number={steps}'])
+    t4 = time.perf_counter()
+    run_commands(ctx, ['solve'])
+    t5 = time.perf_counter()
+    return dict(
+        buses=buses,
+        nodes=lib.ctx_Circuit_Get_NumNodes(ctx),
+        converged=converged and bool(lib.ctx_Solution_Get_Converged(ctx)),
+        generate=t1 - t0,
+        compile=t2 - t1,
+        snapshot=t3 - t2,
+        qsts_step=(t5 - t4) / steps,
+        peak_rss=peak_rss_mib(),
+    )
+
+
+def run_size(buses, args) -> dict:
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', str(buses)] + args.passthrough
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return dict(buses=buses, error=proc.stderr.strip().splitlines()[-1:])
+
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _slope(prev, res, metric):
+    try:
+        return math.log(res[metric] / prev[metric]) / math.log(res['buses'] / prev['buses'])
+    except (KeyError, ValueError, ZeroDivisionError):
+        return float('nan')
+
+
+def report(results):
+    header = f'{"buses":>9} {"nodes":>9}' + ''.join(f' {m:>10} {"slope":>6}' for m in METRICS)
+    print('times in seconds, peak_rss in MiB')
+    print(header)
+    prev = None
+    for res in results:
+        if 'error' in res:
+            print(f'{res["buses"]:>9} failed: {" ".join(res["error"])}')
+            continue
+
+        line = f'{res["buses"]:>9} {res["nodes"]:>9}'
+        for metric in METRICS:
+            slope = _slope(prev, res, metric) if prev else float('nan')
+            line += f' {res[metric]:>10.4g} {slope:>6.2f}'
+
+        if not res['converged']:
+            line += '  (not converged)'
+
+        print(line)
+        prev = res
+
+
+def plot(results, fn):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    results = [res for res in results if 'error' not in res]
+    buses = [res['buses'] for res in results]
+    fig, axes = plt.subplots(1, 2, figsize=(11, 4.5))
+    for metric in METRICS[:-1]:
+        axes[0].loglog(buses, [res[metric] for res in results], 'o-', label=metric)
+
+    axes[0].set_xlabel('buses')
+    axes[0].set_ylabel('time (s)')
+    axes[0].legend()
+    axes[1].loglog(buses, [res['peak_rss'] for res in results], 'o-')
+    axes[1].set_xlabel('buses')
+    axes[1].set_ylabel('peak RSS (MiB)')
+    for ax in axes:
+        ax.grid(True, which='both', alpha=0.3)
+
+    fig.tight_layout()
+    fig.savefig(fn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000', help='comma-separated bus counts')
+    parser.add_argument('--steps', type=int, default=24, help='QSTS steps')
+    parser.add_argument('--save', help='save the results to this JSON file')
+    parser.add_argument('--plot', help='save the scaling curves to this image file')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    add_arguments(parser)
+    parser.set_defaults(loadshapes=8)
+    args = parser.parse_args()
+    kwargs = feeder_kwargs(args)
+
+    if args.worker is not None:
+        print(json.dumps(measure(args.worker, args.steps, kwargs)))
+        return
+
+    # Forward the feeder parameters to the workers
+    args.passthrough = [f'--steps={args.steps}'] + [
+        f'--{name.replace("_", "-")}={value}' for name, value in kwargs.items()
+    ]
+    results = []
+    for buses in (int(size) for size in args.sizes.split(',')):
+        print(f'{buses} buses...', file=sys.stderr, flush=True)
+        results.append(run_size(buses, args))
+
+    report(results)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(dict(
+                python=platform.python_version(),
+                platform=platform.platform(),
+                feeder=kwargs,
+                steps=args.steps,
+                results=results,
+            ), f, indent=2)
+
+    if args.plot:
+        plot(results, args.plot)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+'''
+Microbenchmarks of the costs controlled by the binding layer, for comparing
+backend versions. Runs offline, with small synthetic circuits.
+
+Groups (select with `--only`, comma-separated):
+
+- "scalar": cffi call overhead of scalar `ctx_*` getters and setters
+- "array": array transfer (GR getter + copy, and zero-copy GR views) by number of buses
+- "events": C-to-Python event round trip through `altdss_python_util_callback`
+- "messages": per-message cost of a Python write callback (`dss_python_cb_write`)
+  and of the native `MessageSink` (raw and decoded drains); the messages are
+  sent from Python, so the loop overhead is included in all of them
+- "usermodel": per-call overhead of a Python generator user model in a dynamics run
+- "startup": module import and `DSS_Start` time, in fresh interpreters, in the
+  default mode and with DSS_PYTHON_BACKEND_LAZY=1
+
+The core measurements only use the API of the released backends (the GR
+pointers, `altdss_python_util_callback`, `dss_python_cb_write`), so the suite
+can run against older versions. The measurements that need newer modules
+(GR views, message sink, generator user models, lazy mode) are skipped, with
+a note, when these are not available.
+
+All results are times (lower is better), in nanoseconds, taken as the best of
+the repeats. Use `--save` to store them as JSON and `--compare` to check
+against a previously saved file; the exit code is 1 if any result got slower
+than the tolerance.
+
+Usage:
+
+    python benchmarks/bench_suite.py [--only GROUPS] [--repeat R] [--quick] [--save FILE] [--compare FILE] [--tolerance 0.2]
+'''
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import dss_python_backend
+from dss_python_backend import ffi, lib
+
+GROUPS = ('scalar', 'array', 'events', 'messages', 'usermodel', 'startup')
+
+
+def run_commands(ctx, commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        number = lib.ctx_Error_Get_Number(ctx)
+        if number:
+            raise RuntimeError(f'(#{number}) {ffi.string(lib.ctx_Error_Get_Description(ctx)).decode()}')
+
+
+def radial_feeder(ctx, buses):
+    commands = [
+        'clear',
+        'new circuit.bench bus1=b0 basekv=12.47',
+        'new linecode.lc nphases=3 r1=0.2 x1=0.4 r0=0.6 x0=1.2 units=km',
+    ]
+    for i in range(1, buses):
+        commands += [
+            f'new line.l{i} bus1=b{i - 1} bus2=b{i} linecode=lc length=0.1 units=km',
+            f'new load.ld{i} bus1=b{i} kw=10 kv=12.47',
+        ]
+    commands.append('solve')
+    run_commands(ctx, commands)
+
+
+def skipped(name, reason):
+    print(f'Skipping {name}: {reason}', file=sys.stderr)
+    return {}
+
+
+def best_ns(func, number, repeat):
+    '''Best time per call of `func`, in ns'''
+    return 1e9 * min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def bench_scalar(args):
+    ctx = lib.ctx_New()
+    radial_feeder(ctx, 10)
+    n = args.number
+    return {
+        'scalar.get_int': best_ns(lambda: lib.ctx_Circuit_Get_NumBuses(ctx), n, args.repeat),
+        'scalar.get_double': best_ns(lambda: lib.ctx_Solution_Get_LoadMult(ctx), n, args.repeat),
+        'scalar.set_double': best_ns(lambda: lib.ctx_Solution_Set_LoadMult(ctx, 1.0), n, args.repeat),
+        'scalar.get_string': best_ns(lambda: ffi.string(lib.ctx_Circuit_Get_Name(ctx)), n, args.repeat),
+        'scalar.error_check': best_ns(lambda: lib.ctx_Error_Get_Number(ctx), n, args.repeat),
+    }
+
+
+def bench_array(args):
+    try:
+        import numpy as np
+    except ImportError:
+        return skipped('array', 'NumPy is not installed')
+
+    try:
+        from dss_python_backend.gr_views import get_gr_views
+    except ImportError:
+        get_gr_views = None
+        skipped('array.gr_view', 'gr_views is not available in this backend')
+
+    results = {}
+    ctx = lib.ctx_New()
+    # The GR pointers, as DSS-Python uses them
+    data_ptrs = (ffi.new('char****'), ffi.new('double***'), ffi.new('int32_t***'), ffi.new('int8_t***'))
+    count_ptrs = tuple(ffi.new('int32_t**') for _ in range(4))
+    lib.ctx_DSS_GetGRPointers(ctx, *data_ptrs, *count_ptrs)
+    data_ptr = data_ptrs[1][0]
+    counts = count_ptrs[1][0]
+    for buses in ((10, 100) if args.quick else (10, 100, 1000, 5000)):
+        radial_feeder(ctx, buses)
+        number = max(10, args.number // (10 * buses))
+
+        def gr_copy():
+            lib.ctx_Circuit_Get_AllBusVmag_GR(ctx)
+            return np.frombuffer(ffi.buffer(data_ptr[0], counts[0] * 8), dtype=np.float64).copy()
+
+        results[f'array.gr_copy.{buses}'] = best_ns(gr_copy, number, args.repeat)
+        if get_gr_views is None:
+            continue
+
+        views = get_gr_views(ctx)
+
+        def gr_view():
+            return views.float64(lib.ctx_Circuit_Get_AllBusVmag_GR).array
+
+        results[f'array.gr_view.{buses}'] = best_ns(gr_view, number, args.repeat)
+
+    return results
+
+
+def bench_events(args):
+    from dss_python_backend.enums import AltDSSEvent
+    from dss_python_backend.events import get_manager_for_ctx
+
+    ctx = lib.ctx_New()
+    mgr = get_manager_for_ctx(ctx)
+    handler = lambda *a: None
+    mgr.register_func(AltDSSEvent.BuildSystemY, handler)
+    mgr.register_func(AltDSSEvent.Legacy_StepControls, handler)
+    callback = lib.altdss_python_util_callback
+    null = ffi.NULL
+    results = {}
+    try:
+        for evt in (AltDSSEvent.BuildSystemY, AltDSSEvent.Legacy_StepControls):
+            code = int(evt)
+            results[f'events.{evt.name}'] = best_ns(lambda: callback(ctx, code, 0, null), args.number, args.repeat)
+    finally:
+        mgr.unregister_all()
+
+    return results
+
+
+# Stand-in for the write callback of DSS-Python, which decodes and stores each message
+_messages = []
+
+@ffi.def_extern()
+def dss_python_cb_write(ctx, messageStr, messageType, messageSize, messageSubType):
+    _messages.append((messageType, ffi.string(messageStr).decode()))
+    return 0
+
+
+def bench_messages(args):
+    ctx = lib.ctx_New()
+    msg = ffi.new('char[]', b'Iteration 1 of 10: converged after 3 iterations, max error 1.2e-7')
+    size = len(msg) - 1
+    number = args.number // 10
+
+    def python_callback():
+        for _ in range(number):
+            lib.dss_python_cb_write(ctx, msg, 1, size, 0)
+        _messages.clear()
+
+    results = {
+        'messages.python_callback': best_ns(python_callback, 1, args.repeat) / number,
+    }
+    try:
+        from dss_python_backend.message_sink import MessageSink
+    except ImportError:
+        skipped('messages.native_sink*', 'message_sink is not available in this backend')
+        return results
+
+    sink = MessageSink(ctx, capacity=number, text_capacity=number * (size + 1))
+    sink_callback = lib.altdss_python_msgsink_callback
+
+    def native_sink():
+        for _ in range(number):
+            sink_callback(ctx, msg, 1, size, 0)
+        sink.drain_raw()
+
+    def native_sink_decoded():
+        for _ in range(number):
+            sink_callback(ctx, msg, 1, size, 0)
+        sink.drain()
+
+    try:
+        results['messages.native_sink'] = best_ns(native_sink, 1, args.repeat) / number
+        results['messages.native_sink_decoded'] = best_ns(native_sink_decoded, 1, args.repeat) / number
+    finally:
+        sink.close()
+
+    return results
+
+
+def bench_usermodel(args):
+    try:
+        from dss_python_backend.gen_user_model import GenUserModel, library_path, use_model
+    except ImportError:
+        return skipped('usermodel', 'gen_user_model is not available in this backend')
+
+    calls = [0]
+
+    class NullModel(GenUserModel):
+        def calc(self, V, I):
+            calls[0] += 1
+            I[:] = 0
+
+    generators = 20
+    steps = 50 if args.quick else 200
+    ctx = lib.ctx_Get_Prime()
+
+    def dynamics(model):
+        commands = [
+            'clear',
+            'new circuit.bench bus1=src basekv=12.47',
+        ]
+        for i in range(generators):
+            commands += [
+                f'new line.l{i} bus1=src bus2=b{i} length=0.5 units=km',
+                f'new load.ld{i} bus1=b{i} kw=400 kv=12.47',
+                f'new generator.g{i} bus1=b{i} kw=300 kv=12.47 model={model}' + (f' usermodel="{library_path("GenUserModel")}"' if model == 6 else ''),
+            ]
+        commands += ['solve', f'set mode=dynamics number={steps} stepsize=0.002']
+        run_commands(ctx, commands)
+        t0 = time.perf_counter()
+        run_commands(ctx, ['solve'])
+        elapsed = time.perf_counter() - t0
+        run_commands(ctx, ['clear'])
+        return elapsed
+
+    use_model(NullModel)
+    try:
+        t_builtin = min(dynamics(1) for _ in range(args.repeat))
+        calls[0] = 0
+        t_user = min(dynamics(6) for _ in range(args.repeat))
+        calc_calls = calls[0] / args.repeat
+    finally:
+        use_model(None)
+
+    return {
+        'usermodel.calc_overhead': 1e9 * max(t_user - t_builtin, 0) / max(calc_calls, 1),
+    }
+
+
+_STARTUP_SCRIPT = '''
+import time
+t0 = time.perf_counter()
+import dss_python_backend
+from dss_python_backend import ffi
+t1 = time.perf_counter()
+lazy = 'lib' not in vars(dss_python_backend)
+from dss_python_backend import lib
+t2 = time.perf_counter()
+print('ELAPSED', t1 - t0, t2 - t1, int(lazy))
+'''
+
+
+def _startup_times(args, lazy):
+    env = dict(os.environ)
+    env.pop('DSS_PYTHON_BACKEND_LAZY', None)
+    if lazy:
+        env['DSS_PYTHON_BACKEND_LAZY'] = '1'
+
+    load, start = [], []
+    for i in range(args.repeat + 1):
+        proc = subprocess.run([sys.executable, '-c', _STARTUP_SCRIPT], env=env, capture_output=True, text=True, check=True)
+        if i == 0:
+            # warm-up
+            continue
+
+        for line in proc.stdout.splitlines():
+            if line.startswith('ELAPSED'):
+                _, t_load, t_start, was_lazy = line.split()
+                if lazy and was_lazy != '1':
+                    return None
+
+                load.append(1e9 * float(t_load))
+                start.append(1e9 * float(t_start))
+
+    return load, start
+
+
+def bench_startup(args):
+    # In the default mode, the import includes loading the library and DSS_Start
+    load, _ = _startup_times(args, lazy=False)
+    results = {
+        'startup.import': min(load),
+    }
+    times = _startup_times(args, lazy=True)
+    if times is None:
+        skipped('startup.lazy.*', 'the lazy mode is not available in this backend')
+        return results
+
+    load, start = times
+    results['startup.lazy.import'] = min(load)
+    results['startup.lazy.DSS_Start'] = min(start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--only', help='comma-separated groups to run: ' + ', '.join(GROUPS))
+    parser.add_argument('--number', type=int, default=100000, help='calls per measurement, for the fast operations')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help='smaller sizes and fewer calls')
+    parser.add_argument('--save', help='save the results to this JSON file')
+    parser.add_argument('--compare', help='compare to the results in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='relative slowdown reported as regression')
+    args = parser.parse_args()
+    if args.quick:
+        args.number = min(args.number, 10000)
+        args.repeat = min(args.repeat, 3)
+
+    groups = args.only.split(',') if args.only else GROUPS
+    for group in groups:
+        if group not in GROUPS:
+            parser.error(f'unknown group {group!r}')
+
+    results = {}
+    for group in groups:
+        results.update(globals()[f'bench_{group}'](args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['results']
+
+    regressions = []
+    print(f'{"benchmark":<32} {"time (ns)":>14} {"baseline (ns)":>14} {"ratio":>7}')
+    for name, value in results.items():
+        line = f'{name:<32} {value:>14.1f}'
+        if baseline is not None and name in baseline:
+            ref = baseline[name]
+            line += f' {ref:>14.1f} {value / ref if ref else float("inf"):>7.2f}'
+            if value > ref * (1 + args.tolerance):
+                regressions.append(name)
+                line += '  REGRESSION'
+
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(dict(
+                backend_version=dss_python_backend.__version__,
+                python=platform.python_version(),
+                platform=platform.platform(),
+                machine=platform.machine(),
+                results=results,
+            ), f, indent=2)
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
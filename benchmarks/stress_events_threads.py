@@ -0,0 +1,151 @@
+'''
+Stress test for the event callback manager under concurrency.
+
+Each worker thread owns a DSS context and runs daily solutions on it, while
+a handler that stays registered counts the events. At the same time, other
+threads keep registering and unregistering temporary handlers on all the
+contexts, and race to get the managers. At the end, the permanent handlers
+must have seen exactly the expected number of events, and no handler may be
+left registered.
+
+Runs on regular and free-threaded CPython builds.
+
+Usage:
+
+    python benchmarks/stress_events_threads.py [--contexts N] [--churn-threads M] [--solves S]
+'''
+import argparse
+import random
+import sys
+import threading
+import time
+from dss_python_backend import ffi, lib
+from dss_python_backend.enums import AltDSSEvent
+from dss_python_backend.events import get_manager_for_ctx
+
+STEPS = 24
+
+
+def _run_commands(ctx, commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        if lib.ctx_Error_Get_Number(ctx):
+            raise RuntimeError(ffi.string(lib.ctx_Error_Get_Description(ctx)).decode())
+
+
+def _solver(ctx, solves, counter, errors):
+    try:
+        _run_commands(ctx, [
+            'clear',
+            'new circuit.stress bus1=src basekv=12.47',
+            'new line.l1 bus1=src bus2=b1',
+            'new line.l2 bus1=b1 bus2=b2',
+            'new loadshape.ls npts=24 interval=1 mult=(0.5 0.6 0.7 0.8 0.9 1 1 1 0.9 0.8 0.7 0.6 0.5 0.6 0.7 0.8 0.9 1 1 1 0.9 0.8 0.7 0.6)',
+            'new load.ld1 bus1=b2 kw=100 daily=ls',
+            'set voltagebases=[12.47]',
+            'calcv',
+        ])
+        mgr = get_manager_for_ctx(ctx)
+        mgr.register_func(AltDSSEvent.Legacy_StepControls, counter)
+        for _ in range(solves):
+            _run_commands(ctx, [f'set mode=daily number={STEPS} hour=0', 'solve'])
+
+        mgr.unregister_func(AltDSSEvent.Legacy_StepControls, counter)
+    except Exception as ex:
+        errors.append(ex)
+
+
+def _churn(contexts, stop, errors, seed):
+    rnd = random.Random(seed)
+    try:
+        while not stop.is_set():
+            ctx = rnd.choice(contexts)
+            mgr = get_manager_for_ctx(ctx)
+            evt = rnd.choice(list(AltDSSEvent))
+            funcs = [(lambda *args: None) for _ in range(rnd.randint(1, 4))]
+            for func in funcs:
+                mgr.register_func(evt, func)
+
+            if rnd.random() < 0.1:
+                mgr.enable_stats(rnd.random() < 0.5)
+
+            for func in funcs:
+                if not mgr.unregister_func(evt, func):
+                    raise AssertionError('Handler was not registered')
+    except Exception as ex:
+        errors.append(ex)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--contexts', type=int, default=8)
+    parser.add_argument('--churn-threads', type=int, default=4)
+    parser.add_argument('--solves', type=int, default=200)
+    args = parser.parse_args()
+
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'Python {sys.version.split()[0]}, GIL enabled: {gil_enabled}')
+
+    contexts = [lib.ctx_New() for _ in range(args.contexts)]
+
+    # Race to create the managers
+    managers = [[] for _ in contexts]
+    barrier = threading.Barrier(args.contexts)
+    def get_all():
+        barrier.wait()
+        for ctx, found in zip(contexts, managers):
+            found.append(get_manager_for_ctx(ctx))
+
+    threads = [threading.Thread(target=get_all) for _ in range(args.contexts)]
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    assert all(len(set(map(id, found))) == 1 for found in managers), 'Multiple managers for a context'
+
+    errors = []
+    counts = [0] * args.contexts
+    def make_counter(idx):
+        def counter():
+            counts[idx] += 1
+
+        return counter
+
+    stop = threading.Event()
+    churners = [
+        threading.Thread(target=_churn, args=(contexts, stop, errors, seed))
+        for seed in range(args.churn_threads)
+    ]
+    solvers = [
+        threading.Thread(target=_solver, args=(ctx, args.solves, make_counter(idx), errors))
+        for idx, ctx in enumerate(contexts)
+    ]
+    t0 = time.perf_counter()
+    for t in churners + solvers:
+        t.start()
+
+    for t in solvers:
+        t.join()
+
+    stop.set()
+    for t in churners:
+        t.join()
+
+    elapsed = time.perf_counter() - t0
+
+    if errors:
+        raise errors[0]
+
+    expected = args.solves * STEPS
+    assert counts == [expected] * args.contexts, f'Expected {expected} events per context, got {counts}'
+    for ctx in contexts:
+        mgr = get_manager_for_ctx(ctx)
+        assert all(not getattr(mgr, evt.name) for evt in AltDSSEvent), 'Handlers left registered'
+
+    print(f'OK: {args.contexts} contexts, {args.churn_threads} churn threads, {sum(counts)} events in {elapsed:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+'''
+Deterministic synthetic feeders of arbitrary size, for load tests.
+
+The feeder is a tree of `buses` buses (each bus `i > 0` fed from bus
+`(i - 1) // branching`), so the depth grows with the log of the size. Meshed
+feeders add closed ties between random pairs of buses. Loads, PV systems and
+storage are placed on random buses, with daily loadshapes; the total load is
+fixed, so larger feeders still solve. The same parameters and seed always
+produce the same commands.
+
+The circuit is created by running the commands through `ctx_Text_Set_Command`
+(`build_feeder`), or saved as a DSS script:
+
+    python benchmarks/synthetic_feeder.py --buses 10000 --pv 0.2 --output feeder.dss
+'''
+import argparse
+import math
+import random
+from dss_python_backend.parallel import run_commands
+
+# Approximate residential shape, per hour
+_BASE_SHAPE = [
+    0.45, 0.40, 0.38, 0.37, 0.38, 0.45, 0.60, 0.72, 0.70, 0.65, 0.62, 0.62,
+    0.63, 0.62, 0.63, 0.68, 0.78, 0.92, 1.00, 0.98, 0.90, 0.78, 0.63, 0.52,
+]
+_SOLAR_SHAPE = [max(0.0, math.sin(math.pi * (h - 6) / 13)) for h in range(24)]
+# Charge around noon, discharge at the evening peak
+_STORAGE_SHAPE = [0, 0, 0, 0, 0, 0, 0, 0, 0, -0.5, -1, -1, -1, -0.5, 0, 0, 0, 0.5, 1, 1, 0.5, 0, 0, 0]
+
+
+def _mult(values):
+    return '(' + ' '.join(f'{v:.4f}' for v in values) + ')'
+
+
+def feeder_commands(
+    buses: int,
+    phases: int = 3,
+    branching: int = 2,
+    meshed: float = 0.0,
+    loads: float = 0.7,
+    pv: float = 0.0,
+    storage: float = 0.0,
+    loadshapes: int = 0,
+    total_kw: float = 5000.0,
+    kv: float = 12.47,
+    seed: int = 0,
+) -> list:
+    '''
+    DSS commands for a synthetic feeder with `buses` buses of `phases` phases.
+
+    `meshed`, `loads`, `pv` and `storage` are the fractions of buses with an
+    extra tie, a load, a PV system and a storage unit. With `loadshapes > 0`,
+    that many daily loadshapes are generated and assigned to the loads in
+    turn; PV and storage use a solar and a dispatch shape.
+    '''
+    if not 1 <= phases <= 3:
+        raise ValueError('phases must be 1, 2 or 3')
+
+    rng = random.Random(seed)
+    nodes = '.' + '.'.join(str(p) for p in range(1, phases + 1))
+    elem_kv = kv if phases > 1 else kv / math.sqrt(3)
+    load_buses = [i for i in range(1, buses) if rng.random() < loads]
+    pv_buses = [i for i in range(1, buses) if rng.random() < pv]
+    storage_buses = [i for i in range(1, buses) if rng.random() < storage]
+    kw_per_load = total_kw / max(len(load_buses), 1)
+
+    commands = [
+        'clear',
+        f'new circuit.synthetic bus1=b0 basekv={kv} pu=1.02 mvasc3=200000 mvasc1=210000',
+        f'new linecode.lc nphases={phases} r1=0.05 x1=0.15 r0=0.2 x0=0.6 units=km',
+    ]
+    for k in range(loadshapes):
+        shape = [v * rng.uniform(0.85, 1.15) for v in _BASE_SHAPE]
+        commands.append(f'new loadshape.ls{k} npts=24 interval=1 mult={_mult(shape)}')
+
+    if pv_buses:
+        commands.append(f'new loadshape.solar npts=24 interval=1 mult={_mult(_SOLAR_SHAPE)}')
+
+    if storage_buses:
+        commands.append(f'new loadshape.dispatch npts=24 interval=1 mult={_mult(_STORAGE_SHAPE)}')
+
+    for i in range(1, buses):
+        parent = (i - 1) // branching
+        length = rng.uniform(0.02, 0.1)
+        commands.append(f'new line.l{i} bus1=b{parent}{nodes} bus2=b{i}{nodes} linecode=lc length={length:.4f} units=km')
+
+    for t in range(int(meshed * buses)):
+        a, b = rng.randrange(buses), rng.randrange(buses)
+        if a == b:
+            continue
+
+        commands.append(f'new line.tie{t} bus1=b{a}{nodes} bus2=b{b}{nodes} linecode=lc length={rng.uniform(0.1, 0.5):.4f} units=km')
+
+    for n, i in enumerate(load_buses):
+        kw = kw_per_load * rng.uniform(0.5, 1.5)
+        daily = f' daily=ls{n % loadshapes}' if loadshapes else ''
+        commands.append(f'new load.ld{i} bus1=b{i}{nodes} phases={phases} kv={elem_kv:.4f} kw={kw:.4f} pf=0.95{daily}')
+
+    for i in pv_buses:
+        kva = kw_per_load * rng.uniform(0.5, 2)
+        commands.append(f'new pvsystem.pv{i} bus1=b{i}{nodes} phases={phases} kv={elem_kv:.4f} kva={kva:.4f} pmpp={kva:.4f} irradiance=1 daily=solar')
+
+    for i in storage_buses:
+        kw = kw_per_load * rng.uniform(0.5, 2)
+        commands.append(f'new storage.st{i} bus1=b{i}{nodes} phases={phases} kv={elem_kv:.4f} kwrated={kw:.4f} kwhrated={4 * kw:.4f} dispmode=follow daily=dispatch')
+
+    commands += [f'set voltagebases=[{kv}]', 'calcvoltagebases']
+    return commands
+
+
+def build_feeder(ctx, buses: int, **kwargs) -> int:
+    '''
+    Create the synthetic feeder (see `feeder_commands`) in the DSS context.
+    Returns the number of commands.
+    '''
+    commands = feeder_commands(buses, **kwargs)
+    run_commands(ctx, commands)
+    return len(commands)
+
+
+def add_arguments(parser):
+    '''Add the feeder parameters to an argparse parser.'''
+    parser.add_argument('--phases', type=int, default=3)
+    parser.add_argument('--branching', type=int, default=2)
+    parser.add_argument('--meshed', type=float, default=0.0, help='fraction of buses with an extra tie')
+    parser.add_argument('--loads', type=float, default=0.7, help='fraction of buses with a load')
+    parser.add_argument('--pv', type=float, default=0.0, help='fraction of buses with a PV system')
+    parser.add_argument('--storage', type=float, default=0.0, help='fraction of buses with storage')
+    parser.add_argument('--loadshapes', type=int, default=0, help='number of daily loadshapes')
+    parser.add_argument('--total-kw', type=float, default=5000.0)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def feeder_kwargs(args) -> dict:
+    '''Feeder parameters from the parsed arguments of `add_arguments`.'''
+    return dict(
+        phases=args.phases,
+        branching=args.branching,
+        meshed=args.meshed,
+        loads=args.loads,
+        pv=args.pv,
+        storage=args.storage,
+        loadshapes=args.loadshapes,
+        total_kw=args.total_kw,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--buses', type=int, default=1000)
+    parser.add_argument('--output', required=True, help='DSS script to write')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    with open(args.output, 'w') as f:
+        f.write('\n'.join(feeder_commands(args.buses, **feeder_kwargs(args))))
+        f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,529 @@
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+#ifdef _WIN32
+#ifndef WIN32_LEAN_AND_MEAN
+#define WIN32_LEAN_AND_MEAN
+#endif
+#include <windows.h>
+#include <intrin.h>
+#define ALTDSS_PYTHON_SPIN_TRYLOCK(lock) (_InterlockedCompareExchange((volatile long*)(lock), 1, 0) == 0)
+#define ALTDSS_PYTHON_SPIN_UNLOCK(lock) _InterlockedExchange((volatile long*)(lock), 0)
+#define ALTDSS_PYTHON_LOAD_PTR(p) _InterlockedCompareExchangePointer((void* volatile*)&(p), NULL, NULL)
+#define ALTDSS_PYTHON_STORE_PTR(p, v) _InterlockedExchangePointer((void* volatile*)&(p), (v))
+#else
+#include <time.h>
+#define ALTDSS_PYTHON_SPIN_TRYLOCK(lock) (__atomic_exchange_n((lock), 1, __ATOMIC_ACQUIRE) == 0)
+#define ALTDSS_PYTHON_SPIN_UNLOCK(lock) __atomic_store_n((lock), 0, __ATOMIC_RELEASE)
+#define ALTDSS_PYTHON_LOAD_PTR(p) __atomic_load_n(&(p), __ATOMIC_ACQUIRE)
+#define ALTDSS_PYTHON_STORE_PTR(p, v) __atomic_store_n(&(p), (v), __ATOMIC_RELEASE)
+#endif
+
+#define ALTDSS_PYTHON_SPIN_LOCK(lock) while (!ALTDSS_PYTHON_SPIN_TRYLOCK(lock)) {}
+
+/* Monotonic clock, in seconds */
+static double altdss_python_now(void)
+{
+#ifdef _WIN32
+    LARGE_INTEGER freq, counter;
+    QueryPerformanceFrequency(&freq);
+    QueryPerformanceCounter(&counter);
+    return (double)counter.QuadPart / (double)freq.QuadPart;
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec + 1e-9 * (double)ts.tv_nsec;
+#endif
+}
+
+/*
+    Event recorder
+
+    Native AltDSS event handler that only stores (ctx, eventCode, step, ptr, timestamp)
+    in a ring buffer provided by the caller. Python drains the records in batches.
+    When the buffer is full, new records are dropped and counted; the engine thread
+    never waits for the consumer.
+*/
+
+typedef struct {
+    void* ctx;
+    int32_t eventCode;
+    int32_t step;
+    void* ptr;
+    double timestamp;
+} altdss_python_event_record_t;
+
+typedef struct altdss_python_event_recorder_t {
+    void* ctx;
+    uint64_t events; // Bit mask of the event codes to record
+    altdss_python_event_record_t* records;
+    int32_t capacity;
+    int32_t start;
+    int32_t count;
+    int64_t dropped;
+    int32_t lock;
+} altdss_python_event_recorder_t;
+
+#define ALTDSS_PYTHON_MAX_RECORDERS 256
+
+static altdss_python_event_recorder_t* altdss_python_recorders[ALTDSS_PYTHON_MAX_RECORDERS];
+static int32_t altdss_python_recorders_lock = 0;
+
+static altdss_python_event_recorder_t* altdss_python_recorder_new(void* ctx, altdss_python_event_record_t* records, int32_t capacity, uint64_t events)
+{
+    altdss_python_event_recorder_t* rec;
+    int i;
+
+    if (records == NULL || capacity <= 0)
+        return NULL;
+
+    rec = (altdss_python_event_recorder_t*)calloc(1, sizeof(altdss_python_event_recorder_t));
+    if (rec == NULL)
+        return NULL;
+
+    rec->ctx = ctx;
+    rec->events = events;
+    rec->records = records;
+    rec->capacity = capacity;
+
+    ALTDSS_PYTHON_SPIN_LOCK(&altdss_python_recorders_lock);
+    for (i = 0; i < ALTDSS_PYTHON_MAX_RECORDERS; ++i)
+    {
+        if (altdss_python_recorders[i] == NULL)
+        {
+            ALTDSS_PYTHON_STORE_PTR(altdss_python_recorders[i], rec);
+            break;
+        }
+    }
+    ALTDSS_PYTHON_SPIN_UNLOCK(&altdss_python_recorders_lock);
+
+    if (i == ALTDSS_PYTHON_MAX_RECORDERS)
+    {
+        free(rec);
+        return NULL;
+    }
+    return rec;
+}
+
+/*
+    The recorder callback must be already unregistered from the engine for the
+    target context, i.e. no events for it can be running concurrently.
+*/
+static void altdss_python_recorder_free(altdss_python_event_recorder_t* rec)
+{
+    int i;
+
+    ALTDSS_PYTHON_SPIN_LOCK(&altdss_python_recorders_lock);
+    for (i = 0; i < ALTDSS_PYTHON_MAX_RECORDERS; ++i)
+    {
+        if (altdss_python_recorders[i] == rec)
+        {
+            ALTDSS_PYTHON_STORE_PTR(altdss_python_recorders[i], NULL);
+            break;
+        }
+    }
+    ALTDSS_PYTHON_SPIN_UNLOCK(&altdss_python_recorders_lock);
+    free(rec);
+}
+
+static void altdss_python_recorder_callback(void* ctx, int32_t eventCode, int32_t step, void* ptr)
+{
+    altdss_python_event_recorder_t* rec;
+    altdss_python_event_record_t* record;
+    double timestamp = altdss_python_now();
+    int i;
+
+    for (i = 0; i < ALTDSS_PYTHON_MAX_RECORDERS; ++i)
+    {
+        rec = (altdss_python_event_recorder_t*)ALTDSS_PYTHON_LOAD_PTR(altdss_python_recorders[i]);
+        if (rec == NULL || rec->ctx != ctx)
+            continue;
+
+        // The callback is shared by the recorders of the context; skip the
+        // ones that did not subscribe to this event
+        if (eventCode < 0 || eventCode >= 64 || !((rec->events >> eventCode) & 1))
+            continue;
+
+        ALTDSS_PYTHON_SPIN_LOCK(&rec->lock);
+        if (rec->count == rec->capacity)
+        {
+            ++rec->dropped;
+        }
+        else
+        {
+            record = &rec->records[(rec->start + rec->count) % rec->capacity];
+            record->ctx = ctx;
+            record->eventCode = eventCode;
+            record->step = step;
+            record->ptr = ptr;
+            record->timestamp = timestamp;
+            ++rec->count;
+        }
+        ALTDSS_PYTHON_SPIN_UNLOCK(&rec->lock);
+    }
+}
+
+static int32_t altdss_python_recorder_drain(altdss_python_event_recorder_t* rec, altdss_python_event_record_t* out, int32_t maxCount)
+{
+    int32_t n, first;
+
+    ALTDSS_PYTHON_SPIN_LOCK(&rec->lock);
+    n = (rec->count < maxCount) ? rec->count : maxCount;
+    if (n > 0)
+    {
+        first = rec->capacity - rec->start;
+        if (first > n)
+            first = n;
+
+        memcpy(out, &rec->records[rec->start], first * sizeof(altdss_python_event_record_t));
+        if (n > first)
+            memcpy(out + first, rec->records, (n - first) * sizeof(altdss_python_event_record_t));
+
+        rec->start = (rec->start + n) % rec->capacity;
+        rec->count -= n;
+    }
+    ALTDSS_PYTHON_SPIN_UNLOCK(&rec->lock);
+    return n;
+}
+
+static int32_t altdss_python_recorder_pending(altdss_python_event_recorder_t* rec)
+{
+    int32_t n;
+
+    ALTDSS_PYTHON_SPIN_LOCK(&rec->lock);
+    n = rec->count;
+    ALTDSS_PYTHON_SPIN_UNLOCK(&rec->lock);
+    return n;
+}
+
+static int64_t altdss_python_recorder_dropped(altdss_python_event_recorder_t* rec, int32_t reset)
+{
+    int64_t n;
+
+    ALTDSS_PYTHON_SPIN_LOCK(&rec->lock);
+    n = rec->dropped;
+    if (reset)
+        rec->dropped = 0;
+    ALTDSS_PYTHON_SPIN_UNLOCK(&rec->lock);
+    return n;
+}
+
+static double altdss_python_recorder_time(void)
+{
+    return altdss_python_now();
+}
+
+/*
+    Bulk getters
+
+    Run a GR getter and copy the result from the global result buffer of the
+    context to a buffer provided by the caller (e.g. a NumPy array), so reading
+    the same quantities at every step does not allocate.
+
+    All return the number of doubles in the result. The data is only copied if
+    it fits in `capacity`; -1 is returned if the engine reported an error.
+*/
+
+static int32_t altdss_python_bulk_copy(void* ctx, double* out, int32_t capacity, int32_t offset)
+{
+    char*** dataStr;
+    double** dataF64;
+    int32_t** dataI32;
+    int8_t** dataI8;
+    int32_t *countStr, *countF64, *countI32, *countI8;
+    int32_t count;
+
+    if (*ctx_Error_Get_NumberPtr(ctx) != 0)
+        return -1;
+
+    ctx_DSS_GetGRPointers(ctx, &dataStr, &dataF64, &dataI32, &dataI8, &countStr, &countF64, &countI32, &countI8);
+    count = countF64[0];
+    if (offset + count <= capacity && count > 0)
+        memcpy(out + offset, *dataF64, sizeof(double) * (size_t)count);
+
+    return count;
+}
+
+#define ALTDSS_PYTHON_BULK_GETTER(name, grFunc) \
+    static int32_t altdss_python_bulk_##name(void* ctx, double* out, int32_t capacity) \
+    { \
+        grFunc(ctx); \
+        return altdss_python_bulk_copy(ctx, out, capacity, 0); \
+    }
+
+ALTDSS_PYTHON_BULK_GETTER(bus_volts, ctx_Circuit_Get_AllBusVolts_GR)
+ALTDSS_PYTHON_BULK_GETTER(bus_vmag, ctx_Circuit_Get_AllBusVmag_GR)
+ALTDSS_PYTHON_BULK_GETTER(bus_vmag_pu, ctx_Circuit_Get_AllBusVmagPu_GR)
+ALTDSS_PYTHON_BULK_GETTER(element_losses, ctx_Circuit_Get_AllElementLosses_GR)
+ALTDSS_PYTHON_BULK_GETTER(pd_currents, ctx_PDElements_Get_AllCurrents_GR)
+ALTDSS_PYTHON_BULK_GETTER(pd_powers, ctx_PDElements_Get_AllPowers_GR)
+
+/* Concatenated results of a CktElement GR getter for each element of a class */
+static int32_t altdss_python_bulk_class(void* ctx, const char* className, void (*grFunc)(const void*), double* out, int32_t capacity)
+{
+    int32_t total = 0, count, idx;
+
+    if (ctx_DSS_SetActiveClass(ctx, className) == 0 || *ctx_Error_Get_NumberPtr(ctx) != 0)
+        return -1;
+
+    for (idx = ctx_ActiveClass_Get_First(ctx); idx != 0; idx = ctx_ActiveClass_Get_Next(ctx))
+    {
+        grFunc(ctx);
+        count = altdss_python_bulk_copy(ctx, out, capacity, total);
+        if (count < 0)
+            return -1;
+
+        total += count;
+    }
+    return total;
+}
+
+static int32_t altdss_python_bulk_class_currents(void* ctx, const char* className, double* out, int32_t capacity)
+{
+    return altdss_python_bulk_class(ctx, className, ctx_CktElement_Get_Currents_GR, out, capacity);
+}
+
+static int32_t altdss_python_bulk_class_powers(void* ctx, const char* className, double* out, int32_t capacity)
+{
+    return altdss_python_bulk_class(ctx, className, ctx_CktElement_Get_Powers_GR, out, capacity);
+}
+
+/*
+    Message sink
+
+    Native message callback that keeps the messages of the accepted types in
+    buffers provided by the caller: a record per message, and the text of the
+    messages (NUL-terminated, one after the other). The type filter is applied
+    here, so discarded messages never reach Python. Python drains the pending
+    messages in batches.
+
+    When a message does not fit and the sink was created with notifyFull, the
+    Python callback altdss_python_msgsink_full is called once to drain the
+    buffers; if the message still does not fit, it is dropped and counted.
+    Messages longer than the text buffer are truncated.
+*/
+
+typedef struct {
+    int32_t messageType;
+    int32_t messageSubType;
+    int32_t offset;
+    int32_t length;
+    int64_t size;
+} altdss_python_message_record_t;
+
+typedef struct altdss_python_message_sink_t {
+    void* ctx;
+    altdss_python_message_record_t* records;
+    char* text;
+    int32_t capacity;
+    int32_t textCapacity;
+    int32_t count;
+    int32_t textUsed;
+    uint32_t typeMask;
+    int32_t notifyFull;
+    int64_t dropped;
+    int32_t lock;
+} altdss_python_message_sink_t;
+
+static int32_t altdss_python_msgsink_full(void* ctx);
+
+static altdss_python_message_sink_t* altdss_python_msgsinks[ALTDSS_PYTHON_MAX_RECORDERS];
+static int32_t altdss_python_msgsinks_lock = 0;
+
+/* Bit of a message type in the type mask; types out of the mask range share the last bit */
+static uint32_t altdss_python_msgsink_type_bit(int32_t messageType)
+{
+    if (messageType < -1 || messageType > 30)
+        return 1u << 31;
+
+    return 1u << (messageType + 1);
+}
+
+static altdss_python_message_sink_t* altdss_python_msgsink_new(void* ctx, altdss_python_message_record_t* records, int32_t capacity, char* text, int32_t textCapacity, uint32_t typeMask, int32_t notifyFull)
+{
+    altdss_python_message_sink_t* sink;
+    int i;
+
+    if (records == NULL || capacity <= 0 || text == NULL || textCapacity <= 1)
+        return NULL;
+
+    sink = (altdss_python_message_sink_t*)calloc(1, sizeof(altdss_python_message_sink_t));
+    if (sink == NULL)
+        return NULL;
+
+    sink->ctx = ctx;
+    sink->records = records;
+    sink->capacity = capacity;
+    sink->text = text;
+    sink->textCapacity = textCapacity;
+    sink->typeMask = typeMask;
+    sink->notifyFull = notifyFull;
+
+    ALTDSS_PYTHON_SPIN_LOCK(&altdss_python_msgsinks_lock);
+    for (i = 0; i < ALTDSS_PYTHON_MAX_RECORDERS; ++i)
+    {
+        if (altdss_python_msgsinks[i] == NULL)
+        {
+            ALTDSS_PYTHON_STORE_PTR(altdss_python_msgsinks[i], sink);
+            break;
+        }
+    }
+    ALTDSS_PYTHON_SPIN_UNLOCK(&altdss_python_msgsinks_lock);
+
+    if (i == ALTDSS_PYTHON_MAX_RECORDERS)
+    {
+        free(sink);
+        return NULL;
+    }
+    return sink;
+}
+
+/*
+    The sink callback must be already unregistered from the engine for the
+    target context, i.e. no messages for it can be running concurrently.
+*/
+static void altdss_python_msgsink_free(altdss_python_message_sink_t* sink)
+{
+    int i;
+
+    ALTDSS_PYTHON_SPIN_LOCK(&altdss_python_msgsinks_lock);
+    for (i = 0; i < ALTDSS_PYTHON_MAX_RECORDERS; ++i)
+    {
+        if (altdss_python_msgsinks[i] == sink)
+        {
+            ALTDSS_PYTHON_STORE_PTR(altdss_python_msgsinks[i], NULL);
+            break;
+        }
+    }
+    ALTDSS_PYTHON_SPIN_UNLOCK(&altdss_python_msgsinks_lock);
+    free(sink);
+}
+
+/* Appends the message if it fits; the sink must be locked */
+static int32_t altdss_python_msgsink_append(altdss_python_message_sink_t* sink, const char* messageStr, int32_t messageType, int32_t messageSubType, int64_t size)
+{
+    altdss_python_message_record_t* record;
+    int32_t length = (size < sink->textCapacity - 1) ? (int32_t)size : (sink->textCapacity - 1);
+
+    if (sink->count == sink->capacity || sink->textUsed + length + 1 > sink->textCapacity)
+        return 0;
+
+    record = &sink->records[sink->count];
+    record->messageType = messageType;
+    record->messageSubType = messageSubType;
+    record->offset = sink->textUsed;
+    record->length = length;
+    record->size = size;
+    memcpy(sink->text + sink->textUsed, messageStr, length);
+    sink->text[sink->textUsed + length] = 0;
+    sink->textUsed += length + 1;
+    ++sink->count;
+    return 1;
+}
+
+static int32_t altdss_python_msgsink_callback(void* ctx, char* messageStr, int32_t messageType, int64_t messageSize, int32_t messageSubType)
+{
+    altdss_python_message_sink_t* sink = NULL;
+    uint32_t bit = altdss_python_msgsink_type_bit(messageType);
+    int64_t size;
+    int i;
+
+    for (i = 0; i < ALTDSS_PYTHON_MAX_RECORDERS; ++i)
+    {
+        sink = (altdss_python_message_sink_t*)ALTDSS_PYTHON_LOAD_PTR(altdss_python_msgsinks[i]);
+        if (sink != NULL && sink->ctx == ctx)
+            break;
+    }
+    if (i == ALTDSS_PYTHON_MAX_RECORDERS || (sink->typeMask & bit) == 0)
+        return 0;
+
+    size = (messageStr != NULL) ? (int64_t)strlen(messageStr) : 0;
+    ALTDSS_PYTHON_SPIN_LOCK(&sink->lock);
+    if (!altdss_python_msgsink_append(sink, messageStr, messageType, messageSubType, size))
+    {
+        if (sink->notifyFull)
+        {
+            ALTDSS_PYTHON_SPIN_UNLOCK(&sink->lock);
+            altdss_python_msgsink_full(ctx);
+            ALTDSS_PYTHON_SPIN_LOCK(&sink->lock);
+        }
+        if (!sink->notifyFull || !altdss_python_msgsink_append(sink, messageStr, messageType, messageSubType, size))
+            ++sink->dropped;
+    }
+    ALTDSS_PYTHON_SPIN_UNLOCK(&sink->lock);
+    return 0;
+}
+
+/*
+    Moves all pending messages to the output buffers, which must be at least as
+    large as the ones of the sink. Returns the number of messages.
+*/
+static int32_t altdss_python_msgsink_drain(altdss_python_message_sink_t* sink, altdss_python_message_record_t* out, char* outText)
+{
+    int32_t n;
+
+    ALTDSS_PYTHON_SPIN_LOCK(&sink->lock);
+    n = sink->count;
+    if (n > 0)
+    {
+        memcpy(out, sink->records, n * sizeof(altdss_python_message_record_t));
+        memcpy(outText, sink->text, sink->textUsed);
+        sink->count = 0;
+        sink->textUsed = 0;
+    }
+    ALTDSS_PYTHON_SPIN_UNLOCK(&sink->lock);
+    return n;
+}
+
+static int32_t altdss_python_msgsink_pending(altdss_python_message_sink_t* sink)
+{
+    int32_t n;
+
+    ALTDSS_PYTHON_SPIN_LOCK(&sink->lock);
+    n = sink->count;
+    ALTDSS_PYTHON_SPIN_UNLOCK(&sink->lock);
+    return n;
+}
+
+static int64_t altdss_python_msgsink_dropped(altdss_python_message_sink_t* sink, int32_t reset)
+{
+    int64_t n;
+
+    ALTDSS_PYTHON_SPIN_LOCK(&sink->lock);
+    n = sink->dropped;
+    if (reset)
+        sink->dropped = 0;
+    ALTDSS_PYTHON_SPIN_UNLOCK(&sink->lock);
+    return n;
+}
+
+/* Plot callback that ignores all plots, for headless runs */
+static int32_t altdss_python_plot_discard(void* ctx, char* jsonParams)
+{
+    return 0;
+}
+
+/*
+    Bulk command submission
+
+    Runs `count` commands packed in a single block, each terminated by NUL,
+    stopping at the first error. Returns the index of the command that failed,
+    or -1 if all succeeded; the error is kept in the context. The engine's
+    Text_CommandArray also stops at the first error, but does not tell which
+    command failed.
+*/
+static int32_t altdss_python_run_commands(void* ctx, const char* commands, int32_t count)
+{
+    int32_t idx;
+
+    for (idx = 0; idx < count; ++idx)
+    {
+        ctx_Text_Set_Command(ctx, commands);
+        if (*ctx_Error_Get_NumberPtr(ctx) != 0)
+            return idx;
+
+        commands += strlen(commands) + 1;
+    }
+    return -1;
+}
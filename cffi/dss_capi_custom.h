@@ -1,3 +1,53 @@
 extern "Python" int32_t dss_python_cb_plot(void* ctx, char* params);
 extern "Python" int32_t dss_python_cb_write(void* ctx, char* messageStr, int32_t messageType, int64_t messageSize, int32_t messageSubType);
+extern "Python" int32_t altdss_python_plot_enqueue(void* ctx, char* jsonParams);
 extern "Python" void altdss_python_util_callback(void* ctx, int32_t eventCode, int32_t step, void* ptr);
+
+typedef struct {
+    void* ctx;
+    int32_t eventCode;
+    int32_t step;
+    void* ptr;
+    double timestamp;
+} altdss_python_event_record_t;
+
+typedef struct altdss_python_event_recorder_t altdss_python_event_recorder_t;
+
+altdss_python_event_recorder_t* altdss_python_recorder_new(void* ctx, altdss_python_event_record_t* records, int32_t capacity, uint64_t events);
+void altdss_python_recorder_free(altdss_python_event_recorder_t* rec);
+void altdss_python_recorder_callback(void* ctx, int32_t eventCode, int32_t step, void* ptr);
+int32_t altdss_python_recorder_drain(altdss_python_event_recorder_t* rec, altdss_python_event_record_t* out, int32_t maxCount);
+int32_t altdss_python_recorder_pending(altdss_python_event_recorder_t* rec);
+int64_t altdss_python_recorder_dropped(altdss_python_event_recorder_t* rec, int32_t reset);
+double altdss_python_recorder_time(void);
+
+int32_t altdss_python_bulk_bus_volts(void* ctx, double* out, int32_t capacity);
+int32_t altdss_python_bulk_bus_vmag(void* ctx, double* out, int32_t capacity);
+int32_t altdss_python_bulk_bus_vmag_pu(void* ctx, double* out, int32_t capacity);
+int32_t altdss_python_bulk_element_losses(void* ctx, double* out, int32_t capacity);
+int32_t altdss_python_bulk_pd_currents(void* ctx, double* out, int32_t capacity);
+int32_t altdss_python_bulk_pd_powers(void* ctx, double* out, int32_t capacity);
+int32_t altdss_python_bulk_class_currents(void* ctx, const char* className, double* out, int32_t capacity);
+int32_t altdss_python_bulk_class_powers(void* ctx, const char* className, double* out, int32_t capacity);
+
+extern "Python" int32_t altdss_python_msgsink_full(void* ctx);
+
+typedef struct {
+    int32_t messageType;
+    int32_t messageSubType;
+    int32_t offset;
+    int32_t length;
+    int64_t size;
+} altdss_python_message_record_t;
+
+typedef struct altdss_python_message_sink_t altdss_python_message_sink_t;
+
+altdss_python_message_sink_t* altdss_python_msgsink_new(void* ctx, altdss_python_message_record_t* records, int32_t capacity, char* text, int32_t textCapacity, uint32_t typeMask, int32_t notifyFull);
+void altdss_python_msgsink_free(altdss_python_message_sink_t* sink);
+int32_t altdss_python_msgsink_callback(void* ctx, char* messageStr, int32_t messageType, int64_t messageSize, int32_t messageSubType);
+int32_t altdss_python_msgsink_drain(altdss_python_message_sink_t* sink, altdss_python_message_record_t* out, char* outText);
+int32_t altdss_python_msgsink_pending(altdss_python_message_sink_t* sink);
+int64_t altdss_python_msgsink_dropped(altdss_python_message_sink_t* sink, int32_t reset);
+
+int32_t altdss_python_plot_discard(void* ctx, char* jsonParams);
+int32_t altdss_python_run_commands(void* ctx, const char* commands, int32_t count);
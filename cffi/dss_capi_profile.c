@@ -0,0 +1,80 @@
+
+/*
+    Profiling variant
+
+    Included after dss_capi_custom.c and the generated table of function names
+    (ALTDSS_PYTHON_PROF_SIZE, altdss_python_prof_names) in the profiling build.
+    Each ctx_* function called through the module is replaced by a generated
+    wrapper that counts the calls and accumulates the wall time. Nested calls
+    (e.g. from callbacks running inside ctx_Text_Set_Command) are included in
+    the time of the outer function as well.
+*/
+
+#ifdef _WIN32
+#define ALTDSS_PYTHON_ATOMIC_ADD64(p, v) _InterlockedExchangeAdd64((volatile __int64*)(p), (v))
+#define ALTDSS_PYTHON_ATOMIC_XCHG64(p, v) _InterlockedExchange64((volatile __int64*)(p), (v))
+#define ALTDSS_PYTHON_ATOMIC_LOAD64(p) _InterlockedCompareExchange64((volatile __int64*)(p), 0, 0)
+#else
+#define ALTDSS_PYTHON_ATOMIC_ADD64(p, v) __atomic_fetch_add((p), (v), __ATOMIC_RELAXED)
+#define ALTDSS_PYTHON_ATOMIC_XCHG64(p, v) __atomic_exchange_n((p), (v), __ATOMIC_RELAXED)
+#define ALTDSS_PYTHON_ATOMIC_LOAD64(p) __atomic_load_n((p), __ATOMIC_RELAXED)
+#endif
+
+typedef struct {
+    int64_t calls;
+    int64_t nanoseconds;
+} altdss_python_prof_counter_t;
+
+static altdss_python_prof_counter_t altdss_python_prof_counters[ALTDSS_PYTHON_PROF_SIZE];
+
+static void altdss_python_prof_add(int32_t idx, double t0)
+{
+    int64_t elapsed = (int64_t)(1e9 * (altdss_python_now() - t0));
+    ALTDSS_PYTHON_ATOMIC_ADD64(&altdss_python_prof_counters[idx].calls, 1);
+    ALTDSS_PYTHON_ATOMIC_ADD64(&altdss_python_prof_counters[idx].nanoseconds, elapsed);
+}
+
+static int32_t altdss_python_prof_size(void)
+{
+    return ALTDSS_PYTHON_PROF_SIZE;
+}
+
+static const char* altdss_python_prof_name(int32_t idx)
+{
+    if (idx < 0 || idx >= ALTDSS_PYTHON_PROF_SIZE)
+        return NULL;
+
+    return altdss_python_prof_names[idx];
+}
+
+/* Copies the counters to the arrays (of ALTDSS_PYTHON_PROF_SIZE elements), optionally resetting them */
+static void altdss_python_prof_read(int64_t* calls, int64_t* nanoseconds, int32_t reset)
+{
+    int32_t idx;
+
+    for (idx = 0; idx < ALTDSS_PYTHON_PROF_SIZE; ++idx)
+    {
+        if (reset)
+        {
+            calls[idx] = ALTDSS_PYTHON_ATOMIC_XCHG64(&altdss_python_prof_counters[idx].calls, 0);
+            nanoseconds[idx] = ALTDSS_PYTHON_ATOMIC_XCHG64(&altdss_python_prof_counters[idx].nanoseconds, 0);
+        }
+        else
+        {
+            calls[idx] = ALTDSS_PYTHON_ATOMIC_LOAD64(&altdss_python_prof_counters[idx].calls);
+            nanoseconds[idx] = ALTDSS_PYTHON_ATOMIC_LOAD64(&altdss_python_prof_counters[idx].nanoseconds);
+        }
+    }
+}
+
+/* Wall time overhead of the clock reads of a wrapper, in seconds, for reference */
+static double altdss_python_prof_clock_overhead(void)
+{
+    double t0 = altdss_python_now(), t1;
+    int i;
+
+    for (i = 0; i < 1000; ++i)
+        t1 = altdss_python_now();
+
+    return (t1 - t0) / 1000;
+}
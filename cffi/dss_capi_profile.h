@@ -0,0 +1,5 @@
+
+int32_t altdss_python_prof_size(void);
+const char* altdss_python_prof_name(int32_t idx);
+void altdss_python_prof_read(int64_t* calls, int64_t* nanoseconds, int32_t reset);
+double altdss_python_prof_clock_overhead(void);
@@ -29,9 +29,11 @@ def process_header(src, extern_py=False, implement_py=False, prefix=''):
         )
         
     elif implement_py:
-        # Extract the parameters from the definitions and implement a 
-        # simple redirect to the Python-defined functions
+        # Extract the parameters from the definitions and implement a
+        # simple redirect to the Python-defined functions, or to native
+        # functions when bound through {prefix}set_native
         out_lines = []
+        names = []
         for line in src.split('\n'):
             if 'DSS_MODEL_DLL' not in line:
                 out_lines.append(line)
@@ -48,22 +50,87 @@ def process_header(src, extern_py=False, implement_py=False, prefix=''):
                     for p in match.group(3).split(',')
                 ]
             
+            names.append(name)
             out_lines.append(re.sub(
                 r'DSS_MODEL_DLL\(([^\)]+)\) \w+\((.*)\);',
                 r'''
 static \1 {prefix}{name}(\2);
+static \1 ({call_convention}*{prefix}native_{name})(\2) = NULL;
 DSS_MODEL_DLL(\1) {name}(\2)
 {{
-    {rtrn}{prefix}{name}({params});
+    if ({prefix}native_{name} == NULL)
+    {{
+        {rtrn}{prefix}{name}({params});
+    }}
+    else
+    {{
+        {rtrn}{prefix}native_{name}({params});
+    }}
 }}
-'''.format(rtrn=rtrn, name=name, prefix=prefix, params=', '.join(params)), 
+'''.format(rtrn=rtrn, name=name, prefix=prefix, params=', '.join(params), call_convention=call_convention),
                 line
             ))
-            
-        src = '\n'.join(out_lines)
+
+        # Binds (or unbinds, with NULL) a native implementation of a
+        # function; returns 0 if there is no function with the given name
+        out_lines.append('static int32_t {prefix}set_native(const char* name, void* func)\n{{'.format(prefix=prefix))
+        for name in names:
+            out_lines.append('''    if (strcmp(name, "{name}") == 0)
+    {{
+        *(void**)(&{prefix}native_{name}) = func;
+        return 1;
+    }}'''.format(name=name, prefix=prefix))
+
+        out_lines.append('    return 0;\n}')
+        src = '#include <string.h>\n' + '\n'.join(out_lines)
     
     return src
-    
+
+
+def profiling_source(src):
+    '''
+    Generate the C wrappers of the profiling version, which count the calls
+    and time of each ctx_* function declared in the (processed) header.
+    '''
+    funcs = {}
+    for rtype, name, params in re.findall(
+        r'^\s*((?:const\s+)?(?:void|char|double|u?int(?:8|16|32|64)_t)\s*\**)\s*(ctx_\w+)\s*\(([^;]*?)\)\s*;',
+        src,
+        flags=re.MULTILINE
+    ):
+        funcs.setdefault(name, (' '.join(rtype.split()), ' '.join(params.split())))
+
+    out_lines = [
+        '#define ALTDSS_PYTHON_PROF_SIZE {}'.format(len(funcs)),
+        'static const char* altdss_python_prof_names[] = {',
+    ]
+    out_lines.extend('    "{}",'.format(name) for name in funcs)
+    out_lines.append('};')
+    with open('cffi/dss_capi_profile.c', 'r') as f:
+        out_lines.append(f.read())
+
+    for idx, (name, (rtype, params)) in enumerate(funcs.items()):
+        if params in ('', 'void'):
+            args = []
+        else:
+            args = [re.findall(r'\w+', p)[-1] for p in params.split(',')]
+
+        call = '{}({})'.format(name, ', '.join(args))
+        if rtype == 'void':
+            body = '    {call};\n    altdss_python_prof_add({idx}, t0);'
+        else:
+            body = '    {rtype} result = {call};\n    altdss_python_prof_add({idx}, t0);\n    return result;'
+
+        out_lines.append(
+            ('static {rtype} altdss_python_prof_{name}({params})\n{{\n    double t0 = altdss_python_now();\n' + body + '\n}}').format(
+                rtype=rtype, name=name, params=params, call=call, idx=idx
+            )
+        )
+
+    # Only the calls through the module are redirected, not the ones from the custom code above
+    out_lines.extend('#define {0} altdss_python_prof_{0}'.format(name) for name in funcs)
+    return '\n'.join(out_lines) + '\n'
+
 extra = {}
 
 # This ensures the shared libraries in the module directory can be
@@ -76,9 +143,9 @@ ffi_builders = {}
 src_path = os.environ.get('SRC_DIR', '')
 DSS_CAPI_PATH = os.environ.get('DSS_CAPI_PATH', os.path.join(src_path, '..', 'dss_capi'))
     
-for version in ('', 'd'):
+# Release (''), debug ('d') and profiling ('p') versions
+for version in ('', 'd', 'p'):
     ffi_builder_dss = FFI()
-    debug = 'd' if version.endswith('d') else ''
 
     main_header_fn = os.path.join(DSS_CAPI_PATH, 'include', 'dss_capi.h')
     dss_capi_ctx_path = os.path.join(DSS_CAPI_PATH, 'include', 'dss_capi_ctx.h')
@@ -96,9 +163,11 @@ for version in ('', 'd'):
     with open(main_header_fn, 'r') as f:
         cffi_header_dss = process_header(f.read())
         
+    ctx_header_dss = ''
     if os.path.exists(dss_capi_ctx_path):
         with open(dss_capi_ctx_path, 'r') as f:
-            cffi_header_dss += process_header(f.read())
+            ctx_header_dss = process_header(f.read())
+            cffi_header_dss += ctx_header_dss
         
     with open('cffi/dss_capi_custom.h', 'r') as f:
         extra_header_dss = f.read()
@@ -112,10 +181,19 @@ for version in ('', 'd'):
         else:
             extra_source_dss = f.read()
     
+    lib_version = version
+    if version == 'p':
+        # The profiling version wraps the functions of the release library
+        lib_version = ''
+        with open('cffi/dss_capi_profile.h', 'r') as f:
+            cffi_header_dss += f.read()
+
+        extra_source_dss += profiling_source(ctx_header_dss)
+
     ffi_builder_dss.cdef(cffi_header_dss)
 
-    ffi_builder_dss.set_source("_dss_capi{}".format(debug), extra_source_dss,
-        libraries=["dss_capi{}".format(debug)],
+    ffi_builder_dss.set_source("_dss_capi{}".format(version), extra_source_dss,
+        libraries=["dss_capi{}".format(lib_version)],
         library_dirs=[
             os.path.join(DSS_CAPI_PATH, 'lib/{}'.format(PLATFORM_FOLDER))
         ],
@@ -137,10 +215,10 @@ with open(os.path.join(DSS_CAPI_PATH, 'include/dss_UserModels.h'), 'r') as f:
     
 user_models = [
     'GenUserModel',
-    # 'PVSystemUserModel',
-    # 'StoreDynaModel',
-    # 'StoreUserModel',
-    # 'CapUserControl',
+    'PVSystemUserModel',
+    'StoreDynaModel',
+    'StoreUserModel',
+    'CapUserControl',
 ]    
 
 for user_model in user_models:    
@@ -149,6 +227,7 @@ for user_model in user_models:
         
     prefix = "py{}_".format(user_model)
     user_model_def = process_header(func_def, extern_py=True, prefix=prefix)
+    user_model_def += '\nint32_t {prefix}set_native(const char* name, void* func);\n'.format(prefix=prefix)
     user_model_src = process_header(func_def, implement_py=True, prefix=prefix)
         
     ffi_builder = FFI()
@@ -167,11 +246,12 @@ for user_model in user_models:
 # needs a list of strings and cannot handle objects directly
 ffi_builder_ = ffi_builders['']
 ffi_builder_d = ffi_builders['d']
+ffi_builder_p = ffi_builders['p']
 ffi_builder_GenUserModel = ffi_builders['GenUserModel']
-#ffi_builder_PVSystemUserModel = ffi_builders['PVSystemUserModel']
-#ffi_builder_StoreDynaModel = ffi_builders['StoreDynaModel']
-#ffi_builder_StoreUserModel = ffi_builders['StoreUserModel']
-#ffi_builder_CapUserControl = ffi_builders['CapUserControl']
+ffi_builder_PVSystemUserModel = ffi_builders['PVSystemUserModel']
+ffi_builder_StoreDynaModel = ffi_builders['StoreDynaModel']
+ffi_builder_StoreUserModel = ffi_builders['StoreUserModel']
+ffi_builder_CapUserControl = ffi_builders['CapUserControl']
         
 if __name__ == "__main__":
     for version, builder in ffi_builders.items():
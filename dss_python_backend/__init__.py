@@ -3,21 +3,70 @@ The CFFI module is used to bind the native libs, by processing the DSS C-API hea
 
 Previous to DSS-Python version 0.14.0, this backend was included in the same module.
 
-For better maintenance and evolution of the Python-only code, the module was split in two. 
+For better maintenance and evolution of the Python-only code, the module was split in two.
+
+Set the environment variable DSS_PYTHON_BACKEND_LAZY=1 to defer loading the native
+library until `ffi` is first accessed, and calling `DSS_Start` until `lib` is first
+accessed. The enumerations (`enums`) are not imported by the package itself.
+
+Set DSS_PYTHON_BACKEND_PROFILE=1 to load the profiling build of the native module,
+which counts the calls and time of each `ctx_*` function (see `profiling`).
 '''
 
 import os
 
-if os.environ.get('DSS_EXTENSIONS_DEBUG', '') != '1':
-    from ._dss_capi import ffi, lib
+_module = None
+
+def _load_module():
+    global ffi, _module
+    if _module is not None:
+        return _module
+
+    if os.environ.get('DSS_PYTHON_BACKEND_PROFILE', '') == '1':
+        # Profiling build, which counts the calls and time of the ctx_* functions
+        from . import _dss_capip as module
+    elif os.environ.get('DSS_EXTENSIONS_DEBUG', '') != '1':
+        from . import _dss_capi as module
+    else:
+        import warnings
+        warnings.warn('Environment variable DSS_EXTENSIONS_DEBUG=1 is set: loading the debug version of the DSS C-API library')
+        from . import _dss_capid as module
+
+    ffi = module.ffi
+    _module = module
+    return module
+
+def _start():
+    global lib
+    module_lib = _load_module().lib
+
+    # Ensure this is called at least once. This was moved from
+    # CffiApiUtil so we call it as soon as the DLL/so is loaded.
+    module_lib.DSS_Start(0)
+    lib = module_lib
+
+if os.environ.get('DSS_PYTHON_BACKEND_LAZY', '') != '1':
+    _start()
 else:
-    import warnings
-    warnings.warn('Environment variable DSS_EXTENSIONS_DEBUG=1 is set: loading the debug version of the DSS C-API library')
-    from ._dss_capid import ffi, lib
+    import threading
+    _lazy_lock = threading.Lock()
+
+    def __getattr__(name):
+        if name == 'ffi':
+            # The FFI object does not require initializing the engine
+            with _lazy_lock:
+                _load_module()
+
+            return ffi
+
+        if name == 'lib':
+            with _lazy_lock:
+                if 'lib' not in globals():
+                    _start()
+
+            return lib
 
-# Ensure this is called at least once. This was moved from 
-# CffiApiUtil so we call it as soon as the DLL/so is loaded.
-lib.DSS_Start(0)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __version__ = '0.14.4'
 __all__ = ['ffi', 'lib']
@@ -0,0 +1,14 @@
+'''
+NumPy, for the modules that require it. NumPy is an optional dependency of
+this package (the `numpy` extra), so a missing installation is reported with
+the command to install it.
+'''
+try:
+    import numpy as np
+except ImportError as ex:
+    raise ImportError(
+        'This module of dss_python_backend requires NumPy; install it with '
+        '"pip install dss_python_backend[numpy]" (or "pip install numpy").'
+    ) from ex
+
+__all__ = ['np']
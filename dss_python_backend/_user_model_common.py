@@ -0,0 +1,54 @@
+'''
+Helpers shared by the Python implementations of the user models
+(`gen_user_model` and `python_user_models`). Each user-model module has its
+own FFI object, which is passed explicitly.
+
+Requires NumPy.
+'''
+from ._numpy import np
+
+
+def complex_view(ffi, ptr, count) -> np.ndarray:
+    '''Complex array over `count` values (pairs of doubles) at `ptr`, without copies.'''
+    return np.frombuffer(ffi.buffer(ptr, 16 * count), dtype=np.complex128)
+
+
+def write_name(ffi, name: str, dest, max_len: int):
+    '''Write `name` to `dest` as a null-terminated string, truncated to fit in `max_len` bytes.'''
+    data = name.encode()[:max(max_len - 1, 0)] + b'\0'
+    ffi.memmove(dest, data, len(data))
+
+
+class PerInstanceHandler:
+    '''
+    Dispatches the engine calls of a user model to one `model_cls` object per
+    element. Subclasses create the objects in `_new` and add them with `_add`;
+    the engine identifies them by the returned ID.
+    '''
+
+    def __init__(self, ffi, model_cls):
+        self.ffi = ffi
+        self.model_cls = model_cls
+        self.instances = {}
+        self.active = None
+        self._next_id = 1
+
+    def _add(self, model) -> int:
+        model_id = self._next_id
+        self._next_id += 1
+        self.active = self.instances[model_id] = model
+        return model_id
+
+    def _delete(self, model_id):
+        if self.instances.pop(model_id, None) is self.active:
+            self.active = None
+
+    def _has_instances(self):
+        return bool(self.instances)
+
+    def _select(self, model_id):
+        self.active = self.instances.get(model_id)
+        return model_id if self.active is not None else 0
+
+    def _views(self, V, I, count):
+        return complex_view(self.ffi, V, count), complex_view(self.ffi, I, count)
@@ -0,0 +1,173 @@
+'''
+asyncio adapter for the engine events of a DSS context.
+
+Events are captured on the thread running the engine and handed to the target
+event loop through `call_soon_threadsafe`. The queue is bounded: when it is
+full, the overflow policy decides what happens, and the engine thread never
+waits for the consumer.
+
+    async with AsyncEventStream(ctx, [AltDSSEvent.BuildSystemY]) as stream:
+        async for info in stream:
+            ...
+'''
+import asyncio
+import threading
+from collections import deque, namedtuple
+from . import ffi
+from .enums import AltDSSEvent
+from .events import get_manager_for_ctx, LEGACY_EVENTS
+
+EventInfo = namedtuple('EventInfo', ['event', 'step', 'ptr'])
+EventInfo.__doc__ = '''
+Event received from the engine. `ptr` is the raw address passed by the engine,
+as an integer; the data it points to is only valid during the event itself.
+'''
+
+OVERFLOW_POLICIES = (
+    'drop_oldest', # discard the oldest queued event to make room for the new one
+    'drop_newest', # discard the new event
+    'raise', # discard the new event and raise EventStreamOverflow in the consumer
+)
+
+
+class EventStreamOverflow(RuntimeError):
+    pass
+
+
+class AsyncEventStream:
+    '''
+    Async iterator over the selected events of a DSS context.
+
+    The events are delivered to `loop`, which defaults to the running loop.
+    Up to `maxsize` events are queued; see `OVERFLOW_POLICIES` for `overflow`.
+    The number of discarded events is available in `dropped`.
+    '''
+
+    def __init__(self, ctx, events=tuple(AltDSSEvent), loop=None, maxsize: int = 1024, overflow: str = 'drop_oldest'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Invalid overflow policy "{overflow}". Valid values: {OVERFLOW_POLICIES}')
+
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive.')
+
+        self.ctx = ctx
+        self.events = tuple(AltDSSEvent(evt) for evt in events)
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self._loop = loop if loop is not None else asyncio.get_running_loop()
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._waiter = None
+        self._wakeup_pending = False
+        self._overflowed = False
+        self._closed = False
+        self._handlers = {evt: self._make_handler(evt) for evt in self.events}
+        manager = get_manager_for_ctx(ctx)
+        for evt, handler in self._handlers.items():
+            manager.register_func(evt, handler)
+
+    def _make_handler(self, evt: AltDSSEvent):
+        push = self._push
+        if evt in LEGACY_EVENTS:
+            def handler():
+                push(EventInfo(evt, 0, 0))
+        else:
+            def handler(ctx, evt, step, ptr):
+                push(EventInfo(evt, step, int(ffi.cast('uintptr_t', ptr))))
+
+        return handler
+
+    def _push(self, info: EventInfo):
+        # Runs in the engine thread
+        with self._lock:
+            if self._closed:
+                return
+
+            if len(self._queue) >= self.maxsize:
+                self.dropped += 1
+                if self.overflow == 'drop_oldest':
+                    self._queue.popleft()
+                else:
+                    if self.overflow == 'raise':
+                        self._overflowed = True
+
+                    return
+
+            self._queue.append(info)
+            if self._wakeup_pending:
+                return
+
+            self._wakeup_pending = True
+
+        self._schedule_wakeup()
+
+    def _schedule_wakeup(self):
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup)
+        except RuntimeError:
+            # Event loop already closed
+            pass
+
+    def _wakeup(self):
+        # Runs in the event loop
+        with self._lock:
+            self._wakeup_pending = False
+            waiter = self._waiter
+
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def drain(self) -> list:
+        '''Remove and return all the queued events, without waiting.'''
+        with self._lock:
+            items = list(self._queue)
+            self._queue.clear()
+
+        return items
+
+    def close(self):
+        '''Unregister the handlers. Events already queued can still be consumed.'''
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+
+        manager = get_manager_for_ctx(self.ctx)
+        for evt, handler in self._handlers.items():
+            manager.unregister_func(evt, handler)
+
+        self._schedule_wakeup()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> EventInfo:
+        while True:
+            with self._lock:
+                if self._overflowed:
+                    self._overflowed = False
+                    raise EventStreamOverflow('Event queue overflow; events were discarded.')
+
+                if self._queue:
+                    return self._queue.popleft()
+
+                if self._closed:
+                    raise StopAsyncIteration
+
+                self._waiter = self._loop.create_future()
+
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+
+__all__ = ['AsyncEventStream', 'EventInfo', 'EventStreamOverflow', 'OVERFLOW_POLICIES']
@@ -0,0 +1,153 @@
+'''
+Bulk getters that write into buffers provided by the caller.
+
+The array getters of the DSS C-API allocate a result that then has to be
+copied and disposed of. The functions here run the equivalent GR getter and
+copy the result directly into a writable float64 array (e.g. a NumPy array),
+which can be reused across time steps:
+
+    volts = BulkReader(ctx, 'bus_volts', complex=True)
+    for step in range(8760):
+        ...
+        v = volts()  # same array at every step, no allocations
+
+`read_into` is the lower-level function, for callers that manage the
+output arrays themselves.
+
+Requires NumPy.
+'''
+import sys
+from ._numpy import np
+from . import ffi, lib
+
+# Name -> native getter; the class getters also require a class name
+GETTERS = {
+    'bus_volts': lib.altdss_python_bulk_bus_volts,
+    'bus_vmag': lib.altdss_python_bulk_bus_vmag,
+    'bus_vmag_pu': lib.altdss_python_bulk_bus_vmag_pu,
+    'element_losses': lib.altdss_python_bulk_element_losses,
+    'pd_currents': lib.altdss_python_bulk_pd_currents,
+    'pd_powers': lib.altdss_python_bulk_pd_powers,
+}
+
+CLASS_GETTERS = {
+    'class_currents': lib.altdss_python_bulk_class_currents,
+    'class_powers': lib.altdss_python_bulk_class_powers,
+}
+
+
+def _raise_error(ctx, name):
+    number = lib.ctx_Error_Get_Number(ctx)
+    if number == 0:
+        raise ValueError(f'Could not run the bulk getter "{name}" (invalid class name?)')
+
+    desc = ffi.string(lib.ctx_Error_Get_Description(ctx)).decode()
+    raise RuntimeError(f'(#{number}) {desc}')
+
+
+def _get_func(name, class_name):
+    if name in GETTERS:
+        if class_name is not None:
+            raise ValueError(f'The bulk getter "{name}" does not take a class name')
+
+        return GETTERS[name]
+
+    if name in CLASS_GETTERS:
+        if class_name is None:
+            raise ValueError(f'The bulk getter "{name}" requires a class name')
+
+        return CLASS_GETTERS[name]
+
+    raise ValueError(f'Unknown bulk getter "{name}"')
+
+
+# Buffer formats of native float64 values
+_FLOAT64_FORMATS = ('d', '=d', '@d', '<d' if sys.byteorder == 'little' else '>d')
+
+
+def _check_out(out):
+    try:
+        view = memoryview(out)
+    except TypeError:
+        raise TypeError(f'Expected a float64 buffer (e.g. a NumPy array) for the output, got {type(out).__name__}') from None
+
+    with view:
+        if view.format not in _FLOAT64_FORMATS:
+            raise TypeError(f'The output buffer must contain float64 values (buffer format "{view.format}")')
+
+        if not view.c_contiguous:
+            raise ValueError('The output buffer must be C-contiguous')
+
+        if view.readonly:
+            raise ValueError('The output buffer must be writable')
+
+
+def _call(ctx, name, func, class_name, out_ptr, capacity):
+    if class_name is None:
+        count = func(ctx, out_ptr, capacity)
+    else:
+        count = func(ctx, class_name, out_ptr, capacity)
+
+    if count < 0:
+        _raise_error(ctx, name)
+
+    return count
+
+
+def read_into(ctx, name: str, out, class_name: str = None) -> int:
+    '''
+    Run the bulk getter `name` and write the result to `out`, a writable,
+    C-contiguous float64 buffer (TypeError or ValueError otherwise). Returns
+    the number of values in the result; if it is larger than the number of
+    values in `out`, nothing is written, so the caller can grow the buffer
+    and retry.
+    '''
+    func = _get_func(name, class_name)
+    _check_out(out)
+    if class_name is not None:
+        class_name = class_name.encode()
+
+    out_ptr = ffi.from_buffer('double[]', out, require_writable=True)
+    return _call(ctx, name, func, class_name, out_ptr, len(out_ptr))
+
+
+class BulkReader:
+    '''
+    Reads the bulk getter `name` into an array owned by the reader, grown as
+    required. Calling the reader returns a view of the current result, which
+    is overwritten by the next call; use `.copy()` to keep the data.
+
+    With `complex=True`, the result is viewed as complex128.
+    '''
+
+    def __init__(self, ctx, name: str, class_name: str = None, complex: bool = False, capacity: int = 0):
+        self.ctx = ctx
+        self.name = name
+        self.complex = complex
+        self._func = _get_func(name, class_name)
+        self._class_name = class_name.encode() if class_name is not None else None
+        self._view = None
+        self._count = -1
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.out = np.zeros(max(capacity, 1), dtype=np.float64)
+        self._out_ptr = ffi.from_buffer('double[]', self.out, require_writable=True)
+        self._count = -1
+
+    def __call__(self) -> np.ndarray:
+        count = _call(self.ctx, self.name, self._func, self._class_name, self._out_ptr, len(self.out))
+        if count > len(self.out):
+            # The result did not fit; grow with some headroom and read again
+            self._allocate(count + count // 4)
+            count = _call(self.ctx, self.name, self._func, self._class_name, self._out_ptr, len(self.out))
+
+        if count != self._count:
+            view = self.out[:count]
+            self._view = view.view(np.complex128) if self.complex else view
+            self._count = count
+
+        return self._view
+
+
+__all__ = ['BulkReader', 'read_into', 'GETTERS', 'CLASS_GETTERS']
@@ -0,0 +1,90 @@
+'''
+Bulk submission of DSS commands.
+
+Instead of one `ctx_Text_Set_Command` call (and one string encoding) per
+command, the commands are packed in chunks: each chunk is encoded once into a
+single NUL-separated block and run by a native loop
+(`altdss_python_run_commands`), which stops at the first error. Any iterable
+of commands is accepted, so very large models can be streamed without
+building the whole list:
+
+    def loads():
+        for i, (bus, kw) in enumerate(data):
+            yield f'new load.ld{i} bus1={bus} kw={kw}'
+
+    count = submit_commands(ctx, loads(), chunk_size=10000)
+
+    with open('model.dss') as f:
+        submit_commands(ctx, f)
+
+Trailing line breaks are removed from the commands; block comments are not
+supported. A failing command raises `CommandError`, with the index of the
+command in the whole sequence; the commands after it are not run. Commands
+containing NUL characters are rejected with `ValueError` before the chunk is
+run.
+'''
+from itertools import islice
+from . import ffi, lib
+
+
+class CommandError(RuntimeError):
+    '''
+    Error running a command, at position `index` (0-based) of the submitted
+    commands. `number` and `description` come from the DSS engine.
+    '''
+
+    def __init__(self, index: int, command: str, number: int, description: str):
+        super().__init__(f'(#{number}) {description} [command {index}: {command!r}]')
+        self.index = index
+        self.command = command
+        self.number = number
+        self.description = description
+
+
+def _run_chunk(ctx, chunk, start):
+    block = '\0'.join(chunk)
+    if '\n' in block:
+        # e.g. lines read from a file
+        block = '\0'.join(cmd.rstrip('\r\n') for cmd in chunk)
+
+    if block.count('\0') != len(chunk) - 1:
+        # An embedded NUL would split a command in two and shift the indices
+        idx = next(idx for idx, cmd in enumerate(chunk) if '\0' in cmd)
+        raise ValueError(f'Command {start + idx} contains a NUL character: {chunk[idx]!r}')
+
+    block = (block + '\0').encode()
+    failed = lib.altdss_python_run_commands(ctx, ffi.from_buffer(block), len(chunk))
+    if failed >= 0:
+        number = lib.ctx_Error_Get_Number(ctx)
+        description = ffi.string(lib.ctx_Error_Get_Description(ctx)).decode()
+        raise CommandError(start + failed, chunk[failed], number, description)
+
+
+def submit_commands(ctx, commands, chunk_size: int = 10000) -> int:
+    '''
+    Run the DSS `commands` (an iterable of strings, or a single string with one
+    command per line) in chunks of `chunk_size`. Returns the number of
+    commands run; raises `CommandError` on the first failing command, or
+    `ValueError` for a command with a NUL character.
+    '''
+    if isinstance(commands, str):
+        commands = commands.splitlines()
+
+    if isinstance(commands, (list, tuple)):
+        for start in range(0, len(commands), chunk_size):
+            _run_chunk(ctx, commands[start:start + chunk_size], start)
+
+        return len(commands)
+
+    commands = iter(commands)
+    start = 0
+    while True:
+        chunk = list(islice(commands, chunk_size))
+        if not chunk:
+            return start
+
+        _run_chunk(ctx, chunk, start)
+        start += len(chunk)
+
+
+__all__ = ['CommandError', 'submit_commands']
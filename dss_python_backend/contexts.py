@@ -0,0 +1,54 @@
+'''
+Lifetime of the per-context state kept by the Python modules.
+
+Several modules keep objects per DSS context (the event managers, GR views,
+name and Y matrix caches), keyed by the address of the context. The engine
+reuses the addresses of disposed contexts for new ones, so this state must be
+dropped when a context is disposed; otherwise a new context could get the
+objects (and the event handlers) of the old one. Use `dispose_ctx` instead of
+`lib.ctx_Dispose`, or call `forget_ctx` before disposing the context:
+
+    ctx = lib.ctx_New()
+    ...
+    dispose_ctx(ctx)
+'''
+import threading
+from . import ffi, lib
+
+_forget_hooks = []
+_hooks_lock = threading.Lock()
+
+
+def ctx_key(ctx):
+    '''Key of the context in the per-context registries (a `void*`, hashed by address).'''
+    return ffi.cast('void*', ctx)
+
+
+def register_forget_hook(func):
+    '''
+    Register `func(ctx)`, called by `forget_ctx` to drop the state of a
+    context. The hooks are called in reverse order of registration, so
+    modules built on others (e.g. on the event managers) are cleaned first.
+    '''
+    with _hooks_lock:
+        _forget_hooks.append(func)
+
+    return func
+
+
+def forget_ctx(ctx):
+    '''Drop all the per-context state of `ctx`. The context itself is kept.'''
+    with _hooks_lock:
+        hooks = _forget_hooks[::-1]
+
+    for hook in hooks:
+        hook(ctx)
+
+
+def dispose_ctx(ctx):
+    '''Drop the per-context state of `ctx` (see `forget_ctx`) and dispose the context.'''
+    forget_ctx(ctx)
+    lib.ctx_Dispose(ctx)
+
+
+__all__ = ['ctx_key', 'register_forget_hook', 'forget_ctx', 'dispose_ctx']
@@ -0,0 +1,129 @@
+'''
+Vectorized helpers for the enumerations in `enums`, working on whole NumPy
+integer arrays (e.g. object flags, storage states or load statuses of every
+element) instead of converting element by element with `DSSObjectFlags(x)`.
+
+    mask = has_flags(flags, DSSObjectFlags.HasOCPDevice | DSSObjectFlags.IsIsolated)
+    names = enum_names(states, StorageStates)
+    columns = split_flags(flags, DSSObjectFlags)
+
+Requires NumPy.
+'''
+from functools import lru_cache
+from ._numpy import np
+
+# Dense lookup tables are used when the range of codes is at most this size;
+# sparse enumerations use a binary search over the sorted codes.
+_MAX_DENSE_SPAN = 1024
+
+
+@lru_cache(maxsize=None)
+def _lookup_table(enum_type):
+    members = sorted(enum_type, key=int)
+    codes = np.array([int(m) for m in members], dtype=np.int64)
+    names = np.array([m.name for m in members])
+    objs = np.empty(len(members), dtype=object)
+    objs[:] = members
+    offset = int(codes[0])
+    span = int(codes[-1]) - offset + 1
+    if span > _MAX_DENSE_SPAN:
+        return codes, names, objs, None, offset
+
+    # -1 marks codes without a member
+    dense = np.full(span, -1, dtype=np.int64)
+    dense[codes - offset] = np.arange(len(members))
+    return codes, names, objs, dense, offset
+
+
+def _member_index(values, enum_type):
+    '''Index of each value in the (sorted) members of the enum; -1 if not a member.'''
+    codes, _, _, dense, offset = _lookup_table(enum_type)
+    values = np.asarray(values, dtype=np.int64)
+    if dense is not None:
+        pos = values - offset
+        valid = (pos >= 0) & (pos < len(dense))
+        idx = np.full(values.shape, -1, dtype=np.int64)
+        idx[valid] = dense[pos[valid]]
+        return idx
+
+    idx = np.searchsorted(codes, values)
+    np.clip(idx, 0, len(codes) - 1, out=idx)
+    return np.where(codes[idx] == values, idx, -1)
+
+
+def has_flags(values, flags, require_all: bool = True) -> np.ndarray:
+    '''
+    Boolean mask of the elements that have the given flags set. With
+    `require_all=False`, any of the flags suffices.
+    '''
+    values = np.asarray(values)
+    flags = int(flags)
+    masked = values & flags
+    if require_all:
+        return masked == flags
+
+    return masked != 0
+
+
+def split_flags(values, flag_type) -> dict:
+    '''
+    Split an array of bit flags in one boolean column per member of `flag_type`
+    (an IntFlag class). Returns a dict of member name to boolean array, which can
+    be passed directly to e.g. `pandas.DataFrame`.
+    '''
+    values = np.asarray(values)
+    return {
+        member.name: (values & int(member)) != 0
+        for member in flag_type
+        if int(member) != 0
+    }
+
+
+def enum_names(values, enum_type, default: str = '') -> np.ndarray:
+    '''
+    Map an array of codes to the names of the `enum_type` members, as an array
+    of strings. Codes that are not members are mapped to `default`.
+    '''
+    _, names, _, _, _ = _lookup_table(enum_type)
+    idx = _member_index(values, enum_type)
+    table = np.append(names, default)
+    return table[idx]
+
+
+def enum_members(values, enum_type, default=None) -> np.ndarray:
+    '''
+    Map an array of codes to the `enum_type` members, as an object array.
+    Codes that are not members are mapped to `default`.
+    '''
+    _, _, objs, _, _ = _lookup_table(enum_type)
+    idx = _member_index(values, enum_type)
+    table = np.empty(len(objs) + 1, dtype=object)
+    table[:-1] = objs
+    table[-1] = default
+    return table[idx]
+
+
+def is_member(values, enum_type) -> np.ndarray:
+    '''Boolean mask of the codes that are valid members of `enum_type`.'''
+    return _member_index(values, enum_type) >= 0
+
+
+def enum_codes(names, enum_type, default: int = -1) -> np.ndarray:
+    '''
+    Map an array of member names (case-sensitive) to their codes. Only the
+    unique names are looked up; unknown names are mapped to `default`.
+    '''
+    unique, inverse = np.unique(np.asarray(names), return_inverse=True)
+    members = enum_type.__members__
+    codes = np.array([int(members[n]) if n in members else default for n in unique.tolist()], dtype=np.int64)
+    return codes[inverse].reshape(np.shape(names))
+
+
+__all__ = [
+    'enum_codes',
+    'enum_members',
+    'enum_names',
+    'has_flags',
+    'is_member',
+    'split_flags',
+]
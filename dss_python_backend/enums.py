@@ -452,6 +452,25 @@ class AltDSSEvent(IntEnum):
     BuildSystemY = 5
 
 
+class DSSMessageType(IntEnum):
+    """
+    Types of the messages passed to the message (write) callback
+    """
+    Error = -1
+    General = 0
+    Info = 1
+    Help = 2
+    Progress = 3
+    ProgressCaption = 4
+    ProgressFormCaption = 5
+    ProgressPercent = 6
+    FireOffEditor = 7
+    ProgressSummary = 8
+    ReportOutput = 9
+    ShowOutput = 10
+    ShowTreeView = 11
+
+
 class DSSPropertyNameStyle(IntEnum):
     """
     This enum is used in the PropertyNameStyle property to control the naming convention.
@@ -1057,6 +1076,7 @@ __all__ = [
     'CoreType',
     'DSSCompatFlags',
     'DSSJSONFlags',
+    'DSSMessageType',
     'DSSObjectFlags',
     'DSSPropertyNameStyle',
     'DSSSaveFlags',
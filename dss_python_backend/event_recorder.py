@@ -0,0 +1,147 @@
+'''
+Native event recorder: a C-side AltDSS event handler that only appends
+(ctx, eventCode, step, ptr, timestamp) records to a preallocated ring buffer,
+without entering Python. The records are drained in batches as a NumPy
+structured array, e.g. once per solution or once per time step.
+
+When the buffer is full, new records are dropped and counted (see `dropped`);
+the engine never blocks waiting for Python.
+
+Requires NumPy.
+'''
+import threading
+from ._numpy import np
+from . import ffi, lib
+from .enums import AltDSSEvent
+from .events import get_manager_for_ctx
+
+# Matches the layout of the C struct, including padding
+EVENT_RECORD_DTYPE = np.dtype({
+    'names': ['ctx', 'eventCode', 'step', 'ptr', 'timestamp'],
+    'formats': [np.uintp, np.int32, np.int32, np.uintp, np.float64],
+    'offsets': [
+        ffi.offsetof('altdss_python_event_record_t', field)
+        for field in ('ctx', 'eventCode', 'step', 'ptr', 'timestamp')
+    ],
+    'itemsize': ffi.sizeof('altdss_python_event_record_t'),
+})
+
+_RECORDER_CALLBACK = ffi.addressof(lib, 'altdss_python_recorder_callback')
+
+# The native callback serves all recorders of a context, so it is registered
+# once per (context, event); this counts the open recorders using each one.
+_registrations = {}
+_registrations_lock = threading.Lock()
+
+
+def _register(ctx, events):
+    manager = get_manager_for_ctx(ctx)
+    ctx_key = ffi.cast('void*', ctx)
+    with _registrations_lock:
+        for evt in events:
+            key = (ctx_key, evt)
+            count = _registrations.get(key, 0)
+            if count == 0:
+                manager.register_func(evt, _RECORDER_CALLBACK)
+
+            _registrations[key] = count + 1
+
+
+def _unregister(ctx, events):
+    manager = get_manager_for_ctx(ctx)
+    ctx_key = ffi.cast('void*', ctx)
+    with _registrations_lock:
+        for evt in events:
+            key = (ctx_key, evt)
+            count = _registrations.pop(key, 0) - 1
+            if count > 0:
+                _registrations[key] = count
+            else:
+                manager.unregister_func(evt, _RECORDER_CALLBACK)
+
+
+def recorder_time() -> float:
+    '''Current value of the monotonic clock used for the record timestamps, in seconds.'''
+    return lib.altdss_python_recorder_time()
+
+
+class EventRecorder:
+    '''
+    Records the given events of a DSS context in a native ring buffer of `capacity` records.
+
+    The handler is registered through the context's `EventCallbackManager`, so
+    `unregister_all` and the cleanup at exit also cover it. Several recorders
+    can be open on the same context; each one receives all of its events.
+    '''
+
+    def __init__(self, ctx, events=tuple(AltDSSEvent), capacity: int = 65536):
+        self.ctx = ctx
+        self.capacity = capacity
+        self.events = tuple(dict.fromkeys(AltDSSEvent(evt) for evt in events))
+        self._buffer = np.zeros(capacity, dtype=EVENT_RECORD_DTYPE)
+        self._rec = lib.altdss_python_recorder_new(
+            ctx,
+            ffi.from_buffer('altdss_python_event_record_t[]', self._buffer, require_writable=True),
+            capacity,
+            sum(1 << evt for evt in self.events)
+        )
+        if self._rec == ffi.NULL:
+            raise RuntimeError('Could not create the event recorder.')
+
+        self._rec = ffi.gc(self._rec, lib.altdss_python_recorder_free)
+        _register(ctx, self.events)
+
+    def close(self):
+        '''Unregister the recorder from the engine and release the native state.'''
+        if self._rec is None:
+            return
+
+        _unregister(self.ctx, self.events)
+        rec, self._rec = self._rec, None
+        ffi.release(rec)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        '''Number of records waiting to be drained'''
+        return lib.altdss_python_recorder_pending(self._rec)
+
+    @property
+    def dropped(self) -> int:
+        '''Number of records dropped since the last reset, due to a full buffer'''
+        return lib.altdss_python_recorder_dropped(self._rec, 0)
+
+    def reset_dropped(self) -> int:
+        '''Reset the dropped counter, returning the previous value'''
+        return lib.altdss_python_recorder_dropped(self._rec, 1)
+
+    def drain(self, out: np.ndarray = None) -> np.ndarray:
+        '''
+        Move the pending records, oldest first, to a structured array (dtype `EVENT_RECORD_DTYPE`).
+
+        If `out` is provided, up to `len(out)` records are written to it and
+        a view of the filled part is returned; this allows draining repeatedly
+        without allocations.
+        '''
+        if out is None:
+            out = np.empty(self.pending, dtype=EVENT_RECORD_DTYPE)
+        elif out.dtype != EVENT_RECORD_DTYPE:
+            raise TypeError('Output array must use EVENT_RECORD_DTYPE')
+
+        if len(out) == 0:
+            return out
+
+        n = lib.altdss_python_recorder_drain(
+            self._rec,
+            ffi.from_buffer('altdss_python_event_record_t[]', out, require_writable=True),
+            len(out)
+        )
+        return out[:n]
+
+
+__all__ = ['EventRecorder', 'EVENT_RECORD_DTYPE', 'recorder_time']
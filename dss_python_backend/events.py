@@ -1,6 +1,7 @@
-import atexit
-from weakref import WeakKeyDictionary
+import atexit, sys, threading
+from time import perf_counter
 from .enums import AltDSSEvent
+from .contexts import ctx_key, register_forget_hook
 from . import ffi, lib
 
 LEGACY_EVENTS = (
@@ -9,97 +10,342 @@ LEGACY_EVENTS = (
     AltDSSEvent.Legacy_StepControls,
 )
 
-class EventCallbackManager:
-    _ctx_to_manager = WeakKeyDictionary()
+# Event codes are small and contiguous, so the dispatch tables are plain lists
+# indexed directly by the integer code received from the engine.
+_EVENTS = tuple(sorted(AltDSSEvent))
+_NUM_EVENTS = int(_EVENTS[-1]) + 1
 
-    def __init__(self, ctx):
-        if ctx in EventCallbackManager._ctx_to_manager:
-            raise ValueError('This context already has a manager. Use "get_manager_for_ctx" to get it.')
+# Context pointer (non-owning cdata, hashed by address) -> dispatch table.
+# This is what the native callback uses; kept apart from the managers to
+# avoid an extra lookup for every event. Both are keyed by `ctx_key` and
+# dropped by `forget_ctx` when the context is disposed.
+#
+# Thread-safety: the dispatch path takes no locks. Each table is only changed
+# by replacing whole entries (list item assignment), and the dispatchers hold
+# immutable tuples of handlers (copy-on-write), so a thread dispatching events
+# always sees a consistent set of handlers. Changes to the handlers are
+# serialized by a lock per manager; the global lock is only used when a
+# manager is created or all managers are visited.
+_dispatch_tables = {}
+_managers = {}
+_managers_lock = threading.RLock()
+
+
+def _make_dispatcher(evt: AltDSSEvent, handlers: tuple):
+    '''
+    Build the function that calls all the handlers of an event. The decision on
+    the call signature is made here, once per (un)registration, instead of once
+    per event.
+    '''
+    if not handlers:
+        return None
+
+    # No arguments for legacy (classic COM impl.) OpenDSS events
+    if evt in LEGACY_EVENTS:
+        if len(handlers) == 1:
+            handler, = handlers
+            def dispatch(ctx, step, ptr):
+                handler()
+        else:
+            def dispatch(ctx, step, ptr):
+                for handler in handlers:
+                    handler()
+
+        return dispatch
+
+    if len(handlers) == 1:
+        handler, = handlers
+        def dispatch(ctx, step, ptr):
+            handler(ctx, evt, step, ptr)
+    else:
+        def dispatch(ctx, step, ptr):
+            for handler in handlers:
+                handler(ctx, evt, step, ptr)
+
+    return dispatch
+
+
+def _make_timed_dispatcher(evt: AltDSSEvent, handlers: tuple, event_stats: list, handler_stats: dict):
+    '''
+    Same as `_make_dispatcher`, but also accumulates [count, total time, max time]
+    for the event and for each handler. Only used when the statistics are enabled.
+    '''
+    if not handlers:
+        return None
+
+    entries = tuple(
+        (handler, handler_stats.setdefault(handler, [0, 0.0, 0.0]))
+        for handler in handlers
+    )
+    no_args = evt in LEGACY_EVENTS
+
+    def dispatch(ctx, step, ptr):
+        t_event = perf_counter()
+        for handler, stats in entries:
+            t = perf_counter()
+            if no_args:
+                handler()
+            else:
+                handler(ctx, evt, step, ptr)
+
+            dt = perf_counter() - t
+            stats[0] += 1
+            stats[1] += dt
+            if dt > stats[2]:
+                stats[2] = dt
+
+        dt = perf_counter() - t_event
+        event_stats[0] += 1
+        event_stats[1] += dt
+        if dt > event_stats[2]:
+            event_stats[2] = dt
+
+    return dispatch
+
+
+def _as_native_callback(func):
+    '''
+    Return the function pointer (as `altdss_callback_event_t`) for handlers
+    implemented in native code, or None for Python callables.
+
+    Accepted native handlers are cffi function pointers, raw addresses (e.g.
+    `numba.cfunc(...).address`) and ctypes function pointers.
+    '''
+    if isinstance(func, ffi.CData):
+        return ffi.cast('altdss_callback_event_t', func)
+
+    if isinstance(func, int):
+        if func == 0:
+            raise ValueError('Null pointer cannot be used as an event handler.')
 
-        EventCallbackManager._ctx_to_manager[ctx] = self
+        return ffi.cast('altdss_callback_event_t', func)
+
+    ctypes = sys.modules.get('ctypes')
+    if ctypes is not None and isinstance(func, ctypes._CFuncPtr):
+        return ffi.cast('altdss_callback_event_t', ctypes.cast(func, ctypes.c_void_p).value)
+
+    return None
+
+
+class EventCallbackManager:
+    def __init__(self, ctx):
         self.ctx = ctx
+        self._lock = threading.RLock()
         for evt_type in AltDSSEvent:
-            setattr(self, evt_type.name, [])
+            setattr(self, evt_type.name, ())
+
+        self._dispatch = [None] * _NUM_EVENTS
+        # Native handlers, registered directly in the engine: for each event,
+        # a tuple of (function pointer, original object) pairs. The original
+        # object is kept to ensure ctypes/numba pointers stay alive.
+        self._native_handlers = [()] * _NUM_EVENTS
+        self._stats_enabled = False
+        self._event_stats = [[0, 0.0, 0.0] for _ in range(_NUM_EVENTS)]
+        self._handler_stats = [{} for _ in range(_NUM_EVENTS)]
+        self._ctx_key = ctx_key(ctx)
+        with _managers_lock:
+            if self._ctx_key in _managers:
+                raise ValueError('This context already has a manager. Use "get_manager_for_ctx" to get it.')
+
+            _managers[self._ctx_key] = self
+            _dispatch_tables[self._ctx_key] = self._dispatch
+
 
+    def _set_handlers(self, evt: AltDSSEvent, handlers: tuple):
+        setattr(self, evt.name, handlers)
+        if self._stats_enabled:
+            self._dispatch[evt] = _make_timed_dispatcher(evt, handlers, self._event_stats[evt], self._handler_stats[evt])
+        else:
+            self._dispatch[evt] = _make_dispatcher(evt, handlers)
+
+    @property
+    def stats_enabled(self) -> bool:
+        return self._stats_enabled
+
+    def enable_stats(self, enabled: bool = True):
+        '''
+        Enable or disable the timing statistics for the Python handlers of this context.
+
+        When enabled, the call count, total time and maximum time (in seconds) are
+        tracked for each event and for each handler. When disabled (default), the
+        handlers are called exactly as before, without any overhead. Native
+        handlers are not included.
+        '''
+        with self._lock:
+            self._stats_enabled = bool(enabled)
+            for evt in AltDSSEvent:
+                self._set_handlers(evt, getattr(self, evt.name))
+
+    def reset_stats(self):
+        '''Zero all the timing statistics, and forget handlers that are not registered anymore.'''
+        with self._lock:
+            for evt in AltDSSEvent:
+                for stats in (self._event_stats[evt], *self._handler_stats[evt].values()):
+                    stats[:] = (0, 0.0, 0.0)
+
+                registered = getattr(self, evt.name)
+                handler_stats = self._handler_stats[evt]
+                for handler in [h for h in handler_stats if h not in registered]:
+                    del handler_stats[handler]
+
+    def get_stats(self) -> dict:
+        '''
+        Snapshot of the timing statistics. Returns a dict with:
+
+        - "events": maps each AltDSSEvent to a dict with "count", "total" and "max"
+        - "handlers": list of dicts with "event", "handler", "count", "total" and "max",
+          sorted by total time, slowest first
+        '''
+        events = {}
+        handlers = []
+        with self._lock:
+            for evt in AltDSSEvent:
+                count, total, max_time = self._event_stats[evt]
+                events[evt] = dict(count=count, total=total, max=max_time)
+                for handler, (count, total, max_time) in self._handler_stats[evt].items():
+                    handlers.append(dict(event=evt, handler=handler, count=count, total=total, max=max_time))
+
+        handlers.sort(key=lambda h: h['total'], reverse=True)
+        return dict(events=events, handlers=handlers)
 
     def unregister_all(self):
-        for evt_type in AltDSSEvent:
-            handlers = getattr(self, evt_type.name)
-            if not handlers:
-                continue
+        with self._lock:
+            for evt_type in AltDSSEvent:
+                for native_func, _ in self._native_handlers[evt_type]:
+                    lib.ctx_DSSEvents_UnregisterAlt(self.ctx, evt_type, native_func)
+
+                self._native_handlers[evt_type] = ()
+                handlers = getattr(self, evt_type.name)
+                if not handlers:
+                    continue
 
-            handlers[:] = []
-            lib.ctx_DSSEvents_UnregisterAlt(
-                self.ctx,
-                evt_type,
-                lib.altdss_python_util_callback
-            )
+                self._set_handlers(evt_type, ())
+                lib.ctx_DSSEvents_UnregisterAlt(
+                    self.ctx,
+                    evt_type,
+                    lib.altdss_python_util_callback
+                )
 
     def __del__(self):
+        if _dispatch_tables.get(getattr(self, '_ctx_key', None)) is not getattr(self, '_dispatch', None):
+            # Failed initialization, another manager owns the context
+            return
+
         self.unregister_all()
+        _dispatch_tables.pop(self._ctx_key, None)
 
     def register_func(self, evt: AltDSSEvent, func) -> bool:
-        handlers = getattr(self, AltDSSEvent(evt).name)
-        if len(handlers) == 0:
-            if lib.ctx_DSSEvents_RegisterAlt(
-                self.ctx,
-                evt,
-                lib.altdss_python_util_callback
-            ) == 0:
-                raise RuntimeError('Could not register main callback function.')
-
-        if func in handlers:
-            return False
+        '''
+        Register a handler for the event. Python callables are called through the
+        shared Python callback; native function pointers (cffi, ctypes, or raw
+        addresses) are registered directly in the engine and never enter Python.
 
-        handlers.append(func)
-        return True
+        Returns False if the handler was already registered.
+        '''
+        evt = AltDSSEvent(evt)
+        native_func = _as_native_callback(func)
+        with self._lock:
+            if native_func is not None:
+                return self._register_native(evt, native_func, func)
 
-    def unregister_func(self, evt: AltDSSEvent, func) -> bool:
-        handlers = getattr(self, AltDSSEvent(evt).name)
-        prev_len = len(handlers)
-        handlers[:] = [f for f in handlers if f is not func]
-        if len(handlers) == 0:
-            lib.ctx_DSSEvents_UnregisterAlt(
-                self.ctx,
-                evt,
-                lib.altdss_python_util_callback
-            )
+            handlers = getattr(self, evt.name)
+            if len(handlers) == 0:
+                if lib.ctx_DSSEvents_RegisterAlt(
+                    self.ctx,
+                    evt,
+                    lib.altdss_python_util_callback
+                ) == 0:
+                    raise RuntimeError('Could not register main callback function.')
 
-        return prev_len != len(handlers)
+            if func in handlers:
+                return False
 
+            self._set_handlers(evt, handlers + (func,))
+            return True
 
-    def handle_event(self, ctx, evt: AltDSSEvent, step: int, ptr):
+    def unregister_func(self, evt: AltDSSEvent, func) -> bool:
         evt = AltDSSEvent(evt)
-        handlers = getattr(self, evt.name)
+        native_func = _as_native_callback(func)
+        with self._lock:
+            if native_func is not None:
+                return self._unregister_native(evt, native_func)
 
-        # No arguments for legacy (classic COM impl.) OpenDSS events
-        if evt in LEGACY_EVENTS:
-            for handler in handlers:
-                handler()
+            prev_handlers = getattr(self, evt.name)
+            handlers = tuple(f for f in prev_handlers if f is not func)
+            self._set_handlers(evt, handlers)
+            if len(handlers) == 0:
+                lib.ctx_DSSEvents_UnregisterAlt(
+                    self.ctx,
+                    evt,
+                    lib.altdss_python_util_callback
+                )
 
-            return
+            return len(prev_handlers) != len(handlers)
 
-        for handler in handlers:
-            handler(ctx, evt, step, ptr)
+    def _register_native(self, evt: AltDSSEvent, native_func, func) -> bool:
+        handlers = self._native_handlers[evt]
+        if any(f == native_func for f, _ in handlers):
+            return False
+
+        if lib.ctx_DSSEvents_RegisterAlt(self.ctx, evt, native_func) == 0:
+            raise RuntimeError('Could not register native callback function.')
+
+        self._native_handlers[evt] = handlers + ((native_func, func),)
+        return True
+
+    def _unregister_native(self, evt: AltDSSEvent, native_func) -> bool:
+        prev_handlers = self._native_handlers[evt]
+        handlers = tuple((f, obj) for f, obj in prev_handlers if f != native_func)
+        if len(handlers) == len(prev_handlers):
+            return False
+
+        self._native_handlers[evt] = handlers
+        lib.ctx_DSSEvents_UnregisterAlt(self.ctx, evt, native_func)
+        return True
+
+    def handle_event(self, ctx, evt: AltDSSEvent, step: int, ptr):
+        dispatch = self._dispatch[evt]
+        if dispatch is not None:
+            dispatch(ctx, step, ptr)
 
 
 
 def get_manager_for_ctx(ctx) -> EventCallbackManager:
-    m = EventCallbackManager._ctx_to_manager.get(ctx)
-    if m is None:
-        m = EventCallbackManager(ctx)
+    key = ctx_key(ctx)
+    m = _managers.get(key)
+    if m is not None:
+        return m
+
+    with _managers_lock:
+        m = _managers.get(key)
+        if m is None:
+            m = EventCallbackManager(ctx)
 
     return m
 
 
+@register_forget_hook
+def _forget_manager(ctx):
+    key = ctx_key(ctx)
+    with _managers_lock:
+        m = _managers.pop(key, None)
+        if m is None:
+            return
+
+        m.unregister_all()
+        _dispatch_tables.pop(key, None)
+
+
 @ffi.def_extern()
 def altdss_python_util_callback(ctx, eventCode: int, step: int, ptr):
-    m = EventCallbackManager._ctx_to_manager.get(ctx)
-    if m is None:
+    table = _dispatch_tables.get(ctx)
+    if table is None:
         return
 
     try:
-        m.handle_event(ctx, eventCode, step, ptr)
+        dispatch = table[eventCode]
+        if dispatch is not None:
+            dispatch(ctx, step, ptr)
 
     except Exception as ex:
         err_ptr = lib.ctx_Error_Get_NumberPtr(ctx)
@@ -112,7 +358,10 @@ def _remove_callbacks():
     Remove all callbacks at exit. Since the native library may outlive the Python callbacks,
     we need to remove the callbacks here to ensure they are not called.
     '''
-    for ctx_mgr in EventCallbackManager._ctx_to_manager.values():
+    with _managers_lock:
+        managers = list(_managers.values())
+
+    for ctx_mgr in managers:
         ctx_mgr.unregister_all()
 
 atexit.register(_remove_callbacks)
@@ -0,0 +1,522 @@
+'''
+Python implementations of generator user models (`Generator.UserModel`),
+through the `_dss_GenUserModel` module.
+
+The engine loads `library_path('GenUserModel')` (see `user_models`) as the
+user-model DLL and calls it for each generator instance (select, then
+init/calc/integrate/...). Two styles of models are supported; set one with
+`use_model` before the generators are created:
+
+- `GenUserModel` subclasses, with one Python object per generator instance,
+  called once per engine call.
+- A `BatchedGenUserModel` instance, which keeps the state of all the instances
+  in NumPy arrays and is called once per batch with the indices of the
+  instances:
+
+  - The integration calls of a time step are deferred and run as a single
+    `integrate(indices)` call, before the states are next used.
+  - At the start of each solver iteration, the terminal voltages of all
+    instances are gathered from the system voltage array and a single
+    `calc(indices, V, I)` call computes the currents of every instance. The
+    currents are then handed to the engine as it calls each instance. If the
+    voltages the engine passes for an instance do not match the gathered ones
+    (e.g. after the circuit topology changed), the instance is computed on
+    its own, and its terminal nodes are looked up again for the next batch.
+
+    model = MyBatchedModel()
+    use_model(model)
+    dss.Text.Command = f'new generator.g1 bus1=b1 kw=300 model=6 usermodel="{library_path("GenUserModel")}"'
+
+The callbacks provided by the engine to the user models operate on the prime
+DSS instance, so the circuit must be loaded in the prime context.
+
+Requires NumPy.
+'''
+import atexit
+from abc import ABC, abstractmethod
+from ._numpy import np
+from ._dss_GenUserModel import ffi
+from . import ffi as dss_ffi, lib as dss_lib
+from ._user_model_common import PerInstanceHandler, complex_view, write_name
+from .user_models import library_path
+
+# Current model handler, set by `use_model`
+_handler = None
+
+
+def use_model(model):
+    '''
+    Set the user model for the generators: either a `GenUserModel` subclass
+    (one instance per generator) or a `BatchedGenUserModel` instance. Use
+    `None` to remove it. All generators with `UserModel=library_path('GenUserModel')` use
+    the same model, which can only be changed when none exist.
+    '''
+    global _handler
+    if _handler is not None and _handler._has_instances():
+        # All the instances share the entry points, so the model cannot change under them
+        raise RuntimeError('Cannot change the user model while there are generators using it; clear the circuit first.')
+
+    if model is None:
+        _handler = None
+    elif isinstance(model, type) and issubclass(model, GenUserModel):
+        _handler = _PerInstanceHandler(model)
+    elif isinstance(model, BatchedGenUserModel):
+        _handler = model
+    else:
+        raise TypeError('Expected a GenUserModel subclass or a BatchedGenUserModel instance')
+
+
+@atexit.register
+def _delete_instances():
+    # The engine deletes the remaining instances when it is finalized, after
+    # Python can no longer handle the calls; clear the circuit while it still can.
+    if _handler is not None and _handler._has_instances():
+        dss_lib.ctx_Text_Set_Command(dss_lib.ctx_Get_Prime(), b'clear')
+
+
+class GenUserModel:
+    '''
+    Base class for per-instance generator user models; one object is created
+    per generator. `V` and `I` are complex arrays with the terminal voltages
+    and currents (one element per conductor), valid only during the call.
+    '''
+
+    # Names of the state variables, exposed in `vars`
+    var_names = ()
+
+    def __init__(self, gen_data, dyna_data, callbacks):
+        self.gen_data = gen_data
+        self.dyna_data = dyna_data
+        self.callbacks = callbacks
+        self.vars = np.zeros(len(self.var_names))
+        self._saved_vars = self.vars.copy()
+
+    def edit(self, params: str):
+        '''Process the parameters from `Generator.UserData`.'''
+
+    def init(self, V, I):
+        '''Initialize the state variables for the dynamics, from the solved V and I.'''
+
+    def calc(self, V, I):
+        '''Compute the terminal currents `I` for the terminal voltages `V`.'''
+
+    def integrate(self):
+        '''Integrate the state variables over one time step (`dyna_data.h`).'''
+
+    def update(self):
+        '''Called when the generator properties change.'''
+
+    def save(self):
+        self._saved_vars[:] = self.vars
+
+    def restore(self):
+        self.vars[:] = self._saved_vars
+
+
+class _PerInstanceHandler(PerInstanceHandler):
+    '''Dispatches the engine calls to one `GenUserModel` object per generator.'''
+
+    def __init__(self, model_cls):
+        super().__init__(ffi, model_cls)
+
+    def _new(self, gen_data, dyna_data, callbacks):
+        return self._add(self.model_cls(gen_data, dyna_data, callbacks))
+
+    def _init(self, V, I):
+        model = self.active
+        model.init(*self._views(V, I, model.gen_data.NumConductors))
+
+    def _calc(self, V, I):
+        model = self.active
+        model.calc(*self._views(V, I, model.gen_data.NumConductors))
+
+    def _integrate(self):
+        self.active.integrate()
+
+    def _edit(self, params):
+        self.active.edit(params)
+
+    def _update(self):
+        self.active.update()
+
+    def _num_vars(self):
+        return len(self.model_cls.var_names)
+
+    def _var_name(self, i):
+        return self.model_cls.var_names[i]
+
+    def _get_vars(self):
+        return self.active.vars
+
+    def _set_var(self, i, value):
+        self.active.vars[i] = value
+
+    def _save(self):
+        self.active.save()
+
+    def _restore(self):
+        self.active.restore()
+
+
+class BatchedGenUserModel(ABC):
+    '''
+    Base class for batched generator user models: a single object handles all
+    the instances, whose state variables are the rows of `states`. Instances
+    are identified by their index (0-based); the per-instance engine data is
+    in `gen_data[index]` and the dynamics data in `dyna_data`. The indices of
+    deleted instances are reused by new ones, and all are released when the
+    last instance is deleted (e.g. on `clear`), so `new` should reset any
+    per-instance state kept by the subclass.
+
+    Subclasses must implement `calc`.
+
+    In `calc`, `V` and `I` are complex arrays with one row per instance in
+    `indices` and `max_conductors` columns; unused columns (for instances with
+    fewer conductors) have zero voltage and their currents are ignored.
+    '''
+
+    var_names = ()
+
+    def __init__(self, max_conductors: int = 4):
+        self.max_conductors = max_conductors
+        self.dyna_data = None
+        self.callbacks = None
+        self._reset()
+
+    def _reset(self):
+        self.gen_data = []
+        self.names = []
+        self.states = np.zeros((0, len(self.var_names)))
+        self.alive = np.zeros(0, dtype=bool)
+        self._saved_states = self.states.copy()
+        self._active = -1
+        self._pending = []
+        # Nodes of the terminal conductors of each instance in the system
+        # voltage array; `_stale` marks the instances to look up again
+        self._node_refs = np.zeros((0, self.max_conductors), dtype=np.intp)
+        self._mapped = np.zeros(0, dtype=bool)
+        self._stale = np.zeros(0, dtype=bool)
+        self._nconds = []
+        self._batch_valid = False
+        self._batch_V = None
+        self._batch_I = None
+        self._served = np.zeros(0, dtype=bool)
+
+    # Model methods, to implement in subclasses
+
+    def new(self, index: int):
+        '''Called when an instance is created; `states` already has its row.'''
+
+    def edit(self, index: int, params: str):
+        '''Process the parameters from `Generator.UserData` for an instance.'''
+
+    def init(self, index: int, V: np.ndarray, I: np.ndarray):
+        '''Initialize the states of an instance for the dynamics, from its solved V and I (1-D arrays).'''
+
+    def integrate(self, indices: np.ndarray):
+        '''Integrate the states of the instances in `indices` over one time step (`dyna_data.h`).'''
+
+    @abstractmethod
+    def calc(self, indices: np.ndarray, V: np.ndarray, I: np.ndarray):
+        '''Compute the terminal currents `I` of the instances in `indices` for the terminal voltages `V`.'''
+
+    def update(self, index: int):
+        '''Called when the generator properties change.'''
+
+    # Batching
+
+    def _flush(self):
+        '''Run the deferred integration of the instances.'''
+        if self._pending:
+            indices = np.array(self._pending, dtype=np.intp)
+            self._pending = []
+            self._batch_valid = False
+            self.integrate(indices)
+
+    def _system_voltages(self) -> np.ndarray:
+        ptr = ffi.new('void**')
+        count = ffi.new('int32_t*')
+        self.callbacks.GetPtrToSystemVarray(ptr, count)
+        # Node 0 is the ground reference
+        return complex_view(ffi, ffi.cast('double*', ptr[0]), count[0] + 1)
+
+    def _resolve_nodes(self, indices):
+        '''
+        Get the terminal nodes of the instances from their generators, through
+        the C-API. The active class and circuit element are restored
+        afterwards, and errors raised by the lookup are discarded, so the
+        solution in progress is not affected.
+        '''
+        ctx = dss_lib.ctx_Get_Prime()
+        error_ptr = dss_lib.ctx_Error_Get_NumberPtr(ctx)
+        had_error = error_ptr[0]
+        previous = ffi.new('char[]', 256)
+        self.callbacks.GetActiveElementName(previous, len(previous))
+        previous = ffi.string(previous)
+        prev_class = dss_ffi.string(dss_lib.ctx_ActiveClass_Get_ActiveClassName(ctx))
+        refs_ptr = dss_ffi.new('int32_t**')
+        try:
+            for index in indices:
+                self._stale[index] = False
+                self._mapped[index] = False
+                if dss_lib.ctx_Circuit_SetActiveElement(ctx, self.names[index]) < 0:
+                    continue
+
+                dims = dss_ffi.new('int32_t[4]')
+                dss_lib.ctx_CktElement_Get_NodeRef(ctx, refs_ptr, dims)
+                n = self._nconds[index]
+                if dims[0] == n:
+                    self._node_refs[index, :n] = dss_ffi.unpack(refs_ptr[0], n)
+                    self._mapped[index] = True
+
+                dss_lib.DSS_Dispose_PInteger(refs_ptr)
+        finally:
+            if previous:
+                dss_lib.ctx_Circuit_SetActiveElement(ctx, previous)
+
+            if prev_class:
+                dss_lib.ctx_DSS_SetActiveClass(ctx, prev_class)
+
+            if error_ptr[0] and not had_error:
+                dss_lib.ctx_Error_Get_Number(ctx)
+
+    def _compute_batch(self):
+        self._flush()
+        count = len(self.gen_data)
+        stale = np.flatnonzero(self.alive & self._stale)
+        if len(stale):
+            self._resolve_nodes(stale)
+
+        system_V = self._system_voltages()
+        self._batch_V = np.zeros((count, self.max_conductors), dtype=np.complex128)
+        self._batch_I = np.zeros((count, self.max_conductors), dtype=np.complex128)
+        indices = np.flatnonzero(self.alive & self._mapped)
+        if len(indices):
+            V = system_V[self._node_refs[indices]]
+            I = np.zeros_like(V)
+            self.calc(indices, V, I)
+            self._batch_V[indices] = V
+            self._batch_I[indices] = I
+
+        self._served[:] = False
+        self._batch_valid = True
+
+    # Engine interface
+
+    def _new(self, gen_data, dyna_data, callbacks):
+        if gen_data.NumConductors > self.max_conductors:
+            raise ValueError(f'Generator has {gen_data.NumConductors} conductors; max_conductors is {self.max_conductors}')
+
+        self._flush()
+        # The generator is the active element while it is being created
+        name = ffi.new('char[]', 256)
+        callbacks.GetActiveElementName(name, len(name))
+        self.dyna_data = dyna_data
+        self.callbacks = callbacks
+        free = np.flatnonzero(~self.alive)
+        if len(free):
+            # Reuse the row of a deleted instance
+            index = int(free[0])
+            self.names[index] = ffi.string(name)
+            self.gen_data[index] = gen_data
+            self._nconds[index] = gen_data.NumConductors
+            self.states[index] = 0
+            self._saved_states[index] = 0
+            self.alive[index] = True
+            self._node_refs[index] = 0
+            self._mapped[index] = False
+            self._stale[index] = True
+            self._served[index] = False
+        else:
+            index = len(self.gen_data)
+            self.names.append(ffi.string(name))
+            self.gen_data.append(gen_data)
+            self._nconds.append(gen_data.NumConductors)
+            nvars = len(self.var_names)
+            self.states = np.concatenate([self.states, np.zeros((1, nvars))])
+            self._saved_states = np.concatenate([self._saved_states, np.zeros((1, nvars))])
+            self.alive = np.append(self.alive, True)
+            self._node_refs = np.concatenate([self._node_refs, np.zeros((1, self.max_conductors), dtype=np.intp)])
+            self._mapped = np.append(self._mapped, False)
+            self._stale = np.append(self._stale, True)
+            self._served = np.append(self._served, False)
+
+        self._batch_valid = False
+        self._active = index
+        self.new(index)
+        return index + 1
+
+    def _delete(self, model_id):
+        index = model_id - 1
+        if 0 <= index < len(self.gen_data) and self.alive[index]:
+            self.alive[index] = False
+            self._pending = [i for i in self._pending if i != index]
+            self._batch_valid = False
+            if not self.alive.any():
+                self._reset()
+
+    def _has_instances(self):
+        return bool(self.alive.any())
+
+    def _select(self, model_id):
+        index = model_id - 1
+        if 0 <= index < len(self.gen_data) and self.alive[index]:
+            self._active = index
+            return model_id
+
+        self._active = -1
+        return 0
+
+    def _init(self, V, I):
+        self._flush()
+        index = self._active
+        n = self._nconds[index]
+        self.init(index, complex_view(ffi, V, n), complex_view(ffi, I, n))
+        self._batch_valid = False
+        # Look up the nodes now, rather than during the solver iterations
+        self._resolve_nodes([index])
+
+    def _calc(self, V, I):
+        index = self._active
+        n = self._nconds[index]
+        nbytes = 16 * n
+        if self._pending or not self._batch_valid or self._served[index]:
+            # New solver iteration (or the states changed)
+            self._compute_batch()
+
+        self._served[index] = True
+        if self._mapped[index] and ffi.buffer(V, nbytes)[:] == self._batch_V[index, :n].tobytes():
+            ffi.memmove(I, self._batch_I[index, :n], nbytes)
+            return
+
+        # Not part of the batch, or the voltages differ from the gathered ones
+        V_single = np.zeros((1, self.max_conductors), dtype=np.complex128)
+        V_single[0, :n] = complex_view(ffi, V, n)
+        I_single = np.zeros_like(V_single)
+        self.calc(np.array([index], dtype=np.intp), V_single, I_single)
+        ffi.memmove(I, I_single[0, :n], nbytes)
+        self._mapped[index] = False
+        self._stale[index] = True
+
+    def _integrate(self):
+        self._pending.append(self._active)
+
+    def _edit(self, params):
+        self._flush()
+        self.edit(self._active, params)
+        self._batch_valid = False
+
+    def _update(self):
+        self._flush()
+        self.update(self._active)
+        self._batch_valid = False
+
+    def _num_vars(self):
+        return len(self.var_names)
+
+    def _var_name(self, i):
+        return self.var_names[i]
+
+    def _get_vars(self):
+        self._flush()
+        return self.states[self._active]
+
+    def _set_var(self, i, value):
+        self._flush()
+        self.states[self._active, i] = value
+        self._batch_valid = False
+
+    def _save(self):
+        self._flush()
+        self._saved_states[self._active] = self.states[self._active]
+
+    def _restore(self):
+        self._pending = [i for i in self._pending if i != self._active]
+        self.states[self._active] = self._saved_states[self._active]
+        self._batch_valid = False
+
+
+# Entry points called by the engine, through the user-model library
+
+@ffi.def_extern()
+def pyGenUserModel_New(GenData, DynaData, CallBacks):
+    if _handler is None:
+        raise RuntimeError('No generator user model was set; see gen_user_model.use_model')
+
+    return _handler._new(GenData, DynaData, CallBacks)
+
+
+@ffi.def_extern()
+def pyGenUserModel_Delete(ID):
+    _handler._delete(ID[0])
+
+
+@ffi.def_extern()
+def pyGenUserModel_Select(ID):
+    return _handler._select(ID[0])
+
+
+@ffi.def_extern()
+def pyGenUserModel_Init(V, I):
+    _handler._init(V, I)
+
+
+@ffi.def_extern()
+def pyGenUserModel_Calc(V, I):
+    _handler._calc(V, I)
+
+
+@ffi.def_extern()
+def pyGenUserModel_Integrate():
+    _handler._integrate()
+
+
+@ffi.def_extern()
+def pyGenUserModel_Edit(EditStr, MaxLen):
+    _handler._edit(ffi.string(EditStr, MaxLen).decode())
+
+
+@ffi.def_extern()
+def pyGenUserModel_UpdateModel():
+    _handler._update()
+
+
+@ffi.def_extern()
+def pyGenUserModel_NumVars():
+    return _handler._num_vars()
+
+
+@ffi.def_extern()
+def pyGenUserModel_GetAllVars(vars):
+    values = np.ascontiguousarray(_handler._get_vars(), dtype=np.float64)
+    ffi.memmove(vars, values, values.nbytes)
+
+
+# Variable indices are 1-based
+
+@ffi.def_extern()
+def pyGenUserModel_GetVariable(i):
+    return float(_handler._get_vars()[i[0] - 1])
+
+
+@ffi.def_extern()
+def pyGenUserModel_SetVariable(i, value):
+    _handler._set_var(i[0] - 1, value[0])
+
+
+@ffi.def_extern()
+def pyGenUserModel_GetVarName(i, VarName, MaxLen):
+    write_name(ffi, _handler._var_name(i[0] - 1), VarName, MaxLen)
+
+
+@ffi.def_extern()
+def pyGenUserModel_Save():
+    _handler._save()
+
+
+@ffi.def_extern()
+def pyGenUserModel_Restore():
+    _handler._restore()
+
+
+__all__ = ['BatchedGenUserModel', 'GenUserModel', 'library_path', 'use_model']
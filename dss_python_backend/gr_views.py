@@ -0,0 +1,206 @@
+'''
+Zero-copy NumPy views over the global result (GR) buffers of a DSS context.
+
+The `*_GR` getters of the DSS C-API write their results to buffers owned by
+the engine, one per data type, which are reused across calls and only
+reallocated when a result does not fit. Instead of copying the data out after
+each call, `GRViews` returns read-only NumPy views over these buffers. The GR
+pointers are fetched once per context; the views are rebuilt only when the
+engine reallocates the buffer or the result size changes, so repeated reads
+(e.g. voltages at every time step) do not allocate new arrays.
+
+The GR buffers are freed by the engine when it reallocates them, so the
+views are returned wrapped in a `GRView`, which checks that the buffer it
+refers to is still current: reading a view after the buffer was reallocated
+(by any GR call on the context) raises `StaleViewError` instead of reading
+freed memory. The contents of a view are also overwritten by the next `*_GR`
+call that uses the same data type; use `.copy()` to keep the data.
+
+    views = get_gr_views(ctx)
+    volts = views.float64(lib.ctx_Circuit_Get_AllBusVolts_GR, complex=True)
+    vmax = np.abs(volts).max()  # NumPy functions accept the view directly
+    saved = volts.copy()        # ndarray, owned by Python
+
+Requires NumPy.
+'''
+import threading
+from ._numpy import np
+from . import ffi, lib
+from .contexts import ctx_key, register_forget_hook
+
+
+class StaleViewError(RuntimeError):
+    '''Raised when reading a `GRView` whose buffer was reallocated by the engine.'''
+
+
+class GRView:
+    '''
+    View of a GR buffer, usable while the engine keeps the buffer. NumPy
+    functions accept it directly (through `__array__`); `array` returns the
+    underlying read-only ndarray, which must not be kept: it is not checked.
+    '''
+    __slots__ = ('_data_ptr', '_ptr', '_array')
+
+    def __init__(self, data_ptr, ptr, array):
+        self._data_ptr = data_ptr
+        self._ptr = ptr
+        self._array = array
+
+    @property
+    def valid(self) -> bool:
+        '''False if the engine reallocated (and freed) the buffer of the view.'''
+        return self._data_ptr[0] == self._ptr
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._data_ptr[0] != self._ptr:
+            raise StaleViewError('The GR buffer of this view was reallocated by the engine; read it again')
+
+        return self._array
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.array
+        if copy:
+            return array.astype(dtype) if dtype is not None else array.copy()
+
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def copy(self) -> np.ndarray:
+        '''Copy of the data, as a (writable) ndarray.'''
+        return self.array.copy()
+
+    def __len__(self):
+        return len(self.array)
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    @property
+    def dtype(self):
+        return self._array.dtype
+
+    def __repr__(self):
+        if not self.valid:
+            return 'GRView(<stale>)'
+
+        return f'GRView({self._array!r})'
+
+
+class _GRBuffer:
+    __slots__ = ('data_ptr', 'count_ptr', 'dtype', '_base_ptr', '_base_capacity', '_base', '_key', '_view')
+
+    def __init__(self, data_ptr, count_ptr, dtype):
+        self.data_ptr = data_ptr
+        self.count_ptr = count_ptr
+        self.dtype = np.dtype(dtype)
+        self._base_ptr = None
+        self._base_capacity = -1
+        self._base = None
+        self._key = None
+        self._view = None
+
+    def view(self, complex: bool = False) -> GRView:
+        ptr = self.data_ptr[0]
+        cnt = self.count_ptr
+        count, capacity, rows, cols = cnt[0], cnt[1], cnt[2], cnt[3]
+        key = (count, rows, cols, complex)
+        if ptr == self._base_ptr and capacity == self._base_capacity:
+            if key == self._key:
+                return self._view
+        else:
+            # The engine (re)allocated the buffer; map the whole capacity,
+            # so smaller results can reuse it
+            if ptr == ffi.NULL or capacity <= 0:
+                self._base = np.empty(0, dtype=self.dtype)
+            else:
+                self._base = np.frombuffer(ffi.buffer(ptr, capacity * self.dtype.itemsize), dtype=self.dtype)
+
+            self._base.flags.writeable = False
+            self._base_ptr = ptr
+            self._base_capacity = capacity
+
+        view = self._base[:count]
+        if complex:
+            view = view.view(np.complex128)
+
+        if cols:
+            # Matrix results are column-major; the dimensions refer to
+            # complex elements for complex matrices
+            view = view.reshape((rows, cols), order='F')
+
+        self._key = key
+        self._view = GRView(self.data_ptr, ptr, view)
+        return self._view
+
+
+class GRViews:
+    '''
+    Read-only NumPy views over the GR buffers of a DSS context.
+
+    For each method, `getter` is an optional `*_GR` function from `lib`, which is
+    called with the context and `args` before building the view. Without a getter,
+    the view reflects the current contents of the buffer.
+    '''
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        data_ptrs = (ffi.new('char****'), ffi.new('double***'), ffi.new('int32_t***'), ffi.new('int8_t***'))
+        count_ptrs = tuple(ffi.new('int32_t**') for _ in range(4))
+        lib.ctx_DSS_GetGRPointers(ctx, *data_ptrs, *count_ptrs)
+        self._float64 = _GRBuffer(data_ptrs[1][0], count_ptrs[1][0], np.float64)
+        self._int32 = _GRBuffer(data_ptrs[2][0], count_ptrs[2][0], np.int32)
+        self._int8 = _GRBuffer(data_ptrs[3][0], count_ptrs[3][0], np.int8)
+
+    def float64(self, getter=None, *args, complex: bool = False) -> GRView:
+        '''
+        View of the float64 GR buffer. With `complex=True`, pairs of values are
+        viewed as complex128 numbers.
+        '''
+        if getter is not None:
+            getter(self.ctx, *args)
+
+        return self._float64.view(complex)
+
+    def int32(self, getter=None, *args) -> GRView:
+        '''View of the int32 GR buffer.'''
+        if getter is not None:
+            getter(self.ctx, *args)
+
+        return self._int32.view()
+
+    def int8(self, getter=None, *args) -> GRView:
+        '''View of the int8 (byte) GR buffer.'''
+        if getter is not None:
+            getter(self.ctx, *args)
+
+        return self._int8.view()
+
+
+# By `ctx_key`; dropped by `forget_ctx`
+_ctx_to_views = {}
+_views_lock = threading.Lock()
+
+
+def get_gr_views(ctx) -> GRViews:
+    '''Get the (cached) GRViews for a DSS context.'''
+    key = ctx_key(ctx)
+    views = _ctx_to_views.get(key)
+    if views is not None:
+        return views
+
+    with _views_lock:
+        views = _ctx_to_views.get(key)
+        if views is None:
+            views = _ctx_to_views[key] = GRViews(ctx)
+
+    return views
+
+
+@register_forget_hook
+def _forget_views(ctx):
+    with _views_lock:
+        _ctx_to_views.pop(ctx_key(ctx), None)
+
+
+__all__ = ['GRView', 'GRViews', 'StaleViewError', 'get_gr_views']
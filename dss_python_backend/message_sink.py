@@ -0,0 +1,240 @@
+'''
+Native sink for the engine messages (the write/message callback): the
+messages are filtered by type and stored in C-side buffers, and Python reads
+them in batches, instead of one C-to-Python call per message.
+
+    sink = MessageSink(ctx, level=DSSMessageType.Info)
+    ... # run scripts
+    for msg in sink.drain():
+        print(msg.type.name, msg.text)
+
+`drain` decodes the whole batch at once and returns it by column (a
+`MessageBatch`: `types`, `subtypes`, `texts`, `truncated`); the `Message`
+tuples are only created when iterating or indexing the batch, so code that
+only needs e.g. the texts can use `batch.texts` directly. `drain_raw` skips
+decoding altogether.
+
+With a `handler`, the sink also calls it with the pending messages (a
+`MessageBatch`) when the buffers get full (once per batch) and on
+`flush`/`close`; otherwise, messages that do not fit are dropped and counted
+(see `dropped`).
+
+The sink replaces the message callback of the context (e.g. the one installed
+by DSS-Python); `close` unregisters it, so any previous callback must be
+registered again by its owner. Use a single sink per context.
+
+Requires NumPy.
+'''
+import atexit
+from collections import namedtuple
+from ._numpy import np
+from . import ffi, lib
+from .enums import DSSMessageType
+
+# Matches the layout of the C struct
+MESSAGE_RECORD_DTYPE = np.dtype({
+    'names': ['messageType', 'messageSubType', 'offset', 'length', 'size'],
+    'formats': [np.int32, np.int32, np.int32, np.int32, np.int64],
+    'offsets': [
+        ffi.offsetof('altdss_python_message_record_t', field)
+        for field in ('messageType', 'messageSubType', 'offset', 'length', 'size')
+    ],
+    'itemsize': ffi.sizeof('altdss_python_message_record_t'),
+})
+
+_SINK_CALLBACK = ffi.addressof(lib, 'altdss_python_msgsink_callback')
+
+# Sinks that notify Python when full, by context
+_sinks = {}
+
+Message = namedtuple('Message', ['type', 'subtype', 'text', 'truncated'])
+
+_MESSAGE_TYPES = {int(msg_type): msg_type for msg_type in DSSMessageType}
+
+
+class MessageBatch:
+    '''
+    Messages drained from a sink, oldest first, by column: `types` and
+    `subtypes` (int32 arrays), `texts` (list of str) and `truncated` (bool
+    array). Iterating or indexing returns `Message` tuples.
+    '''
+    __slots__ = ('types', 'subtypes', 'texts', 'truncated')
+
+    def __init__(self, types, subtypes, texts, truncated):
+        self.types = types
+        self.subtypes = subtypes
+        self.texts = texts
+        self.truncated = truncated
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, idx) -> Message:
+        msg_type = int(self.types[idx])
+        return Message(_MESSAGE_TYPES.get(msg_type, msg_type), int(self.subtypes[idx]), self.texts[idx], bool(self.truncated[idx]))
+
+    def __iter__(self):
+        types = _MESSAGE_TYPES
+        for msg_type, subtype, text, truncated in zip(self.types.tolist(), self.subtypes.tolist(), self.texts, self.truncated.tolist()):
+            yield Message(types.get(msg_type, msg_type), subtype, text, truncated)
+
+    def __repr__(self):
+        return f'<MessageBatch of {len(self)} messages>'
+
+
+_EMPTY_BATCH = MessageBatch(np.empty(0, np.int32), np.empty(0, np.int32), [], np.empty(0, bool))
+
+
+def _type_mask(types) -> int:
+    mask = 0
+    for msg_type in types:
+        msg_type = int(msg_type)
+        mask |= (1 << 31) if (msg_type < -1 or msg_type > 30) else (1 << (msg_type + 1))
+
+    return mask
+
+
+class MessageSink:
+    '''
+    Collects the messages of a DSS context in native buffers of `capacity`
+    messages and `text_capacity` bytes of text.
+
+    Only the message types up to `level` (in the order of `DSSMessageType`,
+    from `Error`) are kept; alternatively, pass the accepted `types`. By
+    default, all messages are kept.
+    '''
+
+    def __init__(self, ctx, level=None, types=None, handler=None, capacity: int = 4096, text_capacity: int = 1 << 20):
+        if types is None:
+            if level is None:
+                types = range(-1, 32)
+            else:
+                types = range(DSSMessageType.Error, int(level) + 1)
+
+        self.ctx = ctx
+        self.handler = handler
+        self.types = tuple(types)
+        self._flushing = False
+        self._records = np.zeros(capacity, dtype=MESSAGE_RECORD_DTYPE)
+        self._text = np.zeros(text_capacity, dtype=np.uint8)
+        self._out_records = np.empty_like(self._records)
+        self._out_text = np.empty_like(self._text)
+        self._sink = lib.altdss_python_msgsink_new(
+            ctx,
+            ffi.from_buffer('altdss_python_message_record_t[]', self._records, require_writable=True),
+            capacity,
+            ffi.from_buffer('char[]', self._text, require_writable=True),
+            text_capacity,
+            _type_mask(self.types),
+            handler is not None
+        )
+        if self._sink == ffi.NULL:
+            raise RuntimeError('Could not create the message sink.')
+
+        self._sink = ffi.gc(self._sink, lib.altdss_python_msgsink_free)
+        _sinks[ctx] = self
+        lib.ctx_DSS_RegisterMessageCallback(ctx, _SINK_CALLBACK)
+
+    def close(self):
+        '''Unregister the sink from the engine, flush, and release the native state.'''
+        if self._sink is None:
+            return
+
+        lib.ctx_DSS_RegisterMessageCallback(self.ctx, ffi.NULL)
+        if _sinks.get(self.ctx) is self:
+            del _sinks[self.ctx]
+
+        if self.handler is not None:
+            self.flush()
+
+        sink, self._sink = self._sink, None
+        ffi.release(sink)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        '''Number of messages waiting to be drained'''
+        return lib.altdss_python_msgsink_pending(self._sink)
+
+    @property
+    def dropped(self) -> int:
+        '''Number of messages dropped since the last reset, due to full buffers'''
+        return lib.altdss_python_msgsink_dropped(self._sink, 0)
+
+    def reset_dropped(self) -> int:
+        '''Reset the dropped counter, returning the previous value'''
+        return lib.altdss_python_msgsink_dropped(self._sink, 1)
+
+    def drain_raw(self):
+        '''
+        Move the pending messages to the internal output buffers, without
+        decoding. Returns the records (dtype `MESSAGE_RECORD_DTYPE`) and the
+        text buffer, as views that are overwritten by the next drain.
+        '''
+        n = lib.altdss_python_msgsink_drain(
+            self._sink,
+            ffi.from_buffer('altdss_python_message_record_t[]', self._out_records, require_writable=True),
+            ffi.from_buffer('char[]', self._out_text, require_writable=True),
+        )
+        return self._out_records[:n], self._out_text
+
+    def drain(self) -> MessageBatch:
+        '''Move the pending messages, oldest first, to a `MessageBatch`.'''
+        records, text = self.drain_raw()
+        if len(records) == 0:
+            return _EMPTY_BATCH
+
+        # The texts are stored back to back, each followed by a NUL
+        last = records[-1]
+        end = int(last['offset']) + int(last['length'])
+        texts = text[:end].tobytes().decode(errors='replace').split('\0')
+        return MessageBatch(
+            records['messageType'].copy(),
+            records['messageSubType'].copy(),
+            texts,
+            records['length'] < records['size']
+        )
+
+    def flush(self):
+        '''Drain the pending messages and pass them to the handler, if any.'''
+        if self._flushing:
+            return
+
+        self._flushing = True
+        try:
+            messages = self.drain()
+            if messages and self.handler is not None:
+                self.handler(messages)
+        finally:
+            self._flushing = False
+
+
+@ffi.def_extern()
+def altdss_python_msgsink_full(ctx):
+    sink = _sinks.get(ctx)
+    if sink is None:
+        return 0
+
+    try:
+        sink.flush()
+    except Exception as ex:
+        err_ptr = lib.ctx_Error_Get_NumberPtr(ctx)
+        err_ptr[0] = 1
+        lib.ctx_Error_Set_Description(ctx, f"Python message handler exception: {ex}".encode())
+
+    return 0
+
+
+def _close_sinks():
+    '''Unregister the sinks at exit, since the engine may outlive them.'''
+    for sink in list(_sinks.values()):
+        sink.close()
+
+atexit.register(_close_sinks)
+
+__all__ = ['MessageSink', 'Message', 'MessageBatch', 'MESSAGE_RECORD_DTYPE']
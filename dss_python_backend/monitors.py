@@ -0,0 +1,343 @@
+'''
+Decoding of the monitor byte streams into NumPy structured arrays, and a
+spooler that moves the samples of the monitors to files during a simulation.
+
+A monitor stream (`ctx_Monitors_Get_ByteStream`) has a fixed 272-byte header
+(signature, version, number of channels, mode, and a 256-byte text field)
+followed by the records, each with the hour, the seconds and one float32 value
+per channel. `decode` maps the records to a structured array over the buffer,
+without copies, with one field per channel:
+
+    header, records = read_monitor(ctx, 'm1')
+    records['hour'], records['V1']
+    values = records.view(np.float32).reshape(len(records), -1)  # 2D, with hour and sec
+
+The channel names come from the text field of the header when the engine fills
+it, otherwise from `ctx_Monitors_Get_Header`. `MonitorHeader` splits the mode
+into the base `MonitorModes` value and the `Sequence`, `Magnitude` and
+`PosOnly` bits.
+
+During long simulations, the monitors keep all samples in memory. With
+`MonitorSpooler`, calling `spool()` (e.g. every few hundred steps) appends the
+new records of each monitor to its file and resets the monitor, so the memory
+used stays flat. Each file is a valid monitor stream, and `open_spool` maps
+them back as read-only structured arrays (`numpy.memmap`):
+
+    with MonitorSpooler(ctx, 'results/') as spooler:
+        for step in range(8760):
+            lib.ctx_Solution_Solve(ctx)
+            if step % 500 == 499:
+                spooler.spool()
+
+    records = open_spool('results/')['m1']
+
+Requires NumPy.
+'''
+import json
+import os
+from ._numpy import np
+from . import ffi, lib
+from .enums import MonitorModes
+from .gr_views import get_gr_views
+
+HEADER_SIZE = 272
+SIGNATURE = 43756
+
+_HEADER_DTYPE = np.dtype([('signature', '<i4'), ('version', '<i4'), ('num_channels', '<i4'), ('mode', '<i4'), ('text', 'S256')])
+
+_MODE_FLAGS = MonitorModes.Sequence | MonitorModes.Magnitude | MonitorModes.PosOnly
+
+
+class MonitorHeader:
+    '''
+    Header of a monitor stream: `version`, `mode` (as an int, including the
+    bits), and the names of the `channels`.
+    '''
+    __slots__ = ('version', 'mode', 'channels', '_dtype')
+
+    def __init__(self, version, mode, channels):
+        self.version = version
+        self.mode = mode
+        self.channels = tuple(channels)
+        self._dtype = None
+
+    @property
+    def base_mode(self) -> int:
+        '''
+        The mode without the `Sequence`, `Magnitude` and `PosOnly` bits, as a
+        `MonitorModes` value when there is one (e.g. not for mode 5, the
+        solution variables), otherwise as a plain int.
+        '''
+        mode = self.mode & ~_MODE_FLAGS
+        try:
+            return MonitorModes(mode)
+        except ValueError:
+            return mode
+
+    @property
+    def sequence(self) -> bool:
+        return bool(self.mode & MonitorModes.Sequence)
+
+    @property
+    def magnitude(self) -> bool:
+        return bool(self.mode & MonitorModes.Magnitude)
+
+    @property
+    def pos_only(self) -> bool:
+        return bool(self.mode & MonitorModes.PosOnly)
+
+    @property
+    def dtype(self) -> np.dtype:
+        '''Structured dtype of the records: `hour`, `sec` and the channels, all float32.'''
+        if self._dtype is None:
+            self._dtype = record_dtype(self.channels)
+
+        return self._dtype
+
+    def __repr__(self):
+        return f'MonitorHeader(version={self.version}, mode={self.mode}, channels={self.channels!r})'
+
+
+def record_dtype(channels) -> np.dtype:
+    '''Structured dtype of the records of a monitor with the given channel names.'''
+    names = ['hour', 'sec']
+    seen = set(names)
+    for idx, name in enumerate(channels):
+        name = name.strip() or f'ch{idx + 1}'
+        if name in seen:
+            name = f'{name}_{idx + 1}'
+
+        seen.add(name)
+        names.append(name)
+
+    return np.dtype({'names': names, 'formats': ['<f4'] * len(names)})
+
+
+def _header_channels(text, num_channels):
+    text = text.split(b'\0', 1)[0].decode(errors='replace').strip()
+    if not text:
+        return None
+
+    names = [name.strip() for name in text.split(',')]
+    if len(names) == num_channels + 2:
+        # Includes the time columns
+        names = names[2:]
+
+    if len(names) != num_channels:
+        return None
+
+    return names
+
+
+def parse_header(buffer, channels=None) -> MonitorHeader:
+    '''
+    Parse the header of a monitor stream (any bytes-like object). The channel
+    names are taken from `channels` if given, then from the header itself;
+    otherwise, generic names (`ch1`, `ch2`...) are used.
+    '''
+    if len(buffer) < HEADER_SIZE:
+        raise ValueError(f'Monitor stream too short ({len(buffer)} bytes)')
+
+    header = np.frombuffer(buffer, dtype=_HEADER_DTYPE, count=1)[0]
+    if header['signature'] != SIGNATURE:
+        raise ValueError(f'Invalid monitor stream signature ({header["signature"]})')
+
+    num_channels = int(header['num_channels'])
+    if channels is None:
+        channels = _header_channels(header['text'], num_channels)
+    elif len(channels) != num_channels:
+        raise ValueError(f'Expected {num_channels} channel names, got {len(channels)}')
+
+    if channels is None:
+        channels = [f'ch{idx + 1}' for idx in range(num_channels)]
+
+    return MonitorHeader(int(header['version']), int(header['mode']), channels)
+
+
+def decode(buffer, channels=None):
+    '''
+    Decode a monitor stream (any bytes-like object, e.g. a NumPy array or a
+    memory map). Returns `(header, records)`, where `records` is a structured
+    array over `buffer` (not a copy); see `parse_header` for `channels`.
+    '''
+    header = parse_header(buffer, channels)
+    count = (len(buffer) - HEADER_SIZE) // header.dtype.itemsize
+    records = np.frombuffer(buffer, dtype=header.dtype, count=count, offset=HEADER_SIZE)
+    return header, records
+
+
+def _free_bytes(ptr):
+    lib.DSS_Dispose_PByte(ffi.new('int8_t**', ptr))
+
+
+def _check_error(ctx):
+    number = lib.ctx_Error_Get_Number(ctx)
+    if number:
+        raise RuntimeError(f'(#{number}) {ffi.string(lib.ctx_Error_Get_Description(ctx)).decode()}')
+
+
+def _activate(ctx, name):
+    if name is not None:
+        lib.ctx_Monitors_Set_Name(ctx, name.encode())
+        _check_error(ctx)
+
+
+def channel_names(ctx, name: str = None) -> list:
+    '''Channel names of the monitor `name` (or the active monitor).'''
+    _activate(ctx, name)
+    ptr = ffi.new('char***')
+    dims = ffi.new('int32_t[4]')
+    lib.ctx_Monitors_Get_Header(ctx, ptr, dims)
+    try:
+        _check_error(ctx)
+        return [ffi.string(ptr[0][idx]).decode() for idx in range(dims[0])]
+    finally:
+        lib.DSS_Dispose_PPAnsiChar(ptr, dims[1])
+
+
+def read_monitor(ctx, name: str = None):
+    '''
+    Samples of the monitor `name` (or the active monitor), as `(header, records)`.
+    The records use the array allocated by the engine, released when no longer
+    referenced.
+    '''
+    _activate(ctx, name)
+    ptr = ffi.new('int8_t**')
+    dims = ffi.new('int32_t[4]')
+    lib.ctx_Monitors_Get_ByteStream(ctx, ptr, dims)
+    data = ffi.gc(ptr[0], _free_bytes) if ptr[0] != ffi.NULL else None
+    _check_error(ctx)
+    if data is None or dims[0] < HEADER_SIZE:
+        raise ValueError('The monitor has no data')
+
+    buffer = np.frombuffer(ffi.buffer(data, dims[0]), dtype=np.uint8)
+    buffer.setflags(write=False)
+    return decode(buffer, channel_names(ctx))
+
+
+def read_all(ctx) -> dict:
+    '''Samples of all monitors, as a dict of monitor name to `(header, records)`.'''
+    result = {}
+    idx = lib.ctx_Monitors_Get_First(ctx)
+    while idx:
+        name = ffi.string(lib.ctx_Monitors_Get_Name(ctx)).decode()
+        result[name] = read_monitor(ctx)
+        idx = lib.ctx_Monitors_Get_Next(ctx)
+
+    return result
+
+
+class MonitorSpooler:
+    '''
+    Appends the samples of the monitors of a DSS context to files in
+    `directory` (one `<name>.mon` per monitor, plus `index.json`), resetting
+    the monitors after each `spool()`. Only the monitors in `monitors` (names)
+    are spooled, if given; otherwise, all monitors present when the spooler
+    is created.
+
+    Samples already in the monitors are moved by the first `spool()`.
+    '''
+
+    def __init__(self, ctx, directory, monitors=None):
+        self.ctx = ctx
+        self.directory = directory
+        self.closed = False
+        self._views = get_gr_views(ctx)
+        if monitors is None:
+            monitors = []
+            idx = lib.ctx_Monitors_Get_First(ctx)
+            while idx:
+                monitors.append(ffi.string(lib.ctx_Monitors_Get_Name(ctx)).decode())
+                idx = lib.ctx_Monitors_Get_Next(ctx)
+
+        os.makedirs(directory, exist_ok=True)
+        self._monitors = []
+        index = {}
+        for name in monitors:
+            stream = self._views.int8(self._activate_and_read, name).array
+            header = parse_header(stream, channel_names(ctx))
+            path = os.path.join(directory, f'{name.lower()}.mon')
+            with open(path, 'wb') as f:
+                f.write(stream[:HEADER_SIZE].tobytes())
+
+            self._monitors.append((name.encode(), path, header.dtype.itemsize))
+            index[name] = {'file': os.path.basename(path), 'mode': header.mode, 'channels': list(header.channels)}
+
+        with open(os.path.join(directory, 'index.json'), 'w') as f:
+            json.dump(index, f, indent=1)
+
+        self.count = 0
+
+    def _activate_and_read(self, ctx, name):
+        lib.ctx_Monitors_Set_Name(ctx, name.encode())
+        _check_error(ctx)
+        lib.ctx_Monitors_Get_ByteStream_GR(ctx)
+
+    def spool(self) -> int:
+        '''
+        Move the new samples of each monitor to its file. Returns the number
+        of records written (for all monitors).
+        '''
+        if self.closed:
+            raise ValueError('The spooler is closed')
+
+        ctx = self.ctx
+        int8 = self._views.int8
+        written = 0
+        for name, path, record_size in self._monitors:
+            lib.ctx_Monitors_Set_Name(ctx, name)
+            stream = int8(lib.ctx_Monitors_Get_ByteStream_GR).array
+            _check_error(ctx)
+            records = stream[HEADER_SIZE:]
+            if not len(records):
+                continue
+
+            with open(path, 'ab') as f:
+                f.write(records)
+
+            lib.ctx_Monitors_Reset(ctx)
+            written += len(records) // record_size
+
+        self.count += written
+        return written
+
+    def close(self):
+        '''Spool the remaining samples; the files are kept.'''
+        if not self.closed:
+            self.spool()
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_spool(directory) -> dict:
+    '''
+    Map the files written by a `MonitorSpooler`, as a dict of monitor name to
+    records (read-only `numpy.memmap` structured arrays).
+    '''
+    with open(os.path.join(directory, 'index.json')) as f:
+        index = json.load(f)
+
+    result = {}
+    for name, info in index.items():
+        path = os.path.join(directory, info['file'])
+        with open(path, 'rb') as f:
+            header = parse_header(f.read(HEADER_SIZE), info['channels'])
+
+        count = (os.path.getsize(path) - HEADER_SIZE) // header.dtype.itemsize
+        if count:
+            result[name] = np.memmap(path, dtype=header.dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
+        else:
+            result[name] = np.empty(0, dtype=header.dtype)
+
+    return result
+
+
+__all__ = [
+    'MonitorHeader', 'MonitorSpooler',
+    'record_dtype', 'parse_header', 'decode', 'channel_names', 'read_monitor', 'read_all', 'open_spool',
+]
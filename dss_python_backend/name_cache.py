@@ -0,0 +1,209 @@
+'''
+Per-context cache of names to indices, for activating buses and elements by
+index instead of by name (which requires encoding the name and a search in
+the engine for each call).
+
+The names are read in bulk (from the all-names GR getters) on first use and
+the cache is invalidated through the context's `EventCallbackManager`: all of
+it on `AltDSSEvent.Clear`, and the buses on `AltDSSEvent.ReprocessBuses`.
+Elements added after the cache was filled are picked up on the next lookup
+(the cached counts are checked against the engine). Names are case-insensitive, and elements use the full name
+(`class.name`):
+
+    names = get_name_cache(ctx)
+    for bus in buses:
+        names.set_active_bus(bus)
+        ...
+    names.set_active_element('Line.L1')
+    idx = names.class_index('Load', 'ld10')  # for e.g. ctx_Loads_Set_idx
+'''
+import threading
+from . import ffi, lib
+from .contexts import ctx_key, register_forget_hook
+from .enums import AltDSSEvent
+from .events import get_manager_for_ctx
+
+
+class NameCache:
+    '''
+    Names of the buses, circuit elements and the elements of each class of a DSS
+    context, with their indices. Use `get_name_cache` to get the shared
+    instance for a context.
+    '''
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self._encoded = {}
+        self._buses = None
+        self._elements = None
+        self._classes = {}
+        data_ptrs = (ffi.new('char****'), ffi.new('double***'), ffi.new('int32_t***'), ffi.new('int8_t***'))
+        count_ptrs = tuple(ffi.new('int32_t**') for _ in range(4))
+        lib.ctx_DSS_GetGRPointers(ctx, *data_ptrs, *count_ptrs)
+        self._str_data = data_ptrs[0][0]
+        self._str_count = count_ptrs[0][0]
+        manager = get_manager_for_ctx(ctx)
+        manager.register_func(AltDSSEvent.Clear, self._on_clear)
+        manager.register_func(AltDSSEvent.ReprocessBuses, self._on_reprocess_buses)
+
+    def _unregister(self):
+        manager = get_manager_for_ctx(self.ctx)
+        manager.unregister_func(AltDSSEvent.Clear, self._on_clear)
+        manager.unregister_func(AltDSSEvent.ReprocessBuses, self._on_reprocess_buses)
+
+    def _on_clear(self, ctx, evt, step, ptr):
+        self.invalidate()
+
+    def _on_reprocess_buses(self, ctx, evt, step, ptr):
+        self._buses = None
+
+    def invalidate(self):
+        '''Drop all cached names; they are read again on the next lookup.'''
+        self._buses = None
+        self._elements = None
+        self._classes = {}
+
+    def _read_names(self, getter):
+        getter(self.ctx)
+        data = self._str_data[0]
+        return tuple(ffi.string(data[idx]) for idx in range(self._str_count[0]))
+
+    @staticmethod
+    def _index(names):
+        return {name.decode().lower(): idx for idx, name in enumerate(names)}
+
+    def _check_error(self):
+        number = lib.ctx_Error_Get_Number(self.ctx)
+        if number:
+            raise RuntimeError(f'(#{number}) {ffi.string(lib.ctx_Error_Get_Description(self.ctx)).decode()}')
+
+    def encode(self, name: str) -> bytes:
+        '''Encoded name, cached (e.g. for the functions that still take names).'''
+        encoded = self._encoded.get(name)
+        if encoded is None:
+            encoded = self._encoded.setdefault(name, name.encode())
+
+        return encoded
+
+    @property
+    def bus_names(self) -> tuple:
+        '''Names of the buses, as bytes, in index order.'''
+        if self._buses is None:
+            names = self._read_names(lib.ctx_Circuit_Get_AllBusNames_GR)
+            self._buses = (names, self._index(names))
+
+        return self._buses[0]
+
+    @property
+    def element_names(self) -> tuple:
+        '''Full names of the circuit elements, as bytes, in index order.'''
+        if self._elements is None or len(self._elements[0]) != lib.ctx_Circuit_Get_NumCktElements(self.ctx):
+            names = self._read_names(lib.ctx_Circuit_Get_AllElementNames_GR)
+            self._elements = (names, self._index(names))
+
+        return self._elements[0]
+
+    def bus_index(self, name: str) -> int:
+        '''Index (0-based) of the bus, as used by `ctx_Circuit_SetActiveBusi`.'''
+        self.bus_names
+        try:
+            return self._buses[1][name.lower()]
+        except KeyError:
+            raise KeyError(f'Bus not found: {name!r}') from None
+
+    def element_index(self, name: str) -> int:
+        '''Index (0-based) of the circuit element, as used by `ctx_Circuit_SetCktElementIndex`.'''
+        key = name.lower()
+        idx = self._elements[1].get(key) if self._elements is not None else None
+        if idx is None:
+            # Could be a new element
+            self._elements = None
+            self.element_names
+            idx = self._elements[1].get(key)
+            if idx is None:
+                raise KeyError(f'Element not found: {name!r}')
+
+        return idx
+
+    def class_names(self, class_name: str) -> tuple:
+        '''Names of the elements of the class, as bytes, in index order.'''
+        key = class_name.lower()
+        cached = self._classes.get(key)
+        ctx = self.ctx
+        prev_class = ffi.string(lib.ctx_ActiveClass_Get_ActiveClassName(ctx))
+        lib.ctx_DSS_SetActiveClass(ctx, self.encode(class_name))
+        try:
+            self._check_error()
+            if cached is not None and len(cached[0]) == lib.ctx_ActiveClass_Get_Count(ctx):
+                return cached[0]
+
+            names = self._read_names(lib.ctx_ActiveClass_Get_AllNames_GR)
+        finally:
+            if prev_class:
+                lib.ctx_DSS_SetActiveClass(ctx, prev_class)
+
+        self._classes[key] = (names, self._index(names))
+        return names
+
+    def class_index(self, class_name: str, name: str) -> int:
+        '''
+        Index (1-based) of the element in its class, as used by the `idx`
+        properties of the class interfaces (e.g. `ctx_Loads_Set_idx`).
+        '''
+        key = name.lower()
+        self.class_names(class_name)
+        idx = self._classes[class_name.lower()][1].get(key)
+        if idx is None:
+            # Could be a new element
+            self._classes.pop(class_name.lower(), None)
+            self.class_names(class_name)
+            idx = self._classes[class_name.lower()][1].get(key)
+            if idx is None:
+                raise KeyError(f'Element not found: {class_name}.{name}')
+
+        return idx + 1
+
+    def set_active_bus(self, name: str) -> int:
+        '''Activate the bus by name; returns its index.'''
+        idx = self.bus_index(name)
+        lib.ctx_Circuit_SetActiveBusi(self.ctx, idx)
+        return idx
+
+    def set_active_element(self, name: str) -> int:
+        '''Activate the circuit element by full name; returns its index.'''
+        idx = self.element_index(name)
+        lib.ctx_Circuit_SetCktElementIndex(self.ctx, idx)
+        return idx
+
+
+# By `ctx_key`; dropped by `forget_ctx`
+_ctx_to_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_name_cache(ctx) -> NameCache:
+    '''Get the (shared) NameCache for a DSS context.'''
+    key = ctx_key(ctx)
+    cache = _ctx_to_cache.get(key)
+    if cache is not None:
+        return cache
+
+    # Created only once per context, since it registers event handlers
+    with _cache_lock:
+        cache = _ctx_to_cache.get(key)
+        if cache is None:
+            cache = _ctx_to_cache[key] = NameCache(ctx)
+
+    return cache
+
+
+@register_forget_hook
+def _forget_cache(ctx):
+    with _cache_lock:
+        cache = _ctx_to_cache.pop(ctx_key(ctx), None)
+
+    if cache is not None:
+        cache._unregister()
+
+
+__all__ = ['NameCache', 'get_name_cache']
@@ -0,0 +1,153 @@
+'''
+Runs independent scenarios (snapshots, contingencies, etc.) in parallel on a
+pool of DSS contexts, in a single process.
+
+The calls through the cffi module release the GIL, so different contexts can
+solve at the same time in different threads. `ContextPool` creates one context
+per worker thread (context affinity: a context is only ever used by the thread
+that owns it), compiles the same base circuit in each, and maps a scenario
+function over the scenarios:
+
+    def contingency(ctx, line):
+        run_commands(ctx, [f'open line.{line} term=1', 'solve'])
+        result = bus_vmag_pu(ctx)
+        run_commands(ctx, [f'close line.{line} term=1'])
+        return result
+
+    with ContextPool(8, base_commands) as pool:
+        res = pool.run(contingency, line_names)
+        print(res.throughput, 'scenarios/s')
+
+The scenario function must leave the context ready for the next scenario;
+scenarios are assigned to the contexts in no particular order.
+
+The engine is not reentrant for a single context: use one context per thread,
+never the same context from several threads at once.
+
+Requires NumPy.
+'''
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from ._numpy import np
+from . import ffi, lib
+from .contexts import dispose_ctx
+
+RunResult = namedtuple('RunResult', ['results', 'elapsed', 'throughput'])
+RunResult.__doc__ = '''
+Results of `ContextPool.run`: `results` in the same order as the scenarios
+(stacked in a single array if requested and possible), total `elapsed`
+time in seconds and `throughput` in scenarios per second.
+'''
+
+
+def run_commands(ctx, commands):
+    '''Run the DSS commands on the context, raising RuntimeError on errors.'''
+    if isinstance(commands, str):
+        commands = commands.splitlines()
+
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        number = lib.ctx_Error_Get_Number(ctx)
+        if number:
+            raise RuntimeError(f'(#{number}) {ffi.string(lib.ctx_Error_Get_Description(ctx)).decode()}')
+
+
+class ContextPool:
+    '''
+    Pool of `workers` DSS contexts, each used by a single worker thread.
+
+    `setup` prepares each new context: either DSS commands (a string or a list
+    of strings, e.g. `['redirect master.dss', 'solve']`) or a function
+    called with the context. Contexts are created and set up when the pool
+    is created, in parallel.
+    '''
+
+    def __init__(self, workers: int = None, setup=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.contexts = [lib.ctx_New() for _ in range(self.workers)]
+        self._free_contexts = queue.SimpleQueue()
+        self._local = threading.local()
+        for ctx in self.contexts:
+            self._free_contexts.put(ctx)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix='dss-context',
+            initializer=self._init_worker,
+        )
+        if setup is not None:
+            try:
+                self.broadcast(setup if callable(setup) else lambda ctx: run_commands(ctx, setup))
+            except:
+                self.close()
+                raise
+
+    def _init_worker(self):
+        self._local.ctx = self._free_contexts.get()
+
+    def _call(self, func, args):
+        return func(self._local.ctx, *args)
+
+    def broadcast(self, func) -> list:
+        '''
+        Call `func(ctx)` once on every context, from its own thread, e.g. to
+        change the base circuit. Returns the results in the order of `contexts`.
+        '''
+        barrier = threading.Barrier(self.workers)
+
+        def call_once():
+            # The barrier holds each thread until all have taken a task, so
+            # every worker (and so every context) runs exactly one call
+            barrier.wait()
+            ctx = self._local.ctx
+            return ctx, func(ctx)
+
+        futures = [self._executor.submit(call_once) for _ in range(self.workers)]
+        results = dict(f.result() for f in futures)
+        return [results[ctx] for ctx in self.contexts]
+
+    def map(self, func, scenarios, *iterables):
+        '''
+        Like `Executor.map`, calling `func(ctx, scenario, ...)` on the context of
+        the worker thread. Returns an iterator over the results, in order.
+        '''
+        return self._executor.map(lambda *args: self._call(func, args), scenarios, *iterables)
+
+    def run(self, func, scenarios, stack: bool = True) -> RunResult:
+        '''
+        Run `func(ctx, scenario)` for all the scenarios. The results are converted
+        to NumPy arrays; with `stack=True`, results of the same shape are stacked
+        in a single array, with one row per scenario.
+        '''
+        t0 = time.perf_counter()
+        results = [np.asarray(r) for r in self.map(func, scenarios)]
+        elapsed = time.perf_counter() - t0
+        if stack and results and all(r.shape == results[0].shape for r in results):
+            results = np.stack(results)
+
+        return RunResult(results, elapsed, len(results) / elapsed if elapsed > 0 else float('inf'))
+
+    def close(self):
+        '''Wait for the pending scenarios and dispose the contexts.'''
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        for ctx in self.contexts:
+            dispose_ctx(ctx)
+
+        self.contexts = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+__all__ = ['ContextPool', 'RunResult', 'run_commands']
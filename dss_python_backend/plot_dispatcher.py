@@ -0,0 +1,169 @@
+'''
+Non-blocking plot callback: the plot parameters passed by the engine are
+copied and queued, and the engine continues while the plots are rendered by a
+background thread or process.
+
+    def render(params):
+        ... # e.g. matplotlib, with a non-interactive backend, saving to files
+
+    with PlotDispatcher(ctx, render) as plots:
+        ... # run scripts; "plot" commands return immediately
+
+    # Headless runs: drop all plots without entering Python
+    PlotDispatcher(ctx, mode='discard')
+
+The renderer receives the plot parameters as a dict (the decoded JSON) and
+runs after the engine has moved on, so it must not query the engine state
+for the plot (e.g. bus coordinates); plots that need it should be rendered
+synchronously. In "thread" mode, GUI toolkits (interactive matplotlib
+backends) usually require the main thread; use "process" mode, where the
+renderer must be picklable (a module-level function).
+
+At most `max_pending` plots are queued or rendering; further plots are
+dropped and counted (or, with `block=True`, the engine waits for a slot).
+
+Note that the engine only calls the plot callback when `AllowForms` is enabled.
+
+The dispatcher replaces the plot callback of the context (e.g. the one
+installed by DSS-Python); `close` unregisters it, so any previous callback must
+be registered again by its owner. Use a single dispatcher per context.
+'''
+import atexit
+import json
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from . import ffi, lib
+
+_ENQUEUE_CALLBACK = ffi.addressof(lib, 'altdss_python_plot_enqueue')
+_DISCARD_CALLBACK = ffi.addressof(lib, 'altdss_python_plot_discard')
+
+MODES = ('thread', 'process', 'discard')
+
+# Active dispatchers, by context
+_dispatchers = {}
+
+
+def _render(renderer, params):
+    return renderer(json.loads(params))
+
+
+class PlotDispatcher:
+    '''
+    Renders the plots of a DSS context with `renderer` in the background
+    ("thread" or "process" `mode`), or discards them ("discard" mode).
+    '''
+
+    def __init__(self, ctx, renderer=None, mode: str = 'thread', max_pending: int = 16, block: bool = False):
+        if mode not in MODES:
+            raise ValueError(f'Invalid mode {mode!r}; use one of {MODES}')
+
+        if mode != 'discard' and renderer is None:
+            raise ValueError('A renderer is required, except in "discard" mode')
+
+        self.ctx = ctx
+        self.renderer = renderer
+        self.mode = mode
+        self.block = block
+        self.dropped = 0
+        self.errors = []
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = set()
+        self._executor = None
+        if mode == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dss_plot')
+        elif mode == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+
+        if mode == 'discard':
+            lib.ctx_DSS_RegisterPlotCallback(ctx, _DISCARD_CALLBACK)
+        else:
+            _dispatchers[ctx] = self
+            lib.ctx_DSS_RegisterPlotCallback(ctx, _ENQUEUE_CALLBACK)
+
+    def _done(self, future):
+        self._pending.discard(future)
+        self._slots.release()
+        if future.cancelled():
+            return
+
+        ex = future.exception()
+        if ex is not None:
+            self.errors.append(ex)
+
+    def submit(self, params: str) -> bool:
+        '''
+        Queue the plot parameters (the JSON string from the engine); returns
+        False if the plot was dropped.
+        '''
+        if self._executor is None:
+            return False
+
+        if not self._slots.acquire(blocking=self.block):
+            self.dropped += 1
+            return False
+
+        try:
+            future = self._executor.submit(_render, self.renderer, params)
+        except:
+            self._slots.release()
+            raise
+
+        self._pending.add(future)
+        future.add_done_callback(self._done)
+        return True
+
+    def close(self, wait: bool = True):
+        '''
+        Unregister the dispatcher from the engine and stop the worker, after
+        rendering the pending plots if `wait`.
+        '''
+        if self.ctx is None:
+            return
+
+        lib.ctx_DSS_RegisterPlotCallback(self.ctx, ffi.NULL)
+        if _dispatchers.get(self.ctx) is self:
+            del _dispatchers[self.ctx]
+
+        self.ctx = None
+        if self._executor is not None:
+            if not wait:
+                # Drop the plots not started yet (as `cancel_futures`, which
+                # requires Python 3.9)
+                for future in list(self._pending):
+                    future.cancel()
+
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+@ffi.def_extern()
+def altdss_python_plot_enqueue(ctx, jsonParams):
+    dispatcher = _dispatchers.get(ctx)
+    if dispatcher is None:
+        return 0
+
+    try:
+        dispatcher.submit(ffi.string(jsonParams).decode())
+    except Exception as ex:
+        err_ptr = lib.ctx_Error_Get_NumberPtr(ctx)
+        err_ptr[0] = 1
+        lib.ctx_Error_Set_Description(ctx, f"Python plot dispatcher exception: {ex}".encode())
+
+    return 0
+
+
+def _close_dispatchers():
+    '''Unregister the dispatchers at exit, since the engine may outlive them.'''
+    for dispatcher in list(_dispatchers.values()):
+        dispatcher.close(wait=False)
+
+atexit.register(_close_dispatchers)
+
+__all__ = ['PlotDispatcher', 'MODES']
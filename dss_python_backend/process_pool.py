@@ -0,0 +1,258 @@
+'''
+Runs independent scenarios in a pool of processes, each owning one DSS
+context, with the results written to shared memory.
+
+This complements `parallel.ContextPool` for workloads that hold the GIL (e.g.
+controls or event handlers written in Python). Instead of pickling the
+results back, the workers write them directly into NumPy arrays backed by
+`multiprocessing.shared_memory` blocks allocated by the parent; only the
+scenario definitions (and the names of the blocks) cross the process
+boundaries.
+
+The outputs are declared as a dict of name to `(shape, dtype)` per scenario.
+The scenario function receives the context, the scenario and a dict of
+writable views for its own row of each output:
+
+    def contingency(ctx, line, out):
+        run_commands(ctx, [f'open line.{line} term=1', 'solve'])
+        out['vmag_pu'][:] = get_gr_views(ctx).float64(lib.ctx_Circuit_Get_AllBusVmagPu_GR)
+        run_commands(ctx, [f'close line.{line} term=1'])
+
+    with ProcessContextPool(8, base_commands) as pool:
+        shapes = pool.probe(output_shapes)
+        with pool.run(contingency, line_names, shapes) as res:
+            worst = res['vmag_pu'].min(axis=1)
+
+The scenario and setup functions must be importable by the workers (i.e.
+defined at module level). Requires NumPy and Python 3.8+.
+'''
+import os
+import sys
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from ._numpy import np
+
+# Worker state; each worker process owns a single context
+_worker_ctx = None
+
+
+def _init_worker(setup):
+    global _worker_ctx
+    from . import lib
+    from .parallel import run_commands
+
+    _worker_ctx = lib.ctx_New()
+    if setup is None:
+        return
+
+    if callable(setup):
+        setup(_worker_ctx)
+    else:
+        run_commands(_worker_ctx, setup)
+
+
+def _attach(shm_name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(shm_name, track=False)
+
+    # The resource tracker is shared with the parent, which owns the block
+    return shared_memory.SharedMemory(shm_name)
+
+
+def _as_array(shm, shape, dtype):
+    # np.frombuffer keeps the buffer exported while any view exists, so the
+    # block cannot be unmapped under them (np.ndarray(buffer=...) does not)
+    dtype = np.dtype(dtype)
+    return np.frombuffer(shm.buf, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+
+# Blocks that could not be closed because views of them were still
+# referenced (e.g. `w = res['x']`, or through an exception). They stay mapped,
+# and are closed by a later `_close_block` once the views are gone, or
+# unmapped when the process exits. Unlinked blocks are freed by the system
+# after their last mapping is gone.
+_pinned = []
+_pinned_lock = threading.Lock()
+
+
+def _try_close(shm) -> bool:
+    try:
+        shm.close()
+    except BufferError:
+        return False
+
+    return True
+
+
+def _close_block(shm):
+    with _pinned_lock:
+        _pinned[:] = [pinned for pinned in _pinned if not _try_close(pinned)]
+        if not _try_close(shm):
+            _pinned.append(shm)
+
+
+def _run_chunk(func, blocks, start, scenarios):
+    shms = [_attach(shm_name) for shm_name, _, _ in blocks.values()]
+    try:
+        arrays = {
+            name: _as_array(shm, shape, dtype)
+            for shm, (name, (_, shape, dtype)) in zip(shms, blocks.items())
+        }
+        for i, scenario in enumerate(scenarios, start):
+            # arr[i, ...] is a (writable) view even for scalar outputs
+            func(_worker_ctx, scenario, {name: arr[i, ...] for name, arr in arrays.items()})
+
+        del arrays
+    finally:
+        for shm in shms:
+            _close_block(shm)
+
+    return len(scenarios)
+
+
+def _run_probe(func):
+    return {
+        name: (np.shape(value), np.asarray(value).dtype.str)
+        for name, value in func(_worker_ctx).items()
+    }
+
+
+def _run_call(func):
+    return func(_worker_ctx)
+
+
+class SharedResults:
+    '''
+    Results of `ProcessContextPool.run`, as NumPy arrays backed by shared memory,
+    with one row per scenario. Use as a mapping (`res['name']`). `close`
+    removes the shared memory blocks. Arrays still referenced after that stay
+    usable: their blocks are kept mapped in this process until the arrays are
+    collected and another block is closed, or until the process exits.
+    '''
+
+    def __init__(self, outputs, count):
+        self._blocks = {}
+        self.arrays = {}
+        try:
+            for name, (shape, dtype) in outputs.items():
+                dtype = np.dtype(dtype)
+                shape = (count,) + ((shape,) if isinstance(shape, int) else tuple(shape))
+                nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+                shm = shared_memory.SharedMemory(create=True, size=nbytes)
+                self._blocks[name] = shm
+                self.arrays[name] = _as_array(shm, shape, dtype)
+                self.arrays[name].fill(0)
+        except:
+            self.close()
+            raise
+
+    def _specs(self):
+        return {
+            name: (self._blocks[name].name, arr.shape, arr.dtype.str)
+            for name, arr in self.arrays.items()
+        }
+
+    def __getitem__(self, name) -> np.ndarray:
+        return self.arrays[name]
+
+    def __iter__(self):
+        return iter(self.arrays)
+
+    def __len__(self):
+        return len(self.arrays)
+
+    def keys(self):
+        return self.arrays.keys()
+
+    def close(self):
+        '''Release and remove the shared memory blocks.'''
+        self.arrays = {}
+        blocks, self._blocks = self._blocks, {}
+        for shm in blocks.values():
+            # Remove the name first, so the block is freed even if it can't be
+            # closed here
+            shm.unlink()
+            _close_block(shm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ProcessContextPool:
+    '''
+    Pool of `workers` processes, each with its own DSS context, prepared by
+    `setup`: either DSS commands (a string or a list of strings) or a
+    module-level function called with the context.
+
+    The workers are started with the "spawn" method by default, so they do
+    not inherit the state of the engine in the parent process.
+    '''
+
+    def __init__(self, workers: int = None, setup=None, mp_context=None, chunksize: int = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        if mp_context is None or isinstance(mp_context, str):
+            mp_context = multiprocessing.get_context(mp_context or 'spawn')
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(setup,),
+        )
+
+    def probe(self, func) -> dict:
+        '''
+        Call `func(ctx)` in one of the workers; it should return a dict of
+        name to array, as produced by the scenarios. Returns the `outputs`
+        specification for `run`, i.e. a dict of name to `(shape, dtype)`.
+        '''
+        return self._executor.submit(_run_probe, func).result()
+
+    def submit(self, func):
+        '''Call `func(ctx)` in one of the workers; returns a Future.'''
+        return self._executor.submit(_run_call, func)
+
+    def run(self, func, scenarios, outputs: dict) -> SharedResults:
+        '''
+        Run `func(ctx, scenario, out)` for all the scenarios, where `out` has
+        the views of the row of each output for the scenario.
+        '''
+        scenarios = list(scenarios)
+        results = SharedResults(outputs, len(scenarios))
+        try:
+            blocks = results._specs()
+            chunksize = self.chunksize or max(1, len(scenarios) // (4 * self.workers))
+            futures = [
+                self._executor.submit(_run_chunk, func, blocks, start, scenarios[start:start + chunksize])
+                for start in range(0, len(scenarios), chunksize)
+            ]
+            for future in futures:
+                future.result()
+        except:
+            results.close()
+            raise
+
+        return results
+
+    def close(self):
+        '''Shut down the worker processes.'''
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+__all__ = ['ProcessContextPool', 'SharedResults']
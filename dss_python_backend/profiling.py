@@ -0,0 +1,84 @@
+'''
+Call counters of the profiling build of the native module (`_dss_capip`),
+loaded when DSS_PYTHON_BACKEND_PROFILE=1 is set before importing
+dss_python_backend.
+
+In this build, each `ctx_*` function called through `lib` counts its calls and
+accumulates its wall time, from all threads. This shows which API calls an
+application (or the higher-level packages) spends time in:
+
+    $ DSS_PYTHON_BACKEND_PROFILE=1 python my_script.py
+
+    from dss_python_backend import profiling
+    ... # run the application
+    print(profiling.report(top=20))
+
+The times are inclusive: nested calls (e.g. from callbacks running inside
+`ctx_Text_Set_Command`) are also included in the outer call. The calls made
+internally by the helpers of this package (e.g. the bulk getters) are not
+counted.
+'''
+from collections import namedtuple
+from . import ffi, lib
+
+CallStats = namedtuple('CallStats', ['name', 'calls', 'total', 'mean'])
+
+
+def enabled() -> bool:
+    '''True if the profiling build of the native module is loaded.'''
+    return hasattr(lib, 'altdss_python_prof_read')
+
+
+def _require():
+    if not enabled():
+        raise RuntimeError('The profiling build is not loaded; set DSS_PYTHON_BACKEND_PROFILE=1 before importing dss_python_backend.')
+
+
+def stats(reset: bool = False) -> list:
+    '''
+    Counters of the functions called since the start or the last reset, as a
+    list of `CallStats` (times in seconds), sorted by total time. With
+    `reset`, the counters are reset after reading.
+    '''
+    _require()
+    size = lib.altdss_python_prof_size()
+    calls = ffi.new('int64_t[]', size)
+    nanoseconds = ffi.new('int64_t[]', size)
+    lib.altdss_python_prof_read(calls, nanoseconds, reset)
+    result = [
+        CallStats(
+            ffi.string(lib.altdss_python_prof_name(idx)).decode(),
+            calls[idx],
+            1e-9 * nanoseconds[idx],
+            1e-9 * nanoseconds[idx] / calls[idx]
+        )
+        for idx in range(size)
+        if calls[idx]
+    ]
+    result.sort(key=lambda s: s.total, reverse=True)
+    return result
+
+
+def reset():
+    '''Reset all counters.'''
+    stats(reset=True)
+
+
+def clock_overhead() -> float:
+    '''Approximate cost of a clock read in the wrappers, in seconds.'''
+    _require()
+    return lib.altdss_python_prof_clock_overhead()
+
+
+def report(top: int = None, reset: bool = False) -> str:
+    '''Table of the `top` functions (or all) by total time.'''
+    rows = stats(reset)
+    total = sum(s.total for s in rows)
+    lines = [f'{"function":<48} {"calls":>12} {"total (s)":>12} {"mean (us)":>12} {"%":>6}']
+    for s in rows[:top]:
+        lines.append(f'{s.name:<48} {s.calls:>12} {s.total:>12.6f} {1e6 * s.mean:>12.3f} {100 * s.total / total if total else 0:>6.1f}')
+
+    return '\n'.join(lines)
+
+
+__all__ = ['CallStats', 'enabled', 'stats', 'reset', 'clock_overhead', 'report']
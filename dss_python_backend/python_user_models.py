@@ -0,0 +1,302 @@
+'''
+Python implementations of the PVSystem, Storage and CapControl user models,
+through the `_dss_<kind>` modules (see `gen_user_model` for the generators).
+
+Each kind has a base class; subclass it and set it with `use_model` before
+the elements are created. One object is created per element, and the engine
+calls are dispatched to the object of the selected element:
+
+    class MyPV(PVSystemUserModel):
+        def calc(self, V, I):
+            I[:] = ...
+
+    use_model('PVSystemUserModel', MyPV)
+    dss.Text.Command = f'new pvsystem.pv1 bus1=b1 phases=3 usermodel="{library_path("PVSystemUserModel")}"'
+
+The Storage elements use `StoreUserModel` (`Storage.UserModel`) and
+`StoreDynaModel` (`Storage.DynaDLL`); the CapControl elements use
+`CapUserControl` (`CapControl.UserModel`).
+
+The callbacks provided by the engine to the user models operate on the prime
+DSS instance, so the circuit must be loaded in the prime context. Functions
+bound with `user_models.bind_native` take precedence over these.
+
+Requires NumPy.
+'''
+import atexit
+from ._numpy import np
+from . import lib as dss_lib
+from ._user_model_common import PerInstanceHandler, write_name
+from .user_models import get_module, library_path
+
+
+class _DynamicsUserModel:
+    '''
+    Common base of the PVSystem and Storage user models. `V` and `I` are
+    complex arrays with the terminal voltages and currents (one element per
+    conductor, `num_conductors` as when the element was created), valid only
+    during the call.
+    '''
+
+    # Names of the state variables, exposed in `vars`
+    var_names = ()
+
+    def __init__(self, name: str, num_conductors: int, dyna_data, callbacks):
+        self.name = name
+        self.num_conductors = num_conductors
+        self.dyna_data = dyna_data
+        self.callbacks = callbacks
+        self.vars = np.zeros(len(self.var_names))
+        self._saved_vars = self.vars.copy()
+
+    def edit(self, params: str):
+        '''Process the parameters from the `UserData` (or `DynaData`) property.'''
+
+    def init(self, V, I):
+        '''Initialize the state variables for the dynamics, from the solved V and I.'''
+
+    def calc(self, V, I):
+        '''Compute the terminal currents `I` for the terminal voltages `V`.'''
+
+    def integrate(self):
+        '''Integrate the state variables over one time step (`dyna_data.h`).'''
+
+    def update(self):
+        '''Called when the element properties change.'''
+
+    def save(self):
+        self._saved_vars[:] = self.vars
+
+    def restore(self):
+        self.vars[:] = self._saved_vars
+
+
+class PVSystemUserModel(_DynamicsUserModel):
+    '''Base class for PVSystem user models (`PVSystem.UserModel`).'''
+
+
+class StoreUserModel(_DynamicsUserModel):
+    '''Base class for Storage user models (`Storage.UserModel`).'''
+
+
+class StoreDynaModel(_DynamicsUserModel):
+    '''Base class for Storage dynamics models (`Storage.DynaDLL`); `save` and `restore` are not used.'''
+
+
+class CapUserControl:
+    '''Base class for CapControl user models (`CapControl.UserModel`).'''
+
+    def __init__(self, name: str, callbacks):
+        self.name = name
+        self.callbacks = callbacks
+
+    def edit(self, params: str):
+        '''Process the parameters from `CapControl.UserData`.'''
+
+    def update(self):
+        '''Called when the element properties change.'''
+
+    def sample(self):
+        '''Sample the controlled quantities; push actions with `callbacks.ControlQueuePush`.'''
+
+    def do_pending(self, code: int, proxy_hdl: int):
+        '''Execute a pending action from the control queue.'''
+
+
+BASE_CLASSES = {
+    'PVSystemUserModel': PVSystemUserModel,
+    'StoreUserModel': StoreUserModel,
+    'StoreDynaModel': StoreDynaModel,
+    'CapUserControl': CapUserControl,
+}
+
+
+class _PerInstanceHandler(PerInstanceHandler):
+    '''Dispatches the engine calls of a kind of model to one object per element.'''
+
+    def __init__(self, kind, model_cls):
+        super().__init__(get_module(kind).ffi, model_cls)
+
+    def _new(self, dyna_data, callbacks):
+        ffi = self.ffi
+        # The element is the active element while it is being created
+        name = ffi.new('char[]', 256)
+        callbacks.GetActiveElementName(name, len(name))
+        name = ffi.string(name).decode()
+        if dyna_data is None:
+            model = self.model_cls(name, callbacks)
+        else:
+            info = ffi.new('int32_t[3]')
+            callbacks.GetActiveElementTerminalInfo(info + 0, info + 1, info + 2)
+            model = self.model_cls(name, info[0] * info[1], dyna_data, callbacks)
+
+        return self._add(model)
+
+    def _init(self, V, I):
+        model = self.active
+        model.init(*self._views(V, I, model.num_conductors))
+
+    def _calc(self, V, I):
+        model = self.active
+        model.calc(*self._views(V, I, model.num_conductors))
+
+
+# Current handler of each kind, set by `use_model`
+_handlers = dict.fromkeys(BASE_CLASSES)
+
+
+def use_model(kind: str, model_cls):
+    '''
+    Set the Python user model for the elements using `library_path(kind)`:
+    a subclass of the base class of the kind (e.g. `PVSystemUserModel` for
+    `'PVSystemUserModel'`). Use `None` to remove it. The model can only be
+    changed when no elements use it.
+    '''
+    if kind not in BASE_CLASSES:
+        raise ValueError(f'Unknown user model kind: {kind!r} (use gen_user_model for GenUserModel)')
+
+    handler = _handlers[kind]
+    if handler is not None and handler._has_instances():
+        raise RuntimeError('Cannot change the user model while there are elements using it; clear the circuit first.')
+
+    if model_cls is None:
+        _handlers[kind] = None
+    elif isinstance(model_cls, type) and issubclass(model_cls, BASE_CLASSES[kind]):
+        _handlers[kind] = _PerInstanceHandler(kind, model_cls)
+    else:
+        raise TypeError(f'Expected a {BASE_CLASSES[kind].__name__} subclass')
+
+
+@atexit.register
+def _delete_instances():
+    # See gen_user_model: the engine deletes the remaining instances after
+    # Python can no longer handle the calls.
+    if any(handler is not None and handler._has_instances() for handler in _handlers.values()):
+        dss_lib.ctx_Text_Set_Command(dss_lib.ctx_Get_Prime(), b'clear')
+
+
+def _handler(kind):
+    handler = _handlers[kind]
+    if handler is None:
+        raise RuntimeError(f'No {kind} model was set; see python_user_models.use_model')
+
+    return handler
+
+
+# Entry points called by the engine, through the user-model libraries
+
+def _define_dynamics_model(kind):
+    ffi = get_module(kind).ffi
+    prefix = f'py{kind}_'
+
+    @ffi.def_extern(name=prefix + 'New')
+    def New(DynaData, CallBacks):
+        return _handler(kind)._new(DynaData, CallBacks)
+
+    @ffi.def_extern(name=prefix + 'Delete')
+    def Delete(ID):
+        _handler(kind)._delete(ID[0])
+
+    @ffi.def_extern(name=prefix + 'Select')
+    def Select(ID):
+        return _handler(kind)._select(ID[0])
+
+    @ffi.def_extern(name=prefix + 'Edit')
+    def Edit(EditStr, MaxLen):
+        _handler(kind).active.edit(ffi.string(EditStr, MaxLen).decode())
+
+    @ffi.def_extern(name=prefix + 'Init')
+    def Init(V, I):
+        _handler(kind)._init(V, I)
+
+    @ffi.def_extern(name=prefix + 'Calc')
+    def Calc(V, I):
+        _handler(kind)._calc(V, I)
+
+    @ffi.def_extern(name=prefix + 'Integrate')
+    def Integrate():
+        _handler(kind).active.integrate()
+
+    @ffi.def_extern(name=prefix + 'UpdateModel')
+    def UpdateModel():
+        _handler(kind).active.update()
+
+    @ffi.def_extern(name=prefix + 'NumVars')
+    def NumVars():
+        return len(_handler(kind).model_cls.var_names)
+
+    @ffi.def_extern(name=prefix + 'GetAllVars')
+    def GetAllVars(vars):
+        values = np.ascontiguousarray(_handler(kind).active.vars, dtype=np.float64)
+        ffi.memmove(vars, values, values.nbytes)
+
+    # Variable indices are 1-based
+
+    @ffi.def_extern(name=prefix + 'GetVariable')
+    def GetVariable(i):
+        return float(_handler(kind).active.vars[i[0] - 1])
+
+    @ffi.def_extern(name=prefix + 'SetVariable')
+    def SetVariable(i, value):
+        _handler(kind).active.vars[i[0] - 1] = value[0]
+
+    @ffi.def_extern(name=prefix + 'GetVarName')
+    def GetVarName(i, VarName, MaxLen):
+        write_name(ffi, _handler(kind).model_cls.var_names[i[0] - 1], VarName, MaxLen)
+
+    if kind == 'StoreDynaModel':
+        return
+
+    @ffi.def_extern(name=prefix + 'Save')
+    def Save():
+        _handler(kind).active.save()
+
+    @ffi.def_extern(name=prefix + 'Restore')
+    def Restore():
+        _handler(kind).active.restore()
+
+
+def _define_cap_control():
+    kind = 'CapUserControl'
+    ffi = get_module(kind).ffi
+    prefix = f'py{kind}_'
+
+    @ffi.def_extern(name=prefix + 'New')
+    def New(CallBacks):
+        return _handler(kind)._new(None, CallBacks)
+
+    @ffi.def_extern(name=prefix + 'Delete')
+    def Delete(ID):
+        _handler(kind)._delete(ID[0])
+
+    @ffi.def_extern(name=prefix + 'Select')
+    def Select(ID):
+        return _handler(kind)._select(ID[0])
+
+    @ffi.def_extern(name=prefix + 'Edit')
+    def Edit(EditStr, MaxLen):
+        _handler(kind).active.edit(ffi.string(EditStr, MaxLen).decode())
+
+    @ffi.def_extern(name=prefix + 'UpdateModel')
+    def UpdateModel():
+        _handler(kind).active.update()
+
+    @ffi.def_extern(name=prefix + 'Sample')
+    def Sample():
+        _handler(kind).active.sample()
+
+    @ffi.def_extern(name=prefix + 'DoPending')
+    def DoPending(Code, ProxyHdl):
+        _handler(kind).active.do_pending(Code[0], ProxyHdl[0])
+
+
+for _kind in ('PVSystemUserModel', 'StoreUserModel', 'StoreDynaModel'):
+    _define_dynamics_model(_kind)
+
+_define_cap_control()
+
+
+__all__ = [
+    'PVSystemUserModel', 'StoreUserModel', 'StoreDynaModel', 'CapUserControl',
+    'BASE_CLASSES', 'library_path', 'use_model',
+]
@@ -0,0 +1,227 @@
+'''
+Streaming quasi-static time series (QSTS) stepping, with the results of each
+block of steps written to preallocated NumPy arrays.
+
+The quantities to record are declared once, when creating the `QSTSStepper`.
+Each one is either the name of a bulk getter (see `bulk.GETTERS`), a tuple
+`(name, class_name)` for the class getters (see `bulk.CLASS_GETTERS`), or a
+`*_GR` function from `lib` that returns float64 values. The bulk getters write
+each step directly to its row of the block; the GR results are copied from the
+GR buffer.
+
+`run` steps the context (one `ctx_Solution_Solve` with `Number=1` per step) and
+yields a `QSTSBlock` every `block_size` steps. The same arrays are reused for
+all blocks, so a year-long run does not accumulate memory; copy (or write out)
+what needs to be kept before the next block:
+
+    stepper = QSTSStepper(ctx, {
+        'vmag_pu': 'bus_vmag_pu',
+        'losses': lib.ctx_Circuit_Get_Losses_GR,
+        'load_powers': ('class_powers', 'Load'),
+    }, block_size=96)
+    for block in stepper.run(8760, mode=SolveModes.Yearly, step_size=3600):
+        np.save(f'vmag_{block.start}.npy', block['vmag_pu'])  # shape (block.count, number of buses)
+
+Requires NumPy.
+'''
+from ._numpy import np
+from . import ffi, lib
+from .bulk import GETTERS, CLASS_GETTERS
+from .enums import SolveModes
+from .gr_views import get_gr_views
+
+MODES = (SolveModes.Daily, SolveModes.Yearly, SolveModes.DutyCycle)
+
+
+def _raise_error(ctx, name=None):
+    number = lib.ctx_Error_Get_Number(ctx)
+    if number == 0:
+        raise ValueError(f'Could not read the quantity "{name}" (invalid class name?)')
+
+    raise RuntimeError(f'(#{number}) {ffi.string(lib.ctx_Error_Get_Description(ctx)).decode()}')
+
+
+class QSTSBlock:
+    '''
+    Results of `count` steps, starting at step `start` (0-based) of the run:
+    `hour` (the `dblHour` of each step) and the arrays of the quantities, by
+    name, each with one row per step. The arrays are views of the stepper
+    buffers, overwritten by the next block.
+    '''
+    __slots__ = ('start', 'count', 'hour', 'data')
+
+    def __init__(self, start, count, hour, data):
+        self.start = start
+        self.count = count
+        self.hour = hour
+        self.data = data
+
+    def __getitem__(self, name) -> np.ndarray:
+        return self.data[name]
+
+    def keys(self):
+        return self.data.keys()
+
+
+class _Quantity:
+    __slots__ = ('name', 'read', 'width', 'out', 'row_ptr')
+
+    def __init__(self, ctx, name, spec):
+        self.name = name
+        self.width = None
+        self.out = None
+        class_name = None
+        if isinstance(spec, tuple):
+            spec, class_name = spec
+
+        if isinstance(spec, str):
+            if class_name is None:
+                if spec not in GETTERS:
+                    raise ValueError(f'Unknown bulk getter "{spec}"')
+
+                func = GETTERS[spec]
+                self.read = lambda ctx, ptr, capacity: func(ctx, ptr, capacity)
+            else:
+                if spec not in CLASS_GETTERS:
+                    raise ValueError(f'Unknown class bulk getter "{spec}"')
+
+                func = CLASS_GETTERS[spec]
+                class_name = class_name.encode()
+                self.read = lambda ctx, ptr, capacity: func(ctx, class_name, ptr, capacity)
+        elif callable(spec):
+            if class_name is not None:
+                raise ValueError(f'Quantity "{name}": a class name is only valid for the class bulk getters')
+
+            float64 = get_gr_views(ctx).float64
+
+            def read(ctx, ptr, capacity):
+                values = float64(spec).array
+                if lib.ctx_Error_Get_NumberPtr(ctx)[0]:
+                    return -1
+
+                if len(values) == capacity:
+                    ffi.memmove(ptr, ffi.from_buffer(values), 8 * capacity)
+
+                return len(values)
+
+            self.read = read
+        else:
+            raise TypeError(f'Quantity "{name}": expected a bulk getter name or a GR function, got {type(spec).__name__}')
+
+
+class QSTSStepper:
+    '''
+    Steps a DSS context through time, recording the declared `quantities` (a
+    dict of name to quantity; see the module documentation) in blocks of
+    `block_size` steps.
+
+    The number of values of each quantity is fixed on the first step of a run;
+    if it changes during the run (e.g. elements were added), `RuntimeError` is
+    raised.
+    '''
+
+    def __init__(self, ctx, quantities: dict, block_size: int = 96):
+        if block_size < 1:
+            raise ValueError('block_size must be positive')
+
+        self.ctx = ctx
+        self.block_size = block_size
+        self.quantities = [_Quantity(ctx, name, spec) for name, spec in quantities.items()]
+        self.hour = np.zeros(block_size, dtype=np.float64)
+
+    def _allocate(self, quantity, width):
+        # Reuse the buffers from a previous run when the sizes match
+        if quantity.width != width:
+            quantity.width = width
+            quantity.out = np.zeros((self.block_size, width), dtype=np.float64)
+            quantity.row_ptr = ffi.from_buffer('double[]', quantity.out, require_writable=True)
+
+    def _record(self, row):
+        ctx = self.ctx
+        for quantity in self.quantities:
+            width = quantity.width
+            count = quantity.read(ctx, quantity.row_ptr + row * width, width)
+            if count == width:
+                continue
+
+            if count < 0:
+                _raise_error(ctx, quantity.name)
+
+            raise RuntimeError(f'The size of the quantity "{quantity.name}" changed during the run ({width} to {count})')
+
+    def _block(self, start, count):
+        if count == self.block_size:
+            data = {q.name: q.out for q in self.quantities}
+            return QSTSBlock(start, count, self.hour, data)
+
+        data = {q.name: q.out[:count] for q in self.quantities}
+        return QSTSBlock(start, count, self.hour[:count], data)
+
+    def run(self, steps: int, mode: SolveModes = None, step_size: float = None, start_hour: float = None):
+        '''
+        Generator that solves `steps` time steps and yields a `QSTSBlock` for
+        every `block_size` steps (the last one can be shorter).
+
+        The solution mode (`Daily`, `Yearly` or `DutyCycle`), the step size (in
+        seconds) and the starting hour are set if given; otherwise, the
+        current settings of the context are used. The `Number` setting of the
+        solution is restored at the end.
+        '''
+        ctx = self.ctx
+        # Changing the mode also resets Number, so keep the value from before
+        prev_number = lib.ctx_Solution_Get_Number(ctx)
+        if mode is not None:
+            if mode not in MODES:
+                raise ValueError(f'Unsupported solution mode for QSTS: {mode!r}')
+
+            lib.ctx_Solution_Set_Mode(ctx, mode)
+
+        if step_size is not None:
+            lib.ctx_Solution_Set_StepSize(ctx, step_size)
+
+        if start_hour is not None:
+            lib.ctx_Solution_Set_dblHour(ctx, start_hour)
+
+        if lib.ctx_Error_Get_NumberPtr(ctx)[0]:
+            _raise_error(ctx)
+
+        lib.ctx_Solution_Set_Number(ctx, 1)
+        try:
+            hour = self.hour
+            error_ptr = lib.ctx_Error_Get_NumberPtr(ctx)
+            block_size = self.block_size
+            row = 0
+            start = 0
+            for step in range(steps):
+                lib.ctx_Solution_Solve(ctx)
+                if error_ptr[0]:
+                    _raise_error(ctx)
+
+                if step == 0:
+                    for quantity in self.quantities:
+                        width = quantity.read(ctx, ffi.NULL, 0)
+                        if width < 0:
+                            _raise_error(ctx, quantity.name)
+
+                        self._allocate(quantity, width)
+
+                hour[row] = lib.ctx_Solution_Get_dblHour(ctx)
+                self._record(row)
+                row += 1
+                if row == block_size:
+                    yield self._block(start, row)
+                    start += row
+                    row = 0
+
+            if row:
+                yield self._block(start, row)
+        finally:
+            lib.ctx_Solution_Set_Number(ctx, prev_number)
+
+
+def qsts_blocks(ctx, quantities: dict, steps: int, block_size: int = 96, **kwargs):
+    '''Shortcut for `QSTSStepper(ctx, quantities, block_size).run(steps, **kwargs)`.'''
+    return QSTSStepper(ctx, quantities, block_size).run(steps, **kwargs)
+
+
+__all__ = ['QSTSBlock', 'QSTSStepper', 'qsts_blocks']
@@ -0,0 +1,126 @@
+'''
+Native implementations for the user-model DLLs (`_dss_<kind>` modules).
+
+Each user-model module exports the functions the engine expects from a user
+model DLL. By default, these are trampolines to the `extern "Python"`
+functions of the module (`py<kind>_<Function>`), useful for prototyping
+models in Python (see `gen_user_model` for the generators and
+`python_user_models` for the other kinds). Each function can instead be bound
+to a native implementation, which the exported function then calls directly,
+without going through Python:
+
+    # All functions of a compiled user-model DLL
+    bind_native('GenUserModel', '/path/to/mymodel.so')
+
+    # Some functions, from e.g. numba cfuncs or cffi function pointers
+    bind_native('GenUserModel', {'Calc': calc_cfunc.address, 'Integrate': integrate_ptr})
+
+    dss.Text.Command = f'new generator.g1 bus1=b1 model=6 usermodel="{library_path("GenUserModel")}"'
+
+Bind the functions before creating the elements that use the model; functions
+that are not bound keep using the Python implementation.
+'''
+import ctypes
+import importlib
+
+USER_MODELS = (
+    'GenUserModel',
+    'PVSystemUserModel',
+    'StoreDynaModel',
+    'StoreUserModel',
+    'CapUserControl',
+)
+
+# Keeps the bound libraries and function objects alive, per kind of model
+_bound = {kind: {} for kind in USER_MODELS}
+
+
+def get_module(kind: str):
+    '''Returns the compiled module for the kind of user model.'''
+    if kind not in USER_MODELS:
+        raise ValueError(f'Unknown user model kind: {kind!r}')
+
+    return importlib.import_module(f'._dss_{kind}', __package__)
+
+
+def library_path(kind: str) -> str:
+    '''Path of the shared library to use as the user model (e.g. `Generator.UserModel`).'''
+    return get_module(kind).__file__
+
+
+def function_names(kind: str):
+    '''Names of the functions exported by the user-model DLL.'''
+    prefix = f'py{kind}_'
+    return tuple(
+        name[len(prefix):]
+        for name in dir(get_module(kind).lib)
+        if name.startswith(prefix) and name != prefix + 'set_native'
+    )
+
+
+def _address(func) -> int:
+    if isinstance(func, int):
+        # e.g. numba cfunc's `address`
+        return func
+
+    if isinstance(func, ctypes._CFuncPtr):
+        return ctypes.cast(func, ctypes.c_void_p).value
+
+    # cffi function pointer, from any FFI instance
+    from . import ffi
+    return int(ffi.cast('uintptr_t', func))
+
+
+def bind_native(kind: str, source):
+    '''
+    Bind the functions of the user model `kind` to native implementations.
+    `source` is either the path of a shared library, which must export all the
+    functions of the user-model DLL, or a dict of function name to function
+    pointer (a cffi function pointer, a ctypes function or an address).
+
+    The native functions must match the signatures (and calling convention)
+    of the DSS user-model headers.
+    '''
+    mod = get_module(kind)
+    set_native = getattr(mod.lib, f'py{kind}_set_native')
+    names = function_names(kind)
+    bound = _bound[kind]
+    if isinstance(source, dict):
+        funcs = source
+        keepalive = None
+    else:
+        keepalive = ctypes.CDLL(str(source))
+        funcs = {name: getattr(keepalive, name) for name in names}
+
+    for name in funcs:
+        if name not in names:
+            raise ValueError(f'Unknown function for {kind}: {name!r}')
+
+    for name, func in funcs.items():
+        address = _address(func)
+        if not address:
+            raise ValueError(f'Invalid (null) function pointer for {kind}.{name}')
+
+        set_native(name.encode(), mod.ffi.cast('void*', address))
+        bound[name] = (keepalive, func)
+
+
+def unbind_native(kind: str, names=None):
+    '''
+    Revert the functions `names` (or all functions) of the user model `kind`
+    to the Python implementation.
+    '''
+    mod = get_module(kind)
+    set_native = getattr(mod.lib, f'py{kind}_set_native')
+    bound = _bound[kind]
+    if names is None:
+        names = function_names(kind)
+
+    for name in names:
+        if not set_native(name.encode(), mod.ffi.NULL):
+            raise ValueError(f'Unknown function for {kind}: {name!r}')
+
+        bound.pop(name, None)
+
+
+__all__ = ['USER_MODELS', 'get_module', 'library_path', 'function_names', 'bind_native', 'unbind_native']
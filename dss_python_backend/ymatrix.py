@@ -0,0 +1,170 @@
+'''
+Cached export of the compressed system Y matrix, as CSC arrays for SciPy.
+
+The arrays allocated by the engine (`ctx_YMatrix_GetCompressedYMatrix`) are
+wrapped as read-only NumPy arrays without copies, and released when no longer
+referenced. The result is cached per context and reused until the engine
+rebuilds the matrix: the cache is dropped on `AltDSSEvent.BuildSystemY` (and
+`AltDSSEvent.Clear`), through the context's `EventCallbackManager`. As with
+the engine function, pending changes (`SystemYChanged`) are only reflected
+after the matrix is rebuilt, e.g. by the next solution.
+
+    y = get_compressed_y(ctx)
+    Y = y.to_scipy()  # scipy.sparse.csc_matrix, sharing the arrays
+
+Requires NumPy (and SciPy for `to_scipy`).
+'''
+import threading
+from ._numpy import np
+from . import ffi, lib
+from .contexts import ctx_key, register_forget_hook
+from .enums import AltDSSEvent
+from .events import get_manager_for_ctx
+
+
+def _free_int32(ptr):
+    lib.DSS_Dispose_PInteger(ffi.new('int32_t**', ptr))
+
+
+def _free_double(ptr):
+    lib.DSS_Dispose_PDouble(ffi.new('double**', ptr))
+
+
+def _wrap(ptr, free, nbytes, dtype):
+    arr = np.frombuffer(ffi.buffer(ffi.gc(ptr, free), nbytes), dtype=dtype)
+    arr.setflags(write=False)
+    return arr
+
+
+class CompressedY:
+    '''
+    System Y matrix in CSC format: `data` (complex128), `indices` (row of each
+    value) and `indptr` (start of each column), all read-only, and `shape`.
+    '''
+    __slots__ = ('data', 'indices', 'indptr', 'shape', '_scipy')
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = shape
+        self._scipy = None
+
+    @property
+    def nnz(self) -> int:
+        return len(self.data)
+
+    def to_scipy(self):
+        '''The matrix as a `scipy.sparse.csc_matrix` sharing the arrays (cached).'''
+        if self._scipy is None:
+            from scipy.sparse import csc_matrix
+            self._scipy = csc_matrix((self.data, self.indices, self.indptr), shape=self.shape, copy=False)
+
+        return self._scipy
+
+
+class YMatrixCache:
+    '''
+    Cache of the compressed system Y matrix of a DSS context. Use
+    `get_ymatrix_cache` to get the shared instance for a context.
+    '''
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self._value = None
+        manager = get_manager_for_ctx(ctx)
+        manager.register_func(AltDSSEvent.BuildSystemY, self._on_change)
+        manager.register_func(AltDSSEvent.Clear, self._on_change)
+
+    def _unregister(self):
+        manager = get_manager_for_ctx(self.ctx)
+        manager.unregister_func(AltDSSEvent.BuildSystemY, self._on_change)
+        manager.unregister_func(AltDSSEvent.Clear, self._on_change)
+
+    def _on_change(self, ctx, evt, step, ptr):
+        self._value = None
+
+    def invalidate(self):
+        '''Drop the cached matrix.'''
+        self._value = None
+
+    def get(self, factor: bool = True) -> CompressedY:
+        '''
+        The compressed Y matrix, or None if the circuit has no system matrix
+        yet. With `factor`, the engine also factorizes the matrix when it
+        needs to export it.
+        '''
+        value = self._value
+        if value is None:
+            value = self._value = self._export(factor)
+
+        return value
+
+    def _export(self, factor):
+        nBus = ffi.new('uint32_t*')
+        nNz = ffi.new('uint32_t*')
+        ColPtr = ffi.new('int32_t**')
+        RowIdxPtr = ffi.new('int32_t**')
+        cValsPtr = ffi.new('double**')
+        lib.ctx_YMatrix_GetCompressedYMatrix(self.ctx, factor, nBus, nNz, ColPtr, RowIdxPtr, cValsPtr)
+        number = lib.ctx_Error_Get_Number(self.ctx)
+        # Take ownership of the arrays before anything else can fail
+        arrays = (
+            (ColPtr[0], _free_int32, (nBus[0] + 1) * 4, np.int32),
+            (RowIdxPtr[0], _free_int32, nNz[0] * 4, np.int32),
+            (cValsPtr[0], _free_double, nNz[0] * 16, np.complex128),
+        )
+        if number:
+            for ptr, free, _, _ in arrays:
+                if ptr != ffi.NULL:
+                    free(ptr)
+
+            raise RuntimeError(f'(#{number}) {ffi.string(lib.ctx_Error_Get_Description(self.ctx)).decode()}')
+
+        if not nBus[0] or not nNz[0]:
+            for ptr, free, _, _ in arrays:
+                if ptr != ffi.NULL:
+                    free(ptr)
+
+            return None
+
+        indptr, indices, data = (_wrap(*args) for args in arrays)
+        return CompressedY(data, indices, indptr, (nBus[0], nBus[0]))
+
+
+# By `ctx_key`; dropped by `forget_ctx`
+_ctx_to_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_ymatrix_cache(ctx) -> YMatrixCache:
+    '''Get the (shared) YMatrixCache for a DSS context.'''
+    key = ctx_key(ctx)
+    cache = _ctx_to_cache.get(key)
+    if cache is not None:
+        return cache
+
+    # Created only once per context, since it registers event handlers
+    with _cache_lock:
+        cache = _ctx_to_cache.get(key)
+        if cache is None:
+            cache = _ctx_to_cache[key] = YMatrixCache(ctx)
+
+    return cache
+
+
+@register_forget_hook
+def _forget_cache(ctx):
+    with _cache_lock:
+        cache = _ctx_to_cache.pop(ctx_key(ctx), None)
+
+    if cache is not None:
+        cache._unregister()
+
+
+def get_compressed_y(ctx, factor: bool = True) -> CompressedY:
+    '''The (cached) compressed system Y matrix of the context; see `YMatrixCache.get`.'''
+    return get_ymatrix_cache(ctx).get(factor)
+
+
+__all__ = ['CompressedY', 'YMatrixCache', 'get_ymatrix_cache', 'get_compressed_y']
@@ -94,16 +94,18 @@ setup(
     license="BSD",
     packages=['dss_python_backend'],
     setup_requires=["cffi>=1.11.2"],
-    cffi_modules=["dss_build.py:ffi_builder_{}".format(version) for version in ('', 'd')] + 
+    cffi_modules=["dss_build.py:ffi_builder_{}".format(version) for version in ('', 'd', 'p')] + 
         [
             'dss_build.py:ffi_builder_GenUserModel', 
-            #'dss_build.py:ffi_builder_PVSystemUserModel', 
-            #'dss_build.py:ffi_builder_StoreDynaModel', 
-            #'dss_build.py:ffi_builder_StoreUserModel', 
-            #'dss_build.py:ffi_builder_CapUserControl'
+            'dss_build.py:ffi_builder_PVSystemUserModel', 
+            'dss_build.py:ffi_builder_StoreDynaModel', 
+            'dss_build.py:ffi_builder_StoreUserModel', 
+            'dss_build.py:ffi_builder_CapUserControl'
         ],
     ext_package="dss_python_backend",
     install_requires=["cffi>=1.11.2"],
+    # Required by the array-based modules (gr_views, bulk, monitors, qsts...)
+    extras_require={"numpy": ["numpy>=1.17"]},
     # tests_require=["pytest"],
     zip_safe=False,
     classifiers=[
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import pytest
+from dss_python_backend import ffi, lib
+from dss_python_backend.async_events import AsyncEventStream, EventInfo, EventStreamOverflow
+from dss_python_backend.enums import AltDSSEvent
+from dss_python_backend.events import get_manager_for_ctx
+
+
+def emit(ctx, evt, step=0):
+    # Same path as the events from the engine
+    lib.altdss_python_util_callback(ctx, evt, step, ffi.NULL)
+
+
+def test_events_from_worker_thread():
+    ctx = lib.ctx_New()
+
+    async def main():
+        loop_thread = threading.get_ident()
+        woken_in = []
+        async with AsyncEventStream(ctx, [AltDSSEvent.Clear, AltDSSEvent.Legacy_StepControls]) as stream:
+            wakeup = stream._wakeup
+
+            def traced_wakeup():
+                woken_in.append(threading.get_ident())
+                wakeup()
+
+            stream._wakeup = traced_wakeup
+
+            def engine():
+                lib.ctx_Text_Set_Command(ctx, b'clear')
+                emit(ctx, AltDSSEvent.Legacy_StepControls, 5)
+
+            worker = threading.Thread(target=engine)
+            worker.start()
+            info = await asyncio.wait_for(stream.__anext__(), 5)
+            assert info.event == AltDSSEvent.Clear
+            received = [info]
+            while received[-1].event != AltDSSEvent.Legacy_StepControls:
+                received.append(await asyncio.wait_for(stream.__anext__(), 5))
+
+            worker.join()
+            # Legacy events carry no data
+            assert received[-1] == EventInfo(AltDSSEvent.Legacy_StepControls, 0, 0)
+            # The consumer was woken up in the loop thread, through call_soon_threadsafe
+            assert woken_in and all(ident == loop_thread for ident in woken_in)
+
+    asyncio.run(main())
+
+
+def test_close_unregisters_and_ends_iteration():
+    ctx = lib.ctx_New()
+    manager = get_manager_for_ctx(ctx)
+
+    async def main():
+        stream = AsyncEventStream(ctx, [AltDSSEvent.ReprocessBuses])
+        assert len(manager.ReprocessBuses) == 1
+        emit(ctx, AltDSSEvent.ReprocessBuses, 1)
+        stream.close()
+        stream.close()
+        assert manager.ReprocessBuses == ()
+        # Not received after closing
+        emit(ctx, AltDSSEvent.ReprocessBuses, 2)
+        # Queued events are still delivered, then the iteration ends
+        return [info.step async for info in stream]
+
+    assert asyncio.run(main()) == [1]
+
+
+def test_close_wakes_up_waiting_consumer():
+    ctx = lib.ctx_New()
+
+    async def main():
+        stream = AsyncEventStream(ctx, [AltDSSEvent.Clear])
+        consumer = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        threading.Thread(target=stream.close).start()
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(consumer, 5)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('overflow, expected', [
+    ('drop_oldest', [2, 3]),
+    ('drop_newest', [0, 1]),
+])
+def test_overflow_drop(overflow, expected):
+    ctx = lib.ctx_New()
+
+    async def main():
+        async with AsyncEventStream(ctx, [AltDSSEvent.ReprocessBuses], maxsize=2, overflow=overflow) as stream:
+            for step in range(4):
+                emit(ctx, AltDSSEvent.ReprocessBuses, step)
+
+            assert stream.dropped == 2
+            return [info.step for info in stream.drain()]
+
+    assert asyncio.run(main()) == expected
+
+
+def test_overflow_raise():
+    ctx = lib.ctx_New()
+
+    async def main():
+        async with AsyncEventStream(ctx, [AltDSSEvent.ReprocessBuses], maxsize=1, overflow='raise') as stream:
+            emit(ctx, AltDSSEvent.ReprocessBuses, 0)
+            emit(ctx, AltDSSEvent.ReprocessBuses, 1)
+            with pytest.raises(EventStreamOverflow):
+                await stream.__anext__()
+
+            assert (await stream.__anext__()).step == 0
+
+    asyncio.run(main())
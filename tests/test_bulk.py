@@ -0,0 +1,114 @@
+import array
+import numpy as np
+import pytest
+from dss_python_backend import lib
+from dss_python_backend.bulk import BulkReader, read_into
+from dss_python_backend.gr_views import get_gr_views
+
+
+def run(ctx, *commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        assert lib.ctx_Error_Get_Number(ctx) == 0, cmd
+
+
+def feeder(ctx, buses):
+    run(ctx, 'clear', 'new circuit.c bus1=b0 basekv=12.47')
+    for idx in range(1, buses):
+        run(ctx, f'new line.l{idx} bus1=b{idx - 1} bus2=b{idx} length=0.1')
+
+    run(ctx, f'new load.ld bus1=b{buses - 1} kw=100', 'solve')
+
+
+def gr_copy(ctx, getter):
+    return get_gr_views(ctx).float64(getter).copy()
+
+
+def test_read_into():
+    ctx = lib.ctx_New()
+    feeder(ctx, 3)
+    expected = gr_copy(ctx, lib.ctx_Circuit_Get_AllBusVolts_GR)
+    out = np.full(len(expected) + 4, -1.0)
+    assert read_into(ctx, 'bus_volts', out) == len(expected)
+    np.testing.assert_array_equal(out[:len(expected)], expected)
+    assert (out[len(expected):] == -1).all()
+
+    # Too small: nothing is written, the size is returned
+    small = np.zeros(2)
+    assert read_into(ctx, 'bus_volts', small) == len(expected)
+    assert not small.any()
+
+    # Any writable float64 buffer
+    buf = array.array('d', bytes(8 * len(expected)))
+    assert read_into(ctx, 'bus_volts', buf) == len(expected)
+    np.testing.assert_array_equal(buf, expected)
+
+
+def test_class_getter():
+    ctx = lib.ctx_New()
+    feeder(ctx, 3)
+    out = np.zeros(100)
+    # 2 lines x 2 terminals x 3 phases, complex
+    assert read_into(ctx, 'class_powers', out, 'Line') == 24
+    with pytest.raises(RuntimeError):
+        read_into(ctx, 'class_powers', out, 'NotAClass')
+
+    with pytest.raises(ValueError):
+        read_into(ctx, 'class_powers', out)
+
+    with pytest.raises(ValueError):
+        read_into(ctx, 'bus_volts', out, 'Line')
+
+    with pytest.raises(ValueError):
+        read_into(ctx, 'not_a_getter', out)
+
+
+@pytest.mark.parametrize('out, error', [
+    (np.zeros(8, dtype=np.float32), TypeError),
+    (np.zeros(4, dtype=np.complex128), TypeError),
+    (np.zeros(8, dtype='>f8'), TypeError),
+    ([0.0] * 8, TypeError),
+    (np.zeros((8, 2))[:, 0], ValueError),
+    (np.zeros(8)[::-1], ValueError),
+])
+def test_read_into_rejects_invalid_buffers(out, error):
+    ctx = lib.ctx_New()
+    feeder(ctx, 2)
+    with pytest.raises(error):
+        read_into(ctx, 'bus_vmag', out)
+
+
+def test_read_into_rejects_read_only():
+    ctx = lib.ctx_New()
+    feeder(ctx, 2)
+    out = np.zeros(8)
+    out.flags.writeable = False
+    with pytest.raises(ValueError):
+        read_into(ctx, 'bus_vmag', out)
+
+    with pytest.raises(ValueError):
+        read_into(ctx, 'bus_vmag', memoryview(bytes(64)).cast('d'))
+
+
+def test_reader_grows_buffer():
+    ctx = lib.ctx_New()
+    feeder(ctx, 3)
+    reader = BulkReader(ctx, 'bus_volts', complex=True)
+    volts = reader()
+    assert volts.dtype == np.complex128
+    np.testing.assert_array_equal(volts.view(np.float64), gr_copy(ctx, lib.ctx_Circuit_Get_AllBusVolts_GR))
+    out = reader.out
+    # Same array while the result fits
+    assert reader() is volts and reader.out is out
+
+    feeder(ctx, 50)
+    volts = reader()
+    assert reader.out is not out
+    assert len(reader.out) >= 2 * len(volts) == 2 * 3 * 50
+    np.testing.assert_array_equal(volts.view(np.float64), gr_copy(ctx, lib.ctx_Circuit_Get_AllBusVolts_GR))
+
+    # Smaller results reuse the grown buffer
+    out = reader.out
+    feeder(ctx, 5)
+    assert len(reader()) == 3 * 5
+    assert reader.out is out
@@ -0,0 +1,34 @@
+import pytest
+from dss_python_backend import lib
+from dss_python_backend.commands import CommandError, submit_commands
+
+
+def test_submit_in_chunks():
+    ctx = lib.ctx_New()
+    commands = ['new circuit.c bus1=b0 basekv=12.47']
+    commands += [f'new line.l{i} bus1=b{i} bus2=b{i + 1}' for i in range(25)]
+    assert submit_commands(ctx, iter(commands), chunk_size=10) == 26
+    lib.ctx_DSS_SetActiveClass(ctx, b'Line')
+    assert lib.ctx_ActiveClass_Get_Count(ctx) == 25
+
+
+def test_failing_command_index():
+    ctx = lib.ctx_New()
+    commands = ['new circuit.c bus1=a basekv=12.47', 'new load.ld1 bus1=a kw=10', 'notacommand x=1', 'new load.ld2 bus1=a kw=10']
+    with pytest.raises(CommandError) as info:
+        submit_commands(ctx, commands, chunk_size=2)
+
+    assert info.value.index == 2
+    assert info.value.command == 'notacommand x=1'
+    lib.ctx_DSS_SetActiveClass(ctx, b'Load')
+    assert lib.ctx_ActiveClass_Get_Count(ctx) == 1
+
+
+def test_nul_rejected():
+    ctx = lib.ctx_New()
+    commands = ['new circuit.c bus1=a basekv=12.47', 'new load.ld1 bus1=a\0 kw=10', 'new load.ld2 bus1=a kw=10']
+    with pytest.raises(ValueError, match='Command 1 '):
+        submit_commands(ctx, commands)
+
+    # Nothing from the chunk was run
+    assert lib.ctx_Circuit_Get_NumCktElements(ctx) == 0
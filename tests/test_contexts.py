@@ -0,0 +1,28 @@
+from dss_python_backend import events, lib
+from dss_python_backend.contexts import ctx_key, dispose_ctx, forget_ctx
+from dss_python_backend.enums import AltDSSEvent
+from dss_python_backend.events import get_manager_for_ctx
+from dss_python_backend.parallel import ContextPool
+
+
+def test_forget_ctx_drops_the_manager():
+    ctx = lib.ctx_New()
+    manager = get_manager_for_ctx(ctx)
+    seen = []
+    manager.register_func(AltDSSEvent.Clear, lambda *args: seen.append(args))
+    forget_ctx(ctx)
+    lib.ctx_Text_Set_Command(ctx, b'clear')
+    assert seen == []
+    assert get_manager_for_ctx(ctx) is not manager
+    dispose_ctx(ctx)
+
+
+def test_context_pool_close_forgets_contexts():
+    pool = ContextPool(2)
+    keys = [ctx_key(ctx) for ctx in pool.contexts]
+    for ctx in pool.contexts:
+        get_manager_for_ctx(ctx)
+
+    pool.close()
+    # The addresses may be reused by new contexts, which must not inherit the state
+    assert not any(key in events._managers or key in events._dispatch_tables for key in keys)
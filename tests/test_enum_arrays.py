@@ -0,0 +1,57 @@
+from enum import IntEnum
+import numpy as np
+from dss_python_backend.enum_arrays import (
+    enum_codes, enum_members, enum_names, has_flags, is_member, split_flags,
+)
+from dss_python_backend.enums import DSSObjectFlags, StorageStates
+
+
+class Sparse(IntEnum):
+    # Span larger than the dense lookup tables
+    low = -5000
+    zero = 0
+    high = 100000
+
+
+def test_has_flags():
+    F = DSSObjectFlags
+    flags = np.array([0, int(F.HasOCPDevice), int(F.HasOCPDevice | F.IsIsolated), int(F.IsIsolated | F.Checked)])
+    wanted = F.HasOCPDevice | F.IsIsolated
+    np.testing.assert_array_equal(has_flags(flags, wanted), [False, False, True, False])
+    np.testing.assert_array_equal(has_flags(flags, wanted, require_all=False), [False, True, True, True])
+    np.testing.assert_array_equal(has_flags(flags, F.Checked), [False, False, False, True])
+
+
+def test_split_flags():
+    F = DSSObjectFlags
+    columns = split_flags([int(F.Editing | F.IsIsolated), 0], F)
+    assert set(columns) == {member.name for member in F}
+    np.testing.assert_array_equal(columns['Editing'], [True, False])
+    np.testing.assert_array_equal(columns['IsIsolated'], [True, False])
+    assert not columns['Checked'].any()
+
+
+def test_names_and_members():
+    states = np.array([1, -1, 0, 7, 1])
+    np.testing.assert_array_equal(
+        enum_names(states, StorageStates, default='?'),
+        ['Discharging', 'Charging', 'Idling', '?', 'Discharging'],
+    )
+    members = enum_members(states, StorageStates)
+    assert members.dtype == object
+    assert list(members) == [StorageStates.Discharging, StorageStates.Charging, StorageStates.Idling, None, StorageStates.Discharging]
+    np.testing.assert_array_equal(is_member(states, StorageStates), [True, True, True, False, True])
+
+
+def test_sparse_enum():
+    values = np.array([[100000, 0], [-5000, 1]])
+    np.testing.assert_array_equal(enum_names(values, Sparse), [['high', 'zero'], ['low', '']])
+    np.testing.assert_array_equal(is_member(values, Sparse), [[True, True], [True, False]])
+    np.testing.assert_array_equal(is_member([-10**6, 10**6], Sparse), [False, False])
+
+
+def test_enum_codes():
+    names = np.array(['Idling', 'Charging', 'nope', 'Idling'])
+    np.testing.assert_array_equal(enum_codes(names, StorageStates), [0, -1, -1, 0])
+    np.testing.assert_array_equal(enum_codes(names, StorageStates, default=99), [0, -1, 99, 0])
+    assert enum_codes([['low', 'high']], Sparse).shape == (1, 2)
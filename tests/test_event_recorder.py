@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from dss_python_backend import ffi, lib
+from dss_python_backend.enums import AltDSSEvent
+from dss_python_backend.event_recorder import EVENT_RECORD_DTYPE, EventRecorder
+
+
+def emit(ctx, evt, step=0):
+    lib.altdss_python_recorder_callback(ctx, evt, step, ffi.NULL)
+
+
+def test_records_engine_events():
+    ctx = lib.ctx_New()
+    with EventRecorder(ctx, events=[AltDSSEvent.BuildSystemY]) as rec:
+        for cmd in ('new circuit.c bus1=a basekv=12.47', 'new load.ld bus1=a kw=10', 'solve'):
+            lib.ctx_Text_Set_Command(ctx, cmd.encode())
+
+        records = rec.drain()
+        assert len(records) >= 1
+        assert (records['eventCode'] == AltDSSEvent.BuildSystemY).all()
+        assert (np.diff(records['timestamp']) >= 0).all()
+
+
+def test_overflow_drops_and_counts():
+    ctx = lib.ctx_New()
+    with EventRecorder(ctx, capacity=4) as rec:
+        for step in range(10):
+            emit(ctx, AltDSSEvent.Legacy_StepControls, step)
+
+        assert rec.pending == 4
+        assert rec.dropped == 6
+        # Oldest first; the newer records were dropped
+        out = np.empty(3, dtype=EVENT_RECORD_DTYPE)
+        assert rec.drain(out)['step'].tolist() == [0, 1, 2]
+        for step in range(10, 14):
+            emit(ctx, AltDSSEvent.Legacy_StepControls, step)
+
+        assert rec.pending == 4
+        # The ring wraps around
+        assert rec.drain()['step'].tolist() == [3, 10, 11, 12]
+        assert rec.reset_dropped() == 7
+        assert rec.dropped == 0
+
+
+def test_recorders_share_context():
+    ctx = lib.ctx_New()
+    rec1 = EventRecorder(ctx, events=[AltDSSEvent.Clear])
+    rec2 = EventRecorder(ctx, events=[AltDSSEvent.Clear, AltDSSEvent.Legacy_StepControls])
+    emit(ctx, AltDSSEvent.Clear)
+    assert rec1.pending == 1 and rec2.pending == 1
+
+    # Closing one recorder keeps the others registered
+    rec1.close()
+    rec2.drain()
+    lib.ctx_Text_Set_Command(ctx, b'clear')
+    assert rec2.pending >= 1
+    rec2.close()
+    with EventRecorder(ctx, events=[AltDSSEvent.Clear]) as rec3:
+        lib.ctx_Text_Set_Command(ctx, b'clear')
+        assert rec3.pending >= 1
+
+
+def test_recorders_only_get_their_events():
+    ctx = lib.ctx_New()
+    with EventRecorder(ctx, events=[AltDSSEvent.Clear]) as clears, \
+         EventRecorder(ctx, events=[AltDSSEvent.BuildSystemY]) as builds:
+        for cmd in ('new circuit.c bus1=a basekv=12.47', 'new load.ld bus1=a kw=10', 'solve', 'clear'):
+            lib.ctx_Text_Set_Command(ctx, cmd.encode())
+
+        assert set(clears.drain()['eventCode'].tolist()) == {AltDSSEvent.Clear}
+        assert set(builds.drain()['eventCode'].tolist()) == {AltDSSEvent.BuildSystemY}
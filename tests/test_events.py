@@ -0,0 +1,140 @@
+import threading
+import pytest
+from dss_python_backend import ffi, lib
+from dss_python_backend.enums import AltDSSEvent
+from dss_python_backend.events import get_manager_for_ctx
+
+
+def emit(ctx, evt, step=0):
+    # Same path as the events from the engine
+    lib.altdss_python_util_callback(ctx, evt, step, ffi.NULL)
+
+
+def test_register_and_dispatch():
+    ctx = lib.ctx_New()
+    manager = get_manager_for_ctx(ctx)
+    assert get_manager_for_ctx(ctx) is manager
+    seen = []
+
+    def handler(ctx, evt, step, ptr):
+        seen.append((evt, step))
+
+    def legacy():
+        seen.append('legacy')
+
+    assert manager.register_func(AltDSSEvent.Clear, handler)
+    assert not manager.register_func(AltDSSEvent.Clear, handler)
+    assert manager.register_func(AltDSSEvent.Legacy_StepControls, legacy)
+    lib.ctx_Text_Set_Command(ctx, b'clear')
+    emit(ctx, AltDSSEvent.Legacy_StepControls)
+    assert (AltDSSEvent.Clear, 0) in seen and seen[-1] == 'legacy'
+
+    assert manager.unregister_func(AltDSSEvent.Clear, handler)
+    assert not manager.unregister_func(AltDSSEvent.Clear, handler)
+    manager.unregister_all()
+    del seen[:]
+    lib.ctx_Text_Set_Command(ctx, b'clear')
+    emit(ctx, AltDSSEvent.Legacy_StepControls)
+    assert seen == []
+
+
+def test_handler_exception_sets_engine_error():
+    ctx = lib.ctx_New()
+    manager = get_manager_for_ctx(ctx)
+
+    def failing(ctx, evt, step, ptr):
+        raise ValueError('boom')
+
+    manager.register_func(AltDSSEvent.Clear, failing)
+    try:
+        emit(ctx, AltDSSEvent.Clear)
+        assert lib.ctx_Error_Get_Number(ctx) != 0
+        assert b'boom' in ffi.string(lib.ctx_Error_Get_Description(ctx))
+    finally:
+        manager.unregister_all()
+
+
+def test_unregister_during_dispatch():
+    ctx = lib.ctx_New()
+    manager = get_manager_for_ctx(ctx)
+    calls = []
+
+    def first(ctx, evt, step, ptr):
+        calls.append('first')
+        manager.unregister_func(AltDSSEvent.Clear, second)
+
+    def second(ctx, evt, step, ptr):
+        calls.append('second')
+
+    manager.register_func(AltDSSEvent.Clear, first)
+    manager.register_func(AltDSSEvent.Clear, second)
+    # The dispatch in progress keeps its snapshot of the handlers
+    emit(ctx, AltDSSEvent.Clear)
+    assert calls == ['first', 'second']
+    emit(ctx, AltDSSEvent.Clear)
+    assert calls == ['first', 'second', 'first']
+    manager.unregister_all()
+
+
+def test_concurrent_registration():
+    ctx = lib.ctx_New()
+    manager = get_manager_for_ctx(ctx)
+    counter = [0]
+    errors = []
+    stop = threading.Event()
+
+    # Legacy events call the handlers without arguments
+    def permanent():
+        counter[0] += 1
+
+    def churn():
+        temporary = [lambda: None for _ in range(4)]
+        try:
+            while not stop.is_set():
+                for func in temporary:
+                    manager.register_func(AltDSSEvent.Legacy_CheckControls, func)
+
+                for func in temporary:
+                    manager.unregister_func(AltDSSEvent.Legacy_CheckControls, func)
+        except Exception as ex:
+            errors.append(ex)
+
+    manager.register_func(AltDSSEvent.Legacy_CheckControls, permanent)
+    threads = [threading.Thread(target=churn) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for _ in range(20000):
+            emit(ctx, AltDSSEvent.Legacy_CheckControls)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    assert not errors
+    assert lib.ctx_Error_Get_Number(ctx) == 0, ffi.string(lib.ctx_Error_Get_Description(ctx))
+    assert counter[0] == 20000
+    assert manager.Legacy_CheckControls == (permanent,)
+    manager.unregister_all()
+    assert manager.Legacy_CheckControls == ()
+
+
+def test_stats():
+    ctx = lib.ctx_New()
+    manager = get_manager_for_ctx(ctx)
+
+    def handler(ctx, evt, step, ptr):
+        pass
+
+    manager.register_func(AltDSSEvent.Clear, handler)
+    manager.enable_stats()
+    for _ in range(3):
+        emit(ctx, AltDSSEvent.Clear)
+
+    stats = manager.get_stats()
+    assert stats['events'][AltDSSEvent.Clear]['count'] == 3
+    assert stats['handlers'][0]['handler'] is handler
+    manager.reset_stats()
+    assert manager.get_stats()['events'][AltDSSEvent.Clear]['count'] == 0
+    manager.unregister_all()
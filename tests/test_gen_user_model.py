@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from dss_python_backend import ffi, lib
+from dss_python_backend.gen_user_model import BatchedGenUserModel, library_path, use_model
+
+
+class ZeroCurrent(BatchedGenUserModel):
+    var_names = ('calls',)
+
+    def calc(self, indices, V, I):
+        I[:] = 0
+        self.states[indices, 0] += 1
+
+
+def run(ctx, *commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        assert lib.ctx_Error_Get_Number(ctx) == 0, ffi.string(lib.ctx_Error_Get_Description(ctx))
+
+
+def build(ctx, generators):
+    run(ctx, 'clear', 'new circuit.c bus1=src basekv=12.47')
+    for i in range(generators):
+        run(
+            ctx,
+            f'new line.l{i} bus1=src bus2=b{i} length=0.5 units=km',
+            f'new generator.g{i} bus1=b{i} kw=300 kv=12.47 model=6 usermodel="{library_path("GenUserModel")}"',
+        )
+
+
+@pytest.fixture
+def prime():
+    # The user-model callbacks work on the prime instance
+    ctx = lib.ctx_Get_Prime()
+    yield ctx
+    run(ctx, 'clear')
+    use_model(None)
+
+
+def test_calc_is_abstract():
+    class Incomplete(BatchedGenUserModel):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_rows_released_on_clear(prime):
+    model = ZeroCurrent()
+    use_model(model)
+    build(prime, 3)
+    assert model.states.shape == (3, 1)
+    assert [name.lower() for name in model.names] == [b'generator.g0', b'generator.g1', b'generator.g2']
+
+    build(prime, 2)
+    assert model.states.shape == (2, 1)
+    assert model.alive.all()
+
+
+def test_solve_keeps_active_element(prime):
+    model = ZeroCurrent()
+    use_model(model)
+    build(prime, 3)
+    run(prime, 'solve')
+    assert (model.states[:, 0] > 0).all()
+
+    # Make the node lookup happen again during the next solution
+    model._stale[:] = True
+    lib.ctx_Circuit_SetActiveElement(prime, b'line.l1')
+    lib.ctx_DSS_SetActiveClass(prime, b'Load')
+    run(prime, 'solve')
+    assert model._mapped.all()
+    assert ffi.string(lib.ctx_CktElement_Get_Name(prime)).lower() == b'line.l1'
+    assert ffi.string(lib.ctx_ActiveClass_Get_ActiveClassName(prime)) == b'Load'
@@ -0,0 +1,102 @@
+import importlib
+import sys
+import threading
+import numpy as np
+import pytest
+from dss_python_backend import lib
+from dss_python_backend.contexts import dispose_ctx, forget_ctx
+from dss_python_backend.gr_views import GRView, StaleViewError, get_gr_views
+
+
+def run(ctx, *commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        assert lib.ctx_Error_Get_Number(ctx) == 0, cmd
+
+
+def feeder(ctx, buses):
+    run(ctx, 'clear', 'new circuit.c bus1=b0 basekv=12.47')
+    for idx in range(1, buses):
+        run(ctx, f'new line.l{idx} bus1=b{idx - 1} bus2=b{idx} length=0.1')
+
+    run(ctx, 'solve')
+
+
+def test_view_matches_copy():
+    ctx = lib.ctx_New()
+    feeder(ctx, 10)
+    views = get_gr_views(ctx)
+    vmag = views.float64(lib.ctx_Circuit_Get_AllBusVmagPu_GR)
+    assert isinstance(vmag, GRView)
+    assert vmag.valid
+    assert len(vmag) == 30
+    np.testing.assert_array_equal(np.asarray(vmag), vmag.copy())
+    # Repeated reads of the same result reuse the same view
+    assert views.float64(lib.ctx_Circuit_Get_AllBusVmagPu_GR) is vmag
+
+
+def test_stale_view_after_growth():
+    ctx = lib.ctx_New()
+    feeder(ctx, 5)
+    views = get_gr_views(ctx)
+    volts = views.float64(lib.ctx_Circuit_Get_AllBusVolts_GR, complex=True)
+    small = volts.copy()
+
+    # Grow the circuit so that the engine has to reallocate the buffer
+    feeder(ctx, 2000)
+    new_volts = views.float64(lib.ctx_Circuit_Get_AllBusVolts_GR, complex=True)
+    assert len(new_volts) == 3 * 2000
+    assert not volts.valid
+    with pytest.raises(StaleViewError):
+        volts.array
+
+    with pytest.raises(StaleViewError):
+        np.asarray(volts)
+
+    with pytest.raises(StaleViewError):
+        volts.copy()
+
+    assert new_volts.valid
+    np.testing.assert_allclose(np.abs(np.asarray(new_volts)[:3]), np.abs(small[:3]), rtol=1e-3)
+
+
+def test_stale_after_direct_gr_call():
+    # Reallocations by GR calls that do not go through the views are also detected
+    ctx = lib.ctx_New()
+    feeder(ctx, 3)
+    vmag = get_gr_views(ctx).float64(lib.ctx_Circuit_Get_AllBusVmag_GR)
+    feeder(ctx, 1000)
+    lib.ctx_Circuit_Get_AllBusVmag_GR(ctx)
+    assert not vmag.valid
+    assert repr(vmag) == 'GRView(<stale>)'
+
+
+def test_shared_per_context():
+    ctx = lib.ctx_New()
+    barrier = threading.Barrier(8)
+    found = []
+
+    def get():
+        barrier.wait()
+        found.append(get_gr_views(ctx))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    views = get_gr_views(ctx)
+    assert all(v is views for v in found)
+    forget_ctx(ctx)
+    assert get_gr_views(ctx) is not views
+    dispose_ctx(ctx)
+
+
+def test_missing_numpy_points_to_extra(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'numpy', None)
+    monkeypatch.delitem(sys.modules, 'dss_python_backend._numpy')
+    monkeypatch.delitem(sys.modules, 'dss_python_backend.gr_views')
+    with pytest.raises(ImportError, match=r'dss_python_backend\[numpy\]'):
+        importlib.import_module('dss_python_backend.gr_views')
@@ -0,0 +1,55 @@
+from dss_python_backend import ffi, lib
+from dss_python_backend.enums import DSSMessageType
+from dss_python_backend.message_sink import Message, MessageBatch, MessageSink
+
+
+def send(ctx, text, msg_type=DSSMessageType.Info, subtype=0):
+    data = text.encode()
+    lib.altdss_python_msgsink_callback(ctx, ffi.new('char[]', data), msg_type, len(data), subtype)
+
+
+def test_drain_decodes_batch():
+    ctx = lib.ctx_New()
+    with MessageSink(ctx) as sink:
+        assert len(sink.drain()) == 0
+        send(ctx, 'first')
+        send(ctx, 'ação', DSSMessageType.Error, 3)
+        send(ctx, '')
+        send(ctx, 'last', 42)
+        assert sink.pending == 4
+        batch = sink.drain()
+        assert isinstance(batch, MessageBatch)
+        assert sink.pending == 0
+        assert batch.texts == ['first', 'ação', '', 'last']
+        assert batch.types.tolist() == [1, -1, 1, 42]
+        assert list(batch) == [
+            Message(DSSMessageType.Info, 0, 'first', False),
+            Message(DSSMessageType.Error, 3, 'ação', False),
+            Message(DSSMessageType.Info, 0, '', False),
+            Message(42, 0, 'last', False),
+        ]
+        assert batch[1].type is DSSMessageType.Error
+
+
+def test_filter_truncate_and_drop():
+    ctx = lib.ctx_New()
+    with MessageSink(ctx, level=DSSMessageType.Info, capacity=2, text_capacity=8) as sink:
+        send(ctx, 'progress', DSSMessageType.Progress)
+        send(ctx, 'a very long message')
+        send(ctx, 'x')
+        assert sink.dropped == 1
+        batch = sink.drain()
+        assert batch.texts == ['a very ']
+        assert batch.truncated.tolist() == [True]
+
+
+def test_handler_called_when_full():
+    ctx = lib.ctx_New()
+    batches = []
+    with MessageSink(ctx, handler=lambda batch: batches.append(batch.texts), capacity=3) as sink:
+        for idx in range(7):
+            send(ctx, f'm{idx}')
+
+        assert sink.dropped == 0
+
+    assert [text for texts in batches for text in texts] == [f'm{idx}' for idx in range(7)]
@@ -0,0 +1,88 @@
+import numpy as np
+from dss_python_backend import lib
+from dss_python_backend.enums import MonitorModes
+from dss_python_backend.gr_views import get_gr_views
+from dss_python_backend.monitors import HEADER_SIZE, MonitorSpooler, decode, open_spool, read_all, read_monitor
+
+
+def run(ctx, *commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        assert lib.ctx_Error_Get_Number(ctx) == 0, cmd
+
+
+def build():
+    ctx = lib.ctx_New()
+    run(
+        ctx,
+        'new circuit.c bus1=src basekv=12.47',
+        'new loadshape.ls npts=24 interval=1 mult=(0.4 0.4 0.4 0.4 0.5 0.6 0.7 0.8 0.9 1 1 1 1 1 1 1 1 1 0.9 0.8 0.7 0.6 0.5 0.4)',
+        'new line.l1 bus1=src bus2=b length=1 units=km',
+        'new load.ld bus1=b kw=500 kvar=100 kv=12.47 daily=ls',
+        'new monitor.m1 element=line.l1 terminal=2 mode=1',
+        'new monitor.m2 element=line.l1 terminal=1 mode=0 ppolar=no',
+        'set mode=daily stepsize=1h',
+    )
+    return ctx
+
+
+def test_decode_matches_channels():
+    ctx = build()
+    run(ctx, 'set number=24', 'solve')
+    header, records = read_monitor(ctx, 'm1')
+    assert header.base_mode == MonitorModes.Power
+    assert len(records) == 24
+    assert records.dtype.names[:2] == ('hour', 'sec')
+    views = get_gr_views(ctx)
+    np.testing.assert_allclose(records['hour'], views.float64(lib.ctx_Monitors_Get_dblHour_GR).array, rtol=1e-6)
+    lib.ctx_Monitors_Set_Name(ctx, b'm1')
+    for idx, name in enumerate(header.channels):
+        channel = views.float64(lib.ctx_Monitors_Get_Channel_GR, idx + 1).array
+        np.testing.assert_allclose(records[name], channel, rtol=1e-6)
+
+    # Decode a copy of the stream, as bytes
+    stream = views.int8(lib.ctx_Monitors_Get_ByteStream_GR).array.tobytes()
+    header2, records2 = decode(stream, list(header.channels))
+    assert header2.channels == header.channels
+    np.testing.assert_array_equal(records2, records)
+    assert set(read_all(ctx)) == {'m1', 'm2'}
+
+
+def test_spooler_round_trip(tmp_path):
+    reference = build()
+    run(reference, 'set number=24', 'solve')
+    expected = {name: records.copy() for name, (_, records) in read_all(reference).items()}
+
+    ctx = build()
+    with MonitorSpooler(ctx, str(tmp_path)) as spooler:
+        for number in (10, 10, 4):
+            run(ctx, f'set number={number}', 'solve')
+            spooler.spool()
+            # The monitors are reset after each spool
+            lib.ctx_Monitors_Set_Name(ctx, b'm1')
+            assert lib.ctx_Monitors_Get_SampleCount(ctx) == 0
+
+    assert spooler.count == 48
+    spooled = open_spool(str(tmp_path))
+    assert set(spooled) == set(expected)
+    for name, records in expected.items():
+        assert spooled[name].dtype == records.dtype
+        np.testing.assert_array_equal(spooled[name], records)
+
+    with open(tmp_path / 'm1.mon', 'rb') as f:
+        assert len(f.read()) == HEADER_SIZE + 24 * expected['m1'].dtype.itemsize
+
+
+def test_modes_without_enum_member():
+    ctx = build()
+    run(
+        ctx,
+        'new monitor.solution element=line.l1 mode=5',
+        'new monitor.losses element=line.l1 mode=9',
+        'set number=3',
+        'solve',
+    )
+    for name, mode in (('solution', 5), ('losses', 9)):
+        header, records = read_monitor(ctx, name)
+        assert header.base_mode == mode
+        assert len(records) == 3
@@ -0,0 +1,82 @@
+import threading
+import pytest
+from dss_python_backend import ffi, lib
+from dss_python_backend.contexts import dispose_ctx, forget_ctx
+from dss_python_backend.enums import AltDSSEvent
+from dss_python_backend.events import get_manager_for_ctx
+from dss_python_backend.name_cache import get_name_cache
+
+
+def run(ctx, *commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        assert lib.ctx_Error_Get_Number(ctx) == 0
+
+
+def test_lookups():
+    ctx = lib.ctx_New()
+    run(ctx, 'new circuit.c bus1=a basekv=12.47', 'new line.l1 bus1=a bus2=b', 'new load.ld1 bus1=b kw=10', 'solve')
+    names = get_name_cache(ctx)
+    assert get_name_cache(ctx) is names
+    idx = names.set_active_bus('B')
+    assert ffi.string(lib.ctx_Bus_Get_Name(ctx)) == b'b'
+    assert names.bus_names[idx] == b'b'
+    names.set_active_element('Line.L1')
+    assert ffi.string(lib.ctx_CktElement_Get_Name(ctx)).lower() == b'line.l1'
+    assert names.class_index('Load', 'LD1') == 1
+    with pytest.raises(KeyError):
+        names.element_index('line.missing')
+
+
+def test_new_elements_are_picked_up():
+    ctx = lib.ctx_New()
+    run(ctx, 'new circuit.c bus1=a basekv=12.47', 'new load.ld1 bus1=a kw=10')
+    names = get_name_cache(ctx)
+    assert names.class_names('Load') == (b'ld1',)
+    assert len(names.element_names) == 2
+
+    run(ctx, 'new load.ld2 bus1=a kw=10')
+    assert names.class_names('Load') == (b'ld1', b'ld2')
+    assert len(names.element_names) == 3
+    assert names.class_index('Load', 'ld2') == 2
+
+
+def test_clear_invalidates():
+    ctx = lib.ctx_New()
+    run(ctx, 'new circuit.c bus1=a basekv=12.47', 'new load.ld1 bus1=a kw=10', 'solve')
+    names = get_name_cache(ctx)
+    assert names.bus_names == (b'a',)
+    names.class_names('Load')
+
+    run(ctx, 'clear', 'new circuit.c bus1=x basekv=12.47', 'new load.other bus1=x kw=10', 'solve')
+    assert names.bus_names == (b'x',)
+    assert names.class_names('Load') == (b'other',)
+
+
+def test_created_once_and_forgotten():
+    ctx = lib.ctx_New()
+    barrier = threading.Barrier(8)
+    found = []
+
+    def get():
+        barrier.wait()
+        found.append(get_name_cache(ctx))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    names = get_name_cache(ctx)
+    assert all(n is names for n in found)
+    manager = get_manager_for_ctx(ctx)
+    # Only the handlers of the shared cache are registered
+    assert manager.Clear == (names._on_clear,)
+    forget_ctx(ctx)
+    assert manager.Clear == () and manager.ReprocessBuses == ()
+    new_names = get_name_cache(ctx)
+    assert new_names is not names
+    assert get_manager_for_ctx(ctx).Clear == (new_names._on_clear,)
+    dispose_ctx(ctx)
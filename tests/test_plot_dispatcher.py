@@ -0,0 +1,45 @@
+import threading
+import time
+from dss_python_backend import lib
+from dss_python_backend.plot_dispatcher import PlotDispatcher
+
+
+def test_close_without_wait_cancels_pending():
+    ctx = lib.ctx_New()
+    started = threading.Event()
+    release = threading.Event()
+    rendered = []
+
+    def render(params):
+        started.set()
+        release.wait(5)
+        rendered.append(params)
+
+    plots = PlotDispatcher(ctx, render, max_pending=4)
+    assert all(plots.submit(f'{{"n": {idx}}}') for idx in range(4))
+    assert not plots.submit('{"n": 4}')
+    assert plots.dropped == 1
+    assert started.wait(5)
+    plots.close(wait=False)
+    release.set()
+    deadline = time.monotonic() + 5
+    while plots._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Only the plot already rendering completes; the others were cancelled
+    # without being reported as errors
+    assert not plots._pending
+    assert rendered == [{'n': 0}]
+    assert plots.errors == []
+
+
+def test_renderer_errors_are_collected():
+    ctx = lib.ctx_New()
+
+    def render(params):
+        raise ValueError(params['n'])
+
+    with PlotDispatcher(ctx, render) as plots:
+        plots.submit('{"n": 1}')
+
+    assert [str(ex) for ex in plots.errors] == ['1']
@@ -0,0 +1,75 @@
+import os
+import sys
+import numpy as np
+import pytest
+from dss_python_backend.gr_views import get_gr_views
+from dss_python_backend import process_pool
+from dss_python_backend.process_pool import ProcessContextPool, SharedResults
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 8), reason='requires multiprocessing.shared_memory')
+
+
+def _segment_exists(name):
+    return os.path.exists(os.path.join('/dev/shm', name.lstrip('/')))
+
+
+def test_shared_results_close():
+    res = SharedResults({'x': (3, 'f8'), 'n': ((), np.int32)}, 4)
+    assert res['x'].shape == (4, 3)
+    assert res['n'].shape == (4,)
+    assert sorted(res) == ['n', 'x']
+    assert not res['x'].any()
+    names = [shm.name for shm in res._blocks.values()]
+    res.close()
+    assert len(res) == 0
+    if sys.platform.startswith('linux'):
+        assert not any(_segment_exists(name) for name in names)
+
+    # Closing again is harmless
+    res.close()
+
+
+def test_shared_results_close_with_live_views():
+    with SharedResults({'x': (3, 'f8')}, 2) as res:
+        x = res['x']
+        x[1] = 7
+        names = [shm.name for shm in res._blocks.values()]
+
+    # The block was removed, but the view is still usable
+    if sys.platform.startswith('linux'):
+        assert not any(_segment_exists(name) for name in names)
+
+    assert x[1].tolist() == [7, 7, 7]
+    pinned = [shm for shm in process_pool._pinned if shm.name in names]
+    assert len(pinned) == 1
+    # Closed by the next close, once the views are gone
+    del x
+    SharedResults({'y': (1, 'f8')}, 1).close()
+    assert pinned[0] not in process_pool._pinned
+    assert pinned[0].buf is None
+
+
+def test_shared_results_exit_keeps_exception():
+    with pytest.raises(KeyError):
+        with SharedResults({'x': (3, 'f8')}, 2) as res:
+            x = res['x']
+            raise KeyError('user error')
+
+
+def _scenario(ctx, kw, out):
+    from dss_python_backend import lib
+    lib.ctx_Text_Set_Command(ctx, f'edit load.ld kw={kw}'.encode())
+    lib.ctx_Text_Set_Command(ctx, b'solve')
+    assert lib.ctx_Error_Get_Number(ctx) == 0
+    out['kw'][...] = kw
+    out['losses'][:] = np.asarray(get_gr_views(ctx).float64(lib.ctx_Circuit_Get_Losses_GR))
+
+
+def test_process_pool_run():
+    setup = ['new circuit.c bus1=a basekv=12.47', 'new line.l bus1=a bus2=b', 'new load.ld bus1=b kw=100', 'solve']
+    with ProcessContextPool(2, setup) as pool:
+        with pool.run(_scenario, [100, 200, 300], {'kw': ((), 'f8'), 'losses': (2, 'f8')}) as res:
+            assert res['kw'].tolist() == [100, 200, 300]
+            losses = res['losses'][:, 0].copy()
+
+    assert losses[0] < losses[1] < losses[2]
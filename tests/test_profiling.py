@@ -0,0 +1,38 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import pytest
+from dss_python_backend import profiling
+
+_CHILD = '''
+import json
+from dss_python_backend import lib, profiling
+assert profiling.enabled()
+profiling.reset()
+ctx = lib.ctx_New()
+for _ in range(3):
+    lib.ctx_Text_Set_Command(ctx, b'clear')
+
+print(json.dumps({s.name: [s.calls, s.total] for s in profiling.stats()}))
+'''
+
+
+@pytest.mark.skipif(importlib.util.find_spec('dss_python_backend._dss_capip') is None, reason='profiling build not available')
+def test_profiling_build_counts_calls():
+    env = dict(os.environ, DSS_PYTHON_BACKEND_PROFILE='1')
+    # The module is selected when the package is imported, so use a new process
+    output = subprocess.run([sys.executable, '-c', _CHILD], env=env, check=True, capture_output=True, text=True).stdout
+    stats = json.loads(output.splitlines()[-1])
+    calls, total = stats['ctx_Text_Set_Command']
+    assert calls == 3
+    assert total > 0
+    assert stats['ctx_New'][0] == 1
+
+
+@pytest.mark.skipif(os.environ.get('DSS_PYTHON_BACKEND_PROFILE', '') == '1', reason='profiling build loaded')
+def test_requires_profiling_build():
+    assert not profiling.enabled()
+    with pytest.raises(RuntimeError):
+        profiling.stats()
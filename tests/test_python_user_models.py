@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from dss_python_backend import ffi, lib
+from dss_python_backend.python_user_models import (
+    CapUserControl, PVSystemUserModel, StoreDynaModel, StoreUserModel, library_path, use_model,
+)
+
+KINDS = ('PVSystemUserModel', 'StoreUserModel', 'StoreDynaModel', 'CapUserControl')
+
+
+def run(ctx, *commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        assert lib.ctx_Error_Get_Number(ctx) == 0, ffi.string(lib.ctx_Error_Get_Description(ctx))
+
+
+@pytest.fixture
+def prime():
+    # The user-model callbacks work on the prime instance
+    ctx = lib.ctx_Get_Prime()
+    run(ctx, 'clear', 'new circuit.c bus1=src basekv=12.47', 'new line.l1 bus1=src bus2=b')
+    yield ctx
+    run(ctx, 'clear')
+    for kind in KINDS:
+        use_model(kind, None)
+
+
+def test_use_model_checks_kind():
+    with pytest.raises(TypeError):
+        use_model('PVSystemUserModel', StoreUserModel)
+
+    with pytest.raises(ValueError):
+        use_model('GenUserModel', PVSystemUserModel)
+
+
+def test_instances_and_edit(prime):
+    created = []
+
+    class PV(PVSystemUserModel):
+        def __init__(self, *args):
+            super().__init__(*args)
+            created.append(self)
+            self.params = None
+
+        def edit(self, params):
+            self.params = params
+
+    class Store(StoreUserModel):
+        def __init__(self, *args):
+            super().__init__(*args)
+            created.append(self)
+
+    use_model('PVSystemUserModel', PV)
+    use_model('StoreUserModel', Store)
+    run(
+        prime,
+        f'new pvsystem.pv1 bus1=b phases=3 kv=12.47 kva=100 pmpp=100 usermodel="{library_path("PVSystemUserModel")}" userdata=(a=1)',
+        f'new storage.st1 bus1=b phases=1 kv=7.2 kwrated=100 usermodel="{library_path("StoreUserModel")}"',
+        'solve',
+    )
+    assert [(model.name, model.num_conductors) for model in created] == [('PVSystem.pv1', 4), ('Storage.st1', 2)]
+    assert created[0].params == 'a=1'
+    with pytest.raises(RuntimeError):
+        use_model('PVSystemUserModel', None)
+
+
+def test_dynamics_and_control(prime):
+    class Machine(StoreDynaModel):
+        var_names = ('calls',)
+
+        def init(self, V, I):
+            self.V0 = V.copy()
+
+        def calc(self, V, I):
+            I[:] = 0
+            self.vars[0] += 1
+
+    sampled = []
+
+    class Control(CapUserControl):
+        def sample(self):
+            sampled.append(self.name)
+
+    use_model('StoreDynaModel', Machine)
+    use_model('CapUserControl', Control)
+    run(
+        prime,
+        f'new storage.st2 bus1=b phases=3 kv=12.47 kwrated=100 dynadll="{library_path("StoreDynaModel")}"',
+        'new capacitor.c1 bus1=b kvar=300 kv=12.47',
+        f'new capcontrol.cc1 element=line.l1 capacitor=c1 usermodel="{library_path("CapUserControl")}"',
+        'solve',
+        'set mode=dynamics number=2 stepsize=0.01',
+        'solve',
+    )
+    assert sampled and set(sampled) == {'CapControl.cc1'}
+
+    lib.ctx_Circuit_SetActiveElement(prime, b'storage.st2')
+    ptr = ffi.new('double**')
+    dims = ffi.new('int32_t[4]')
+    lib.ctx_CktElement_Get_AllVariableValues(prime, ptr, dims)
+    values = ffi.unpack(ptr[0], dims[0])
+    lib.DSS_Dispose_PDouble(ptr)
+    assert values[-1] > 0
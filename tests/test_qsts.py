@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from dss_python_backend import lib
+from dss_python_backend.enums import SolveModes
+from dss_python_backend.gr_views import get_gr_views
+from dss_python_backend.qsts import QSTSStepper, qsts_blocks
+
+
+def run(ctx, *commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        assert lib.ctx_Error_Get_Number(ctx) == 0, cmd
+
+
+def build():
+    ctx = lib.ctx_New()
+    run(
+        ctx,
+        'new circuit.c bus1=src basekv=12.47',
+        'new loadshape.ls npts=24 interval=1 mult=(0.4 0.4 0.4 0.4 0.5 0.6 0.7 0.8 0.9 1 1 1 1 1 1 1 1 1 0.9 0.8 0.7 0.6 0.5 0.4)',
+        'new line.l1 bus1=src bus2=b length=1 units=km',
+        'new line.l2 bus1=b bus2=c length=1 units=km',
+        'new load.ld1 bus1=b kw=500 kvar=100 kv=12.47 daily=ls',
+        'new load.ld2 bus1=c kw=300 kvar=50 kv=12.47 daily=ls',
+        'solve',
+    )
+    return ctx
+
+
+QUANTITIES = {
+    'vmag_pu': 'bus_vmag_pu',
+    'losses': lib.ctx_Circuit_Get_Losses_GR,
+    'load_powers': ('class_powers', 'Load'),
+}
+
+
+def test_block_shapes_and_partial_last_block():
+    ctx = build()
+    num_nodes = lib.ctx_Circuit_Get_NumNodes(ctx)
+    run(ctx, 'set number=7')
+    blocks = []
+    for block in qsts_blocks(ctx, QUANTITIES, 10, block_size=4, mode=SolveModes.Daily, step_size=3600, start_hour=0):
+        assert block['vmag_pu'].shape == (block.count, num_nodes)
+        assert block['losses'].shape == (block.count, 2)
+        assert block['load_powers'].shape[0] == block.count
+        assert block.hour.shape == (block.count,)
+        # The arrays are reused by the next block
+        blocks.append((block.start, block.count, block.hour.copy(), {k: block[k].copy() for k in block.keys()}))
+
+    assert [(start, count) for start, count, _, _ in blocks] == [(0, 4), (4, 4), (8, 2)]
+    np.testing.assert_allclose(np.concatenate([hour for _, _, hour, _ in blocks]), np.arange(1, 11))
+    # The Number setting is restored
+    assert lib.ctx_Solution_Get_Number(ctx) == 7
+
+    # Same values as reading after each step
+    reference = build()
+    run(reference, 'set mode=daily stepsize=1h number=1 hour=0')
+    views = get_gr_views(reference)
+    vmag = np.concatenate([data['vmag_pu'] for _, _, _, data in blocks])
+    losses = np.concatenate([data['losses'] for _, _, _, data in blocks])
+    for step in range(10):
+        run(reference, 'solve')
+        np.testing.assert_allclose(vmag[step], views.float64(lib.ctx_Circuit_Get_AllBusVmagPu_GR).array)
+        np.testing.assert_allclose(losses[step], views.float64(lib.ctx_Circuit_Get_Losses_GR).array)
+
+
+def test_buffers_reused_between_runs():
+    ctx = build()
+    stepper = QSTSStepper(ctx, QUANTITIES, block_size=4)
+    first = next(stepper.run(4, mode=SolveModes.Daily, step_size=3600, start_hour=0))
+    out = first['vmag_pu']
+    second = next(stepper.run(4, start_hour=0))
+    assert second['vmag_pu'] is out
+
+
+def test_size_change_raises():
+    ctx = build()
+    stepper = QSTSStepper(ctx, {'vmag_pu': 'bus_vmag_pu'}, block_size=2)
+    with pytest.raises(RuntimeError, match='changed during the run'):
+        for block in stepper.run(6, mode=SolveModes.Daily, step_size=3600, start_hour=0):
+            run(ctx, 'new line.l3 bus1=c bus2=d length=1 units=km')
+
+
+def test_invalid_quantities():
+    ctx = build()
+    with pytest.raises(ValueError):
+        QSTSStepper(ctx, {'x': 'no_such_getter'})
+
+    with pytest.raises(ValueError):
+        QSTSStepper(ctx, {'x': 'bus_vmag_pu'}, block_size=0)
+
+    with pytest.raises(ValueError, match='mode'):
+        next(QSTSStepper(ctx, QUANTITIES).run(1, mode=SolveModes.SnapShot))
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from dss_python_backend import lib
+from dss_python_backend.contexts import dispose_ctx, forget_ctx
+from dss_python_backend.events import get_manager_for_ctx
+from dss_python_backend.ymatrix import get_compressed_y, get_ymatrix_cache
+
+
+def run(ctx, *commands):
+    for cmd in commands:
+        lib.ctx_Text_Set_Command(ctx, cmd.encode())
+        assert lib.ctx_Error_Get_Number(ctx) == 0, cmd
+
+
+def circuit(ctx, lines):
+    run(ctx, 'clear', 'new circuit.c bus1=b0 basekv=12.47')
+    for idx in range(1, lines + 1):
+        run(ctx, f'new line.l{idx} bus1=b{idx - 1} bus2=b{idx}')
+
+    run(ctx, 'solve')
+
+
+def test_cache_hit():
+    ctx = lib.ctx_New()
+    circuit(ctx, 1)
+    y = get_compressed_y(ctx)
+    assert y.shape == (6, 6)
+    assert y.nnz == len(y.indices) == y.indptr[-1]
+    assert not y.data.flags.writeable
+    # Solving again does not rebuild the matrix
+    run(ctx, 'solve')
+    assert get_compressed_y(ctx) is y
+
+
+def test_invalidated_by_topology_change():
+    ctx = lib.ctx_New()
+    circuit(ctx, 1)
+    y = get_compressed_y(ctx)
+    run(ctx, 'new line.l2 bus1=b1 bus2=b2', 'solve')
+    new_y = get_compressed_y(ctx)
+    assert new_y is not y
+    assert new_y.shape == (9, 9)
+
+
+def test_invalidated_by_clear():
+    ctx = lib.ctx_New()
+    circuit(ctx, 2)
+    y = get_compressed_y(ctx)
+    cache = get_ymatrix_cache(ctx)
+    run(ctx, 'clear')
+    assert cache._value is None
+    circuit(ctx, 1)
+    assert get_compressed_y(ctx).shape == (6, 6)
+    # The arrays of the old matrix stay valid
+    assert y.shape == (9, 9) and np.isfinite(y.data).all()
+
+
+def test_to_scipy():
+    pytest.importorskip('scipy')
+    ctx = lib.ctx_New()
+    circuit(ctx, 1)
+    y = get_compressed_y(ctx)
+    Y = y.to_scipy()
+    assert y.to_scipy() is Y
+    dense = Y.toarray()
+    assert dense.shape == (6, 6)
+    np.testing.assert_allclose(dense, dense.T)
+
+
+def test_forget_unregisters_handlers():
+    ctx = lib.ctx_New()
+    cache = get_ymatrix_cache(ctx)
+    assert get_ymatrix_cache(ctx) is cache
+    manager = get_manager_for_ctx(ctx)
+    assert manager.BuildSystemY == (cache._on_change,)
+    forget_ctx(ctx)
+    assert manager.BuildSystemY == () and manager.Clear == ()
+    assert get_ymatrix_cache(ctx) is not cache
+    dispose_ctx(ctx)